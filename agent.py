@@ -1,8 +1,80 @@
 """
 Research Agent Implementation using Google Gemini (Native SDK)
 """
+import threading
+import time
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 import google.generativeai as genai
-from config import GOOGLE_API_KEY, MODEL_NAME, TEMPERATURE
+from config import (
+    GOOGLE_API_KEY, MODEL_NAME, TEMPERATURE, AGENT_MODE, SEARCH_CONTEXT_MAX_TOKENS,
+    TOKEN_CALIBRATION_ENABLED, HEDGE_ENABLED, SPECULATIVE_DRAFT_ENABLED,
+    SPECULATIVE_DRAFT_WAIT,
+    SEARCH_CACHE_TTL_FRESH, SEMANTIC_CACHE_ENABLED, get_agent_config,
+)
+from model_registry import get_generation_models
+from health import pick_model
+from scheduler import run_tools
+from router import route
+from calculator import extract_expressions
+from series import parse_request as parse_series_request
+from summarizer import summarize
+from prompts import PromptBuilder
+from tokens import estimator, CALIBRATION_SAMPLE
+from memory import ConversationMemory
+from model_router import model_router
+from hedging import hedger, alternate_model
+from speculation import keep_draft, speculation_stats
+from cache import normalize_query, ttl_for_query, split_queries, get_response_cache, response_cache_enabled
+from semantic_cache import get_semantic_cache
+from canonical import decompose
+
+# Answer prompt for prefetch mode; {history} holds earlier turns and
+# {context} the tool results
+ANSWER_PROMPT = """You are a helpful AI research assistant. Answer questions clearly and concisely.
+
+{history}Question: {question}
+
+{context}
+
+Provide a clear, helpful answer:"""
+
+# System instruction for the function-calling loop
+AGENT_INSTRUCTIONS = (
+    "You are a helpful AI research assistant. Answer questions clearly and concisely. "
+    "Call a tool only when you actually need information or arithmetic you cannot "
+    "do reliably yourself; request independent tool calls together in one turn."
+)
+
+# Speculative drafts are generated here while the search runs
+_draft_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="draft")
+
+
+def build_function_declarations(tools):
+    """
+    Describe LangChain tools to Gemini as function declarations
+    
+    Every tool takes a single string, so each becomes a function with one
+    required "input" parameter.
+    
+    Args:
+        tools: List of LangChain tools
+        
+    Returns:
+        genai.protos.Tool holding one declaration per tool
+    """
+    return genai.protos.Tool(function_declarations=[
+        genai.protos.FunctionDeclaration(
+            name=tool.name,
+            description=tool.description,
+            parameters=genai.protos.Schema(
+                type=genai.protos.Type.OBJECT,
+                properties={"input": genai.protos.Schema(type=genai.protos.Type.STRING)},
+                required=["input"],
+            ),
+        )
+        for tool in tools
+    ])
 
 class ResearchAgent:
     """Autonomous Research Agent powered by Google Gemini"""
@@ -24,34 +96,66 @@ class ResearchAgent:
             # Clean up model name - remove any "models/" prefix if present
             clean_model_name = MODEL_NAME.replace("models/", "")
             
-            # List available models to verify
+            # List available models to verify (served from the on-disk registry when warm)
             print(f"   → Checking available models...")
-            available_models = [m.name for m in genai.list_models() if 'generateContent' in m.supported_generation_methods]
+            available_models = [m["name"] for m in get_generation_models(GOOGLE_API_KEY)]
+            self.available_models = {m.split('/')[-1] for m in available_models}
             print(f"   → Available models: {', '.join([m.split('/')[-1] for m in available_models[:3]])}...")
             
-            # Use gemini-pro if the requested model isn't available
+            # Fall back to the fastest healthy model if the requested one isn't available
             if not any(clean_model_name in model for model in available_models):
-                print(f"   ⚠️ {clean_model_name} not found, using gemini-pro instead")
-                clean_model_name = "gemini-pro"
+                fallback, _ = pick_model([m.split('/')[-1] for m in available_models])
+                fallback = fallback or "gemini-pro"
+                print(f"   ⚠️ {clean_model_name} not found, using {fallback} instead")
+                clean_model_name = fallback
             
             # Initialize Gemini model
             print(f"   → Loading {clean_model_name}...")
+            generation_config = {
+                "temperature": TEMPERATURE,
+                "top_p": 0.95,
+                "top_k": 40,
+                "max_output_tokens": 2048,
+            }
             self.model = genai.GenerativeModel(
                 model_name=clean_model_name,
-                generation_config={
-                    "temperature": TEMPERATURE,
-                    "top_p": 0.95,
-                    "top_k": 40,
-                    "max_output_tokens": 2048,
-                }
+                generation_config=generation_config
             )
             print("   ✅ Model initialized successfully")
             
+            # Per-question model routing reuses one GenerativeModel per name
+            self.generation_config = generation_config
+            self._models = {clean_model_name: self.model}
+            self._last_decision = None
+            self.last_prompt_report = None
+            
+            # Earlier turns of this session, so follow-ups have context
+            self.memory = ConversationMemory()
+            self._last_search = ""
+            self._last_queries = []
+            
+            # Fit the offline token estimate to this model's tokenizer
+            if TOKEN_CALIBRATION_ENABLED:
+                try:
+                    ratio = estimator.calibrate(self.model, [CALIBRATION_SAMPLE])
+                    print(f"   ✅ Token estimate calibrated ({ratio:.2f} characters/token)")
+                except Exception as e:
+                    print(f"   ⚠️ Token calibration failed, using the default estimate: {e}")
+            
             # Store tools
             self.tools = tools
             self.tool_dict = {tool.name: tool for tool in tools}
             print(f"   ✅ Loaded {len(tools)} tools: {', '.join([t.name for t in tools])}")
             
+            # Same model with the tools declared, for the function-calling loop
+            self.agent_config = get_agent_config()
+            self.tool_model = genai.GenerativeModel(
+                model_name=clean_model_name,
+                generation_config=generation_config,
+                tools=[build_function_declarations(tools)],
+                system_instruction=AGENT_INSTRUCTIONS
+            )
+            
             print("\n✅ Research Assistant fully initialized!\n")
             
         except Exception as e:
@@ -60,10 +164,198 @@ class ResearchAgent:
             traceback.print_exc()
             raise
     
+    def build_prompt(self, question: str, decision=None) -> str:
+        """
+        Run the tools a question needs and build the LLM prompt
+        
+        Args:
+            question: User's input question
+            decision: RouteDecision already made for the question (routed
+                here when None)
+            
+        Returns:
+            Prompt string including any tool results
+        """
+        # Decide which tools the question needs
+        if decision is None:
+            decision = route(question)
+        self._last_decision = decision
+        should_search = decision.search
+        should_calculate = decision.calculate
+        
+        # A follow-up on results already in the conversation needs no new search
+        reused_search = ""
+        if should_search and self.memory.covers(question):
+            print("\n♻️ Follow-up: reusing search results from the conversation")
+            should_search = False
+            reused_search = self.memory.recent_search()
+        
+        # Schedule the needed tools so they run concurrently
+        calls = []
+        queries = []
+        
+        if should_search and 'WebSearch' in self.tool_dict:
+            # Comparisons search each entity; the tool batches the queries
+            queries = decompose(question)
+            print("\n🔍 Searching the web..." if len(queries) == 1 else f"\n🔍 Searching the web ({len(queries)} queries)...")
+            calls.append(('WebSearch', self.tool_dict['WebSearch'].func, "; ".join(queries)))
+        
+        if should_calculate and 'Calculator' in self.tool_dict:
+            # Statistics over a list of numbers go to the tool as written;
+            # otherwise extract every expression and evaluate them in one call
+            if parse_series_request(question):
+                calc_input = question
+            else:
+                calc_input = "; ".join(extract_expressions(question))
+            if calc_input:
+                print("\n🔢 Calculating...")
+                calls.append(('Calculator', self.tool_dict['Calculator'].func, calc_input))
+        
+        results = run_tools(calls)
+        builder = PromptBuilder().add("question", question)
+        builder.add("history", self.memory.context())
+        builder.add("search", reused_search, query=question)
+        
+        search = results.get('WebSearch')
+        self._last_queries = queries if search and search["ok"] else []
+        if search:
+            if search["ok"]:
+                # Compressed to the snippets most relevant to the question if over budget
+                builder.add("search", search['output'], query=question)
+                print(f"✅ Search completed ({search['elapsed']:.2f}s)")
+            else:
+                print(f"⚠️ Search failed: {search['error']}")
+        
+        calc = results.get('Calculator')
+        if calc:
+            if calc["ok"]:
+                builder.add("calculation", calc['output'])
+                print(f"✅ Calculation completed ({calc['elapsed']:.2f}s)")
+            else:
+                print(f"⚠️ Calculation failed: {calc['error']}")
+        
+        # Fit everything into the prompt token budget
+        sections, self.last_prompt_report = builder.fit(ANSWER_PROMPT)
+        print(f"📐 Prompt: {self.last_prompt_report.summary()}")
+        
+        self._last_search = sections.get("search", "")
+        return self._render_prompt(sections)
+    
+    def _render_prompt(self, sections):
+        """Fill ANSWER_PROMPT from fitted prompt sections"""
+        history = f"Conversation so far:\n{sections['history']}\n\n" if sections.get("history") else ""
+        
+        context = ""
+        if sections.get("search"):
+            context += f"\n\n**Web Search Results:**\n{sections['search']}\n"
+        if sections.get("calculation"):
+            context += f"\n\n**Calculation Result:**\n{sections['calculation']}\n"
+        
+        # Create prompt for the LLM
+        return ANSWER_PROMPT.format(
+            history=history,
+            question=sections["question"],
+            context=context if context else "Please answer based on your knowledge.",
+        )
+    
+    def _start_draft(self, question, decision):
+        """
+        Start a knowledge-only answer on a worker thread before the search runs
+        
+        Only questions whose sole tool is a web search are drafted; questions
+        asking for fresh information and follow-ups that reuse earlier
+        results are not.
+        
+        Args:
+            question: User's input question
+            decision: RouteDecision for the question
+        
+        Returns:
+            (model_name, model, future of the draft text, stop event,
+            start time), or None
+        """
+        if not decision.search or decision.calculate or 'WebSearch' not in self.tool_dict:
+            return None
+        if ttl_for_query(normalize_query(question)) == SEARCH_CACHE_TTL_FRESH:
+            return None
+        if self.memory.covers(question):
+            return None
+        
+        self._last_decision = decision
+        sections, _ = PromptBuilder().add("question", question).add(
+            "history", self.memory.context()
+        ).fit(ANSWER_PROMPT)
+        prompt = self._render_prompt(sections)
+        model_name, model = self._answer_model(question)
+        
+        # Streamed so an abandoned draft stops at its next chunk
+        stop = threading.Event()
+        
+        def generate():
+            started_at = time.perf_counter()
+            parts = []
+            chunks = None
+            try:
+                chunks = iter_response_text(model.generate_content(prompt, stream=True))
+                for chunk in chunks:
+                    if stop.is_set():
+                        return None
+                    parts.append(chunk)
+            except Exception:
+                model_router.record(model_name, time.perf_counter() - started_at, ok=False)
+                raise
+            finally:
+                if chunks is not None:
+                    chunks.close()
+            model_router.record(model_name, time.perf_counter() - started_at)
+            return "".join(parts)
+        
+        print("\n✍️ Drafting an answer while the search runs...")
+        return model_name, model, _draft_executor.submit(generate), stop, time.perf_counter()
+    
+    def _finish_draft(self, question, draft):
+        """
+        Keep the speculative draft if the search results add little to it
+        
+        A draft still being written SPECULATIVE_DRAFT_WAIT seconds after
+        the search finished is stopped, and the grounded answer starts.
+        
+        Returns:
+            The draft text, or None if it was discarded
+        """
+        _, _, future, stop, started_at = draft
+        if future.cancel():
+            return None
+        waited_from = time.perf_counter()
+        try:
+            text = future.result(timeout=SPECULATIVE_DRAFT_WAIT)
+        except FutureTimeout:
+            stop.set()
+            speculation_stats.record(False, wasted=time.perf_counter() - started_at)
+            print(f"⏱️ Draft unfinished {SPECULATIVE_DRAFT_WAIT:.1f}s after the search, answering with the results")
+            return None
+        except Exception as e:
+            print(f"⚠️ Draft failed: {e}")
+            text = ""
+        keep, novelty = keep_draft(text, self._last_search, question)
+        speculation_stats.record(keep, wasted=0.0 if keep else time.perf_counter() - started_at)
+        if keep:
+            print(f"✅ Kept the draft answer (search novelty {novelty:.0%})")
+            return text
+        print(f"🔁 Search added new information (novelty {novelty:.0%}, waited "
+              f"{time.perf_counter() - waited_from:.2f}s for the draft), answering with it")
+        return None
+    
     def query(self, question: str) -> str:
         """
         Process a user query and return the response
         
+        With SEMANTIC_CACHE_ENABLED, a question worded like an earlier one is
+        answered from the semantic cache before any routing.
+        With SPECULATIVE_DRAFT_ENABLED, search-only questions are drafted
+        from the model's knowledge while the search runs, and the draft is
+        kept when the results add little to it.
+        
         Args:
             question: User's input question
             
@@ -71,58 +363,314 @@ class ResearchAgent:
             Agent's response as a string
         """
         try:
-            # Check if we should use web search
-            search_keywords = ['search', 'find', 'what is', 'who is', 'when', 'where', 'latest', 'current', 'recent', 'news', 'today']
-            should_search = any(keyword in question.lower() for keyword in search_keywords)
+            similar = self._similar_answer(question)
+            if similar is not None:
+                self.memory.add_turn(question, similar)
+                return similar
             
-            # Check if we should use calculator
-            calc_keywords = ['calculate', 'compute', 'math', '+', '-', '*', '/', 'sum', 'multiply', 'divide']
-            should_calculate = any(keyword in question.lower() for keyword in calc_keywords)
+            draft = None
+            if AGENT_MODE == "function_calling":
+                answer = self.run_agent_loop(question)
+            else:
+                # Routed once; the draft and the prompt share the decision
+                decision = route(question)
+                if SPECULATIVE_DRAFT_ENABLED:
+                    draft = self._start_draft(question, decision)
+                prompt = self.build_prompt(question, decision)
+                answer = self._finish_draft(question, draft) if draft else None
             
-            context = ""
+            if answer is None:
+                model_name, model = draft[:2] if draft else self._answer_model(question)
+                answer = self._cached_answer(model_name, prompt)
             
-            # Use WebSearch tool if needed
-            if should_search and 'WebSearch' in self.tool_dict:
-                print("\n🔍 Searching the web...")
-                try:
-                    search_result = self.tool_dict['WebSearch'].func(question)
-                    context += f"\n\n**Web Search Results:**\n{search_result}\n"
-                    print("✅ Search completed")
-                except Exception as e:
-                    print(f"⚠️ Search failed: {e}")
+            if answer is None:
+                # Get response from Gemini, feeding its latency to the router
+                print("\n💭 Thinking...")
+                started_at = time.perf_counter()
+                if HEDGE_ENABLED:
+                    # Hedging races first chunks, so collect a hedged stream
+                    chunks = self._hedged_stream(model, prompt)
+                    answer = "".join(model_router.track_stream(model_name, chunks, started_at))
+                else:
+                    try:
+                        answer = model.generate_content(prompt).text
+                    except Exception:
+                        model_router.record(model_name, time.perf_counter() - started_at, ok=False)
+                        raise
+                    model_router.record(model_name, time.perf_counter() - started_at)
+                self._cache_answer(model_name, prompt, question, answer)
             
-            # Use Calculator tool if needed
-            if should_calculate and 'Calculator' in self.tool_dict:
-                print("\n🔢 Calculating...")
-                try:
-                    # Extract mathematical expression from question
-                    import re
-                    math_pattern = r'[\d\+\-\*\/\.\(\)\s]+'
-                    matches = re.findall(math_pattern, question)
-                    if matches:
-                        expression = max(matches, key=len).strip()
-                        calc_result = self.tool_dict['Calculator'].func(expression)
-                        context += f"\n\n**Calculation Result:**\n{calc_result}\n"
-                        print("✅ Calculation completed")
-                except Exception as e:
-                    print(f"⚠️ Calculation failed: {e}")
+            self._remember(question, answer, self._last_search)
+            return answer
             
-            # Create prompt for the LLM
-            prompt = f"""You are a helpful AI research assistant. Answer questions clearly and concisely.
-
-Question: {question}
-
-{context if context else "Please answer based on your knowledge."}
-
-Provide a clear, helpful answer:"""
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            return f"❌ Error processing query: {str(e)}"
+    
+    def query_stream(self, question: str):
+        """
+        Process a user query and stream the response
+        
+        Tools run before this returns; the model output is streamed lazily.
+        In function_calling mode the loop finishes first and the answer is
+        returned as a single chunk, as is a kept speculative draft.
+        
+        Args:
+            question: User's input question
             
-            # Get response from Gemini
-            print("\n💭 Thinking...")
-            response = self.model.generate_content(prompt)
+        Returns:
+            Iterator of response text chunks
+        """
+        try:
+            similar = self._similar_answer(question)
+            if similar is not None:
+                self.memory.add_turn(question, similar)
+                return iter([similar])
+            
+            draft = None
+            chunks = None
+            if AGENT_MODE == "function_calling":
+                chunks = iter([self.run_agent_loop(question)])
+            else:
+                # Routed once; the draft and the prompt share the decision
+                decision = route(question)
+                if SPECULATIVE_DRAFT_ENABLED:
+                    draft = self._start_draft(question, decision)
+                prompt = self.build_prompt(question, decision)
+                text = self._finish_draft(question, draft) if draft else None
+                if text is not None:
+                    chunks = iter([text])
+            
+            if chunks is None:
+                model_name, model = draft[:2] if draft else self._answer_model(question)
+                cached = self._cached_answer(model_name, prompt)
+                if cached is not None:
+                    chunks = iter([cached])
+            
+            if chunks is None:
+                # Start streaming from Gemini; time to first chunk feeds the router
+                print("\n💭 Thinking...")
+                started_at = time.perf_counter()
+                if HEDGE_ENABLED:
+                    # hedger.stream() is lazy; wait for the first chunk here, as
+                    # generate_content(stream=True) does, so a failure of both
+                    # requests is reported like any other
+                    chunks = model_router.track_stream(model_name, self._hedged_stream(model, prompt), started_at)
+                    first = next(chunks, None)
+                    chunks = chain([first], chunks) if first is not None else iter([])
+                else:
+                    try:
+                        response = model.generate_content(prompt, stream=True)
+                    except Exception:
+                        model_router.record(model_name, time.perf_counter() - started_at, ok=False)
+                        raise
+                    chunks = model_router.track_stream(model_name, iter_response_text(response), started_at)
+                chunks = self._cache_stream(model_name, prompt, question, chunks)
             
-            return response.text
+            # Errors raised while the answer streams end it with an error chunk
+            return _guard_stream(self._remember_stream(question, chunks, self._last_search))
             
         except Exception as e:
             import traceback
             traceback.print_exc()
-            return f"❌ Error processing query: {str(e)}"
+            return iter([f"❌ Error processing query: {str(e)}"])
+
+    def _answer_model(self, question):
+        """
+        Pick the model that answers a question (see model_router)
+        
+        Returns:
+            (model_name, GenerativeModel)
+        """
+        tier, name = model_router.choose(question, self._last_decision, available=self.available_models)
+        if tier == "default":
+            name = self.model.model_name.split('/')[-1]
+            return name, self.model
+        print(f"🧭 Routed to the {tier} tier: {name}")
+        return name, self._get_model(name)
+    
+    def _get_model(self, name):
+        """GenerativeModel for a model name, created on first use"""
+        if name not in self._models:
+            self._models[name] = genai.GenerativeModel(
+                model_name=name,
+                generation_config=self.generation_config
+            )
+        return self._models[name]
+    
+    def _hedged_stream(self, model, prompt):
+        """
+        Stream an answer, sending a backup request if the first is slow (see hedging)
+        
+        The backup goes to HEDGE_ALTERNATE_MODEL when it is available, else
+        to the same model.
+        """
+        alternate = alternate_model(self.available_models)
+        backup_model = self._get_model(alternate) if alternate else model
+        return hedger.stream(
+            lambda: iter_response_text(model.generate_content(prompt, stream=True)),
+            lambda: iter_response_text(backup_model.generate_content(prompt, stream=True)),
+        )
+    
+    def _cached_answer(self, model_name, prompt):
+        """Answer to an identical earlier request, if response caching applies"""
+        if not response_cache_enabled(self.generation_config):
+            return None
+        cache = get_response_cache()
+        answer = cache.get(cache.key(model_name, self.generation_config, prompt))
+        if answer is not None:
+            print("\n⚡ Answer served from the response cache")
+        return answer
+    
+    def _cache_answer(self, model_name, prompt, question, answer):
+        """Store an answer; it expires with any search results in the prompt"""
+        if not answer or not response_cache_enabled(self.generation_config):
+            return
+        cache = get_response_cache()
+        cache.set(
+            cache.key(model_name, self.generation_config, prompt),
+            answer,
+            cache.ttl_for_answer(question, searched=bool(self._last_search), queries=self._last_queries),
+        )
+    
+    def _cache_stream(self, model_name, prompt, question, chunks):
+        """Pass chunks through, then cache the answer once the stream completes"""
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+        self._cache_answer(model_name, prompt, question, "".join(parts))
+    
+    def _similar_answer(self, question):
+        """Answer to a near-duplicate earlier question, if the semantic cache has one"""
+        if not SEMANTIC_CACHE_ENABLED or self.memory.is_follow_up(question):
+            return None
+        hit = get_semantic_cache().lookup(question)
+        if hit is None:
+            return None
+        print(f"\n🧠 Reusing the answer to a similar question ({hit['similarity']:.2f}): {hit['question']}")
+        return hit["answer"]
+    
+    def _remember(self, question, answer, search):
+        """Add a finished turn to the conversation and, if standalone, the semantic cache"""
+        if SEMANTIC_CACHE_ENABLED and answer and not self.memory.is_follow_up(question):
+            get_semantic_cache().add(question, answer)
+        self.memory.add_turn(question, answer, search=search)
+    
+    def _remember_stream(self, question, chunks, search):
+        """Pass chunks through, then remember the turn once the answer is complete"""
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+        self._remember(question, "".join(parts), search)
+    
+    def run_agent_loop(self, question: str) -> str:
+        """
+        Answer a question with Gemini function calling
+        
+        The model decides which tools to call. All calls it emits in one turn
+        run concurrently, and the loop repeats for up to max_iterations rounds
+        before the model is asked to answer without tools.
+        
+        Args:
+            question: User's input question
+            
+        Returns:
+            Agent's response as a string
+        """
+        max_iterations = self.agent_config["max_iterations"]
+        verbose = self.agent_config["verbose"]
+        chat = self.tool_model.start_chat()
+        searches = []
+        self._last_search = ""
+        self._last_queries = []
+        
+        # Earlier turns travel with the question; the model decides whether
+        # they make a tool call unnecessary
+        history = self.memory.context()
+        message = f"Conversation so far:\n{history}\n\nQuestion: {question}" if history else question
+        
+        print("\n💭 Thinking...")
+        response = chat.send_message(message)
+        
+        for iteration in range(max_iterations):
+            function_calls = [part.function_call for part in response.parts if part.function_call.name]
+            if not function_calls:
+                return response.text
+            
+            # Run every requested call at once; '#i' keeps repeated tools apart
+            calls = []
+            for i, fc in enumerate(function_calls):
+                tool_input = str(dict(fc.args).get("input", ""))
+                if verbose:
+                    print(f"🔧 [{iteration + 1}/{max_iterations}] {fc.name}({tool_input!r})")
+                tool = self.tool_dict.get(fc.name)
+                func = tool.func if tool else _unknown_tool(fc.name)
+                calls.append((f"{fc.name}#{i}", func, tool_input))
+            results = run_tools(calls)
+            
+            replies = []
+            for (key, _, tool_input), fc in zip(calls, function_calls):
+                result = results[key]
+                output = str(result["output"]) if result["ok"] else f"Error: {result['error']}"
+                if result["ok"] and fc.name == "WebSearch":
+                    output = summarize(output, SEARCH_CONTEXT_MAX_TOKENS, query=question)
+                    searches.append(output)
+                    self._last_search = "\n".join(searches)
+                    self._last_queries.extend(split_queries(tool_input))
+                replies.append(genai.protos.Part(function_response=genai.protos.FunctionResponse(
+                    name=fc.name, response={"result": output}
+                )))
+            
+            # On the last round, make the model answer with what it has
+            if iteration == max_iterations - 1:
+                response = chat.send_message(replies, tool_config={"function_calling_config": "none"})
+            else:
+                response = chat.send_message(replies)
+        
+        return response.text
+
+
+def _unknown_tool(name):
+    """Stand-in for a tool the model asked for but the agent doesn't have"""
+    def fail(_):
+        raise ValueError(f"Unknown tool: {name}")
+    return fail
+
+
+def _guard_stream(chunks):
+    """
+    Pass a response stream through, ending it with an error chunk if it fails
+    
+    The answer streams after query_stream() returns, so errors from the
+    model (quota, dropped connection) surface here rather than in its
+    try/except; the turn is then neither cached nor remembered.
+    """
+    try:
+        yield from chunks
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        yield f"\n❌ Error processing query: {str(e)}"
+
+
+def iter_response_text(response):
+    """
+    Yield the text of each chunk of a streamed Gemini response
+    
+    Args:
+        response: Result of generate_content(..., stream=True)
+        
+    Yields:
+        Text chunks as they arrive
+    """
+    for chunk in response:
+        try:
+            text = chunk.text
+        except ValueError:
+            # Chunks without text parts (e.g. a final safety/finish marker)
+            continue
+        if text:
+            yield text
@@ -5,8 +5,25 @@ Built by: Data Science Graduate Student @ Pace University
 import streamlit as st
 import google.generativeai as genai
 from tools import create_tools
+from cache import get_search_cache, get_response_cache, response_cache_enabled
+from semantic_cache import get_semantic_cache
+from canonical import decompose
+from agent import iter_response_text
+from utils import StreamTimer
+from model_registry import get_generation_models
+from resources import registry, config_key
+from health import pick_model
+from scheduler import run_tools
+from router import route
+from calculator import extract_expressions
+from series import parse_request as parse_series_request
+from prompts import PromptBuilder
+from memory import ConversationMemory
+from model_router import model_router
+from hedging import hedger, alternate_model
+from config import MODEL_TIERS, HEDGE_ENABLED, SEMANTIC_CACHE_ENABLED
 import os
-import re
+import time
 
 # ============================================================================
 # PAGE CONFIGURATION
@@ -66,16 +83,24 @@ if 'tool_dict' not in st.session_state:
     st.session_state.tool_dict = {}
 if 'model' not in st.session_state:
     st.session_state.model = None
+if 'resource_key' not in st.session_state:
+    st.session_state.resource_key = None
+if 'memory' not in st.session_state:
+    # Per-session conversation memory sent with each prompt
+    st.session_state.memory = ConversationMemory()
 
 # ============================================================================
 # SIDEBAR CONFIGURATION
 # ============================================================================
+AUTO_MODEL = "Auto (route by question)"
+
 with st.sidebar:
     st.markdown("### ⚙️ Settings")
     
     model_name = st.selectbox(
         "Select Model",
         [
+            AUTO_MODEL,
             "gemini-1.5-pro-preview-0514",
             "gemini-1.5-flash-002",
             "gemini-1.5-pro-002",
@@ -83,7 +108,7 @@ with st.sidebar:
             "gemini-1.5-pro"
         ],
         index=0,
-        help="Choose the AI model"
+        help="Choose the AI model, or let each question be routed to a fast or strong model"
     )
     
     temperature = st.slider(
@@ -97,8 +122,43 @@ with st.sidebar:
     
     if st.button("🔄 Clear Chat History"):
         st.session_state.chat_history = []
+        st.session_state.memory.clear()
+        st.rerun()
+    
+    if st.button("♻️ Reload Model"):
+        # Drop the shared model so the next run rebuilds it for every session
+        registry.invalidate(st.session_state.resource_key)
+        st.session_state.resource_key = None
         st.rerun()
     
+    cache_stats = get_search_cache().stats()
+    st.caption(
+        f"🗄️ Search cache: {cache_stats['hits']} hits · "
+        f"{cache_stats['misses']} misses · {cache_stats['entries']} entries"
+    )
+    if response_cache_enabled({"temperature": temperature}):
+        response_stats = get_response_cache().stats()
+        st.caption(
+            f"⚡ Response cache: {response_stats['hits']} hits · "
+            f"{response_stats['misses']} misses · {response_stats['entries']} entries"
+        )
+    if SEMANTIC_CACHE_ENABLED:
+        semantic_stats = get_semantic_cache().stats()
+        st.caption(
+            f"🧠 Similar-question cache: {semantic_stats['hits']} hits · "
+            f"{semantic_stats['misses']} misses · {semantic_stats['entries']} entries"
+        )
+    tiers_served = model_router.metrics()["tiers"]
+    st.caption("🧭 Requests per tier: " + " · ".join(
+        f"{tier} {count}" for tier, count in tiers_served.items()
+    ))
+    if HEDGE_ENABLED:
+        hedges = hedger.metrics()
+        st.caption(
+            f"🏁 Hedging: {hedges['hedges_fired']} fired · {hedges['hedges_won']} won · "
+            f"{hedges['requests']} requests"
+        )
+    
     st.markdown("---")
     
     st.markdown("### 📚 About")
@@ -139,73 +199,81 @@ st.markdown('<div class="sub-header">Built to Discover something New</div>', uns
 # ============================================================================
 # AGENT INITIALIZATION
 # ============================================================================
-if not st.session_state.agent_initialized:
+# Models and tools live in a process-wide registry keyed by their settings,
+# so sessions share them instead of each listing models, probing and
+# building tools on its first run.
+generation_config = {
+    "temperature": temperature,
+    "top_p": 0.95,
+    "top_k": 40,
+    "max_output_tokens": 8192,
+}
+resource_key = config_key("model", model_name, generation_config)
+
+
+def initialize_model():
+    """Detect available models and return the preferred or fastest healthy one"""
+    # Configure Google AI
+    genai.configure(api_key=GOOGLE_API_KEY)
+    
+    # First, detect available models
+    st.info("🔍 Detecting available models with your API key...")
+    available_models = []
+    
+    try:
+        # Served from the on-disk registry when warm
+        for model in get_generation_models(GOOGLE_API_KEY):
+            available_models.append(model["name"].split('/')[-1])
+    except Exception as e:
+        st.error(f"❌ Could not list models: {e}")
+        # Fallback to common model names
+        available_models = [
+            "gemini-1.5-flash-latest",
+            "gemini-1.5-pro-latest", 
+            "gemini-pro"
+        ]
+    else:
+        if not available_models:
+            raise RuntimeError("No models found. Please check your API key.")
+        st.success(f"✅ Found {len(available_models)} available models")
+        st.info(f"Available: {', '.join(available_models[:5])}")
+    
+    # Probe candidates concurrently (or reuse recent results) and keep the
+    # selected model if it is healthy, else the fastest healthy one
+    st.info("⏳ Checking model health...")
+    preferred = MODEL_TIERS["fast"][0] if model_name == AUTO_MODEL else model_name
+    chosen_model, health = pick_model(available_models, preferred=preferred)
+    
+    for name, result in health.items():
+        if not result["ok"]:
+            st.warning(f"⚠️ {name} failed: {str(result['error'])[:100]}")
+    
+    if chosen_model is None:
+        errors = [r["error"] for r in health.values() if r["error"]]
+        raise RuntimeError(errors[-1] if errors else "No healthy model found")
+    
+    st.success(f"✅ Successfully initialized: {chosen_model} "
+               f"({health[chosen_model]['latency']:.2f}s probe)")
+    return genai.GenerativeModel(
+        model_name=chosen_model,
+        generation_config=generation_config
+    )
+
+
+def initialize_tools():
+    """Create the research tools"""
+    os.environ['SERPER_API_KEY'] = SERPER_API_KEY
+    return create_tools()
+
+
+if st.session_state.resource_key != resource_key:
     with st.spinner("🚀 Initializing AI Assistant..."):
         try:
-            # Configure Google AI
-            genai.configure(api_key=GOOGLE_API_KEY)
-            
-            # First, detect available models
-            st.info("🔍 Detecting available models with your API key...")
-            available_models = []
-            
             try:
-                all_models = genai.list_models()
-                for model in all_models:
-                    if 'generateContent' in model.supported_generation_methods:
-                        model_name = model.name.split('/')[-1]
-                        available_models.append(model_name)
-                
-                if available_models:
-                    st.success(f"✅ Found {len(available_models)} available models")
-                    st.info(f"Available: {', '.join(available_models[:5])}")
-                else:
-                    st.error("❌ No models found. Please check your API key.")
-                    st.stop()
-            except Exception as e:
-                st.error(f"❌ Could not list models: {e}")
-                # Fallback to common model names
-                available_models = [
-                    "gemini-1.5-flash-latest",
-                    "gemini-1.5-pro-latest", 
-                    "gemini-pro"
-                ]
-            
-            # Try to create model
-            model_created = False
-            last_error = None
-            
-            for try_model in available_models:
-                try:
-                    st.info(f"⏳ Trying model: {try_model}")
-                    
-                    test_model = genai.GenerativeModel(
-                        model_name=try_model,
-                        generation_config={
-                            "temperature": temperature,
-                            "top_p": 0.95,
-                            "top_k": 40,
-                            "max_output_tokens": 8192,
-                        }
-                    )
-                    
-                    # Test with simple generation
-                    test_response = test_model.generate_content("Say hi")
-                    
-                    # If we got here, model works!
-                    st.session_state.model = test_model
-                    st.success(f"✅ Successfully initialized: {try_model}")
-                    model_created = True
-                    break
-                    
-                except Exception as e:
-                    last_error = str(e)
-                    st.warning(f"⚠️ {try_model} failed: {str(e)[:100]}")
-                    continue
-            
-            if not model_created:
+                st.session_state.model = registry.get(resource_key, initialize_model)
+            except RuntimeError as e:
                 st.error("❌ Could not initialize any model")
-                st.error(f"Last error: {last_error}")
+                st.error(f"Last error: {e}")
                 st.info("""
                 **Possible solutions:**
                 1. Check your Google API key is valid
@@ -215,13 +283,15 @@ if not st.session_state.agent_initialized:
                 """)
                 st.stop()
             
-            # Create tools
-            os.environ['SERPER_API_KEY'] = SERPER_API_KEY
-            st.session_state.tools = create_tools()
+            # Create tools (shared by every session)
+            st.session_state.tools = registry.get(
+                config_key("tools", SERPER_API_KEY), initialize_tools
+            )
             st.session_state.tool_dict = {
                 tool.name: tool for tool in st.session_state.tools
             }
             
+            st.session_state.resource_key = resource_key
             st.session_state.agent_initialized = True
             st.success("🎉 AI Assistant ready!")
             
@@ -276,83 +346,188 @@ if prompt := st.chat_input("Ask me anything..."):
     with st.chat_message("assistant"):
         with st.spinner("🤔 Thinking..."):
             try:
-                # Determine if tools are needed
-                search_keywords = [
-                    'search', 'find', 'what is', 'who is', 'when',
-                    'where', 'latest', 'current', 'recent', 'news',
-                    'today', 'tell me about'
-                ]
-                should_search = any(
-                    keyword in prompt.lower() 
-                    for keyword in search_keywords
-                )
-                
-                calc_keywords = [
-                    'calculate', 'compute', 'math', '+', '-', '*',
-                    '/', 'sum', 'multiply', 'divide', '%'
-                ]
-                should_calculate = any(
-                    keyword in prompt.lower() 
-                    for keyword in calc_keywords
-                )
+                started_at = time.perf_counter()
                 
-                context = ""
+                memory = st.session_state.memory
                 
-                # Web Search
-                if should_search and 'WebSearch' in st.session_state.tool_dict:
-                    with st.status("🔍 Searching the web...", expanded=True):
-                        try:
-                            search_result = st.session_state.tool_dict['WebSearch'].func(prompt)
-                            context = context + "\n\nWeb Search Results:\n" + str(search_result) + "\n"
-                            st.write("✅ Search completed")
-                        except Exception as e:
-                            st.write(f"⚠️ Search error: {str(e)}")
-                
-                # Calculator
-                if should_calculate and 'Calculator' in st.session_state.tool_dict:
-                    with st.status("🔢 Calculating...", expanded=True):
-                        try:
-                            math_pattern = r'[\d\+\-\*\/\.\(\)\s%]+'
-                            matches = re.findall(math_pattern, prompt)
-                            if matches:
-                                expression = max(matches, key=len).strip()
-                                calc_result = st.session_state.tool_dict['Calculator'].func(expression)
-                                context = context + "\n\nCalculation:\n" + str(calc_result) + "\n"
-                                st.write("✅ Calculation completed")
-                        except Exception as e:
-                            st.write(f"⚠️ Calculation error: {str(e)}")
+                # A standalone question worded like an earlier one reuses its answer
+                similar = None
+                if SEMANTIC_CACHE_ENABLED and not memory.is_follow_up(prompt):
+                    similar = get_semantic_cache().lookup(prompt)
                 
-                # Build prompt
-                if context:
-                    full_prompt = (
-                        "You are a helpful AI research assistant. "
-                        "Provide clear, accurate, and well-structured answers.\n\n"
-                        "Question: " + prompt + "\n\n" +
-                        context + "\n\n"
-                        "Provide a clear, helpful answer:"
+                if similar:
+                    response_text = similar["answer"]
+                    st.markdown(response_text)
+                    st.caption(
+                        f"🧠 Reused the answer to \"{similar['question']}\" "
+                        f"(similarity {similar['similarity']:.2f})"
                     )
+                    memory.add_turn(prompt, response_text)
+                    st.session_state.chat_history.append({
+                        "role": "assistant",
+                        "content": response_text
+                    })
                 else:
-                    full_prompt = (
+                    # Determine if tools are needed
+                    decision = route(prompt)
+                    should_search = decision.search
+                    should_calculate = decision.calculate
+                    
+                    # A follow-up on results already in the conversation needs no new search
+                    reused_search = ""
+                    if should_search and memory.covers(prompt):
+                        should_search = False
+                        reused_search = memory.recent_search()
+                    
+                    # Schedule the needed tools so they run concurrently
+                    tool_dict = st.session_state.tool_dict
+                    calls = []
+                    queries = []
+                    
+                    if should_search and 'WebSearch' in tool_dict:
+                        # Comparisons search each entity; the tool batches the queries
+                        queries = decompose(prompt)
+                        calls.append(('WebSearch', tool_dict['WebSearch'].func, "; ".join(queries)))
+                    
+                    if should_calculate and 'Calculator' in tool_dict:
+                        if parse_series_request(prompt):
+                            calc_input = prompt
+                        else:
+                            calc_input = "; ".join(extract_expressions(prompt))
+                        if calc_input:
+                            calls.append(('Calculator', tool_dict['Calculator'].func, calc_input))
+                    
+                    builder = PromptBuilder().add("question", prompt)
+                    builder.add("history", memory.context())
+                    builder.add("search", reused_search, query=prompt)
+                    
+                    if calls:
+                        with st.status("🛠️ Searching and calculating...", expanded=True):
+                            results = run_tools(calls)
+                        
+                            # Web Search
+                            search = results.get('WebSearch')
+                            if not (search and search["ok"]):
+                                queries = []
+                            if search:
+                                if search["ok"]:
+                                    builder.add("search", search["output"], query=prompt)
+                                    st.write(f"✅ Search completed ({search['elapsed']:.2f}s)")
+                                else:
+                                    st.write(f"⚠️ Search error: {search['error']}")
+                        
+                            # Calculator
+                            calc = results.get('Calculator')
+                            if calc:
+                                if calc["ok"]:
+                                    builder.add("calculation", calc["output"])
+                                    st.write(f"✅ Calculation completed ({calc['elapsed']:.2f}s)")
+                                else:
+                                    st.write(f"⚠️ Calculation error: {calc['error']}")
+                    
+                    # Fit question and tool results into the prompt token budget
+                    sections, prompt_report = builder.fit(
                         "You are a helpful AI research assistant. "
                         "Provide clear, accurate, and well-structured answers.\n\n"
-                        "Question: " + prompt + "\n\n"
-                        "Please answer based on your knowledge. "
-                        "Be concise but comprehensive.\n\n"
-                        "Provide a clear, helpful answer:"
+                        "Question: \n\nProvide a clear, helpful answer:"
                     )
+                    history = ""
+                    if sections.get("history"):
+                        history = "Conversation so far:\n" + sections["history"] + "\n\n"
+                    context = ""
+                    if sections.get("search"):
+                        context = context + "\n\nWeb Search Results:\n" + sections["search"] + "\n"
+                    if sections.get("calculation"):
+                        context = context + "\n\nCalculation:\n" + sections["calculation"] + "\n"
+                    
+                    # Build prompt
+                    if context:
+                        full_prompt = (
+                            "You are a helpful AI research assistant. "
+                            "Provide clear, accurate, and well-structured answers.\n\n" +
+                            history +
+                            "Question: " + sections["question"] + "\n\n" +
+                            context + "\n\n"
+                            "Provide a clear, helpful answer:"
+                        )
+                    else:
+                        full_prompt = (
+                            "You are a helpful AI research assistant. "
+                            "Provide clear, accurate, and well-structured answers.\n\n" +
+                            history +
+                            "Question: " + sections["question"] + "\n\n"
+                            "Please answer based on your knowledge. "
+                            "Be concise but comprehensive.\n\n"
+                            "Provide a clear, helpful answer:"
+                        )
 
-                # Generate response
-                response = st.session_state.model.generate_content(full_prompt)
-                response_text = response.text
-                
-                # Display response
-                st.markdown(response_text)
-                
-                # Save to history
-                st.session_state.chat_history.append({
-                    "role": "assistant",
-                    "content": response_text
-                })
+                    # Pick the answering model: routed by question in Auto mode
+                    answer_model = st.session_state.model
+                    answer_name = answer_model.model_name.split('/')[-1]
+                    if model_name == AUTO_MODEL:
+                        available = {m["name"].split('/')[-1] for m in get_generation_models(GOOGLE_API_KEY)}
+                        tier, routed_name = model_router.choose(prompt, decision, available=available)
+                        if tier != "default":
+                            answer_name = routed_name
+                            answer_model = registry.get(
+                                config_key("model", routed_name, generation_config),
+                                lambda: genai.GenerativeModel(model_name=routed_name, generation_config=generation_config)
+                            )
+                    
+                    # Identical requests with deterministic settings are answered
+                    # from the shared response cache
+                    response_cache = get_response_cache()
+                    use_response_cache = response_cache_enabled(generation_config)
+                    cache_key = response_cache.key(answer_name, generation_config, full_prompt)
+                    cached = response_cache.get(cache_key) if use_response_cache else None
+                    
+                    # Generate and display the response as it streams in; time to
+                    # first chunk feeds the router's latency statistics
+                    request_started = time.perf_counter()
+                    if cached is not None:
+                        chunks = iter([cached])
+                    elif HEDGE_ENABLED:
+                        # A slow first request gets a backup; the first to stream wins
+                        backup_model = answer_model
+                        alternate = alternate_model({m["name"].split('/')[-1] for m in get_generation_models(GOOGLE_API_KEY)})
+                        if alternate:
+                            backup_model = registry.get(
+                                config_key("model", alternate, generation_config),
+                                lambda: genai.GenerativeModel(model_name=alternate, generation_config=generation_config)
+                            )
+                        hedged = hedger.stream(
+                            lambda: iter_response_text(answer_model.generate_content(full_prompt, stream=True)),
+                            lambda: iter_response_text(backup_model.generate_content(full_prompt, stream=True)),
+                        )
+                        chunks = model_router.track_stream(answer_name, hedged, request_started)
+                    else:
+                        try:
+                            response = answer_model.generate_content(full_prompt, stream=True)
+                        except Exception:
+                            model_router.record(answer_name, time.perf_counter() - request_started, ok=False)
+                            raise
+                        chunks = model_router.track_stream(answer_name, iter_response_text(response), request_started)
+                    timer = StreamTimer(chunks, started_at)
+                    response_text = st.write_stream(timer)
+                    if use_response_cache and cached is None and response_text:
+                        response_cache.set(cache_key, response_text, response_cache.ttl_for_answer(
+                            prompt, searched=bool(sections.get("search")), queries=queries
+                        ))
+                    reuse_note = " · ♻️ reused earlier search results" if reused_search else ""
+                    if cached is not None:
+                        reuse_note += " · ⚡ cached answer"
+                    st.caption(f"⏱️ {timer.summary()} · 🧭 {answer_name} · 📐 {prompt_report.summary()}{reuse_note}")
+                    
+                    # Remember the turn for follow-ups (older turns are summarized in the background)
+                    if SEMANTIC_CACHE_ENABLED and response_text and not memory.is_follow_up(prompt):
+                        get_semantic_cache().add(prompt, response_text)
+                    memory.add_turn(prompt, response_text, search=sections.get("search", ""))
+                    
+                    # Save to history
+                    st.session_state.chat_history.append({
+                        "role": "assistant",
+                        "content": response_text
+                    })
                 
             except Exception as e:
                 error_msg = f"❌ Error: {str(e)}"
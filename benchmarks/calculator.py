@@ -0,0 +1,59 @@
+"""
+Benchmark: AST calculator throughput versus the old eval() path
+Run from the repository root: python -m benchmarks.calculator
+"""
+import time
+
+from calculator import compile_expression, evaluate
+
+N_ROUNDS = 20_000
+
+TYPICAL = [
+    "2+2",
+    "15 * 2500 / 100",
+    "(25 + 75) * 3",
+    "1200 / 16",
+    "3.5 * 8",
+    "2 ** 10",
+    "45 + 67 - 12",
+    "0.15 * 2500",
+    "(1.08 ** 10) * 1000",
+    "99 * 99 - 1",
+]
+
+
+def old_eval(expression):
+    return eval(expression, {"__builtins__": {}}, {})
+
+
+def bench(func, expressions, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for expression in expressions:
+            func(expression)
+    elapsed = time.perf_counter() - start
+    return rounds * len(expressions) / elapsed
+
+
+def main():
+    for expression in TYPICAL:
+        assert abs(old_eval(expression) - evaluate(expression)) < 1e-9, expression
+
+    def uncached(expression):
+        compile_expression.cache_clear()
+        return evaluate(expression)
+
+    print(f"{len(TYPICAL)} typical expressions x {N_ROUNDS:,} rounds\n")
+    print(f"eval()              : {bench(old_eval, TYPICAL, N_ROUNDS):>12,.0f} expr/s")
+    print(f"AST, cold cache     : {bench(uncached, TYPICAL, N_ROUNDS // 10):>12,.0f} expr/s")
+    print(f"AST, warm LRU cache : {bench(evaluate, TYPICAL, N_ROUNDS):>12,.0f} expr/s")
+
+    start = time.perf_counter()
+    try:
+        evaluate("9**9**9")
+    except ValueError as e:
+        print(f"\n9**9**9 rejected in {(time.perf_counter() - start) * 1000:.3f} ms: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Benchmark: search cache hit rate with normalized versus canonical query keys
+Replays a query log (one query per line) against an empty cache
+Run from the repository root: python -m benchmarks.canonical [query_log.txt]
+"""
+import os
+import sys
+from collections import defaultdict
+
+from cache import normalize_query
+from canonical import canonicalize
+
+QUERY_LOG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "sample_queries.txt")
+
+
+def hit_rate(queries, key_func):
+    """Share of queries served from a cache that starts empty and never expires"""
+    seen, hits = set(), 0
+    for query in queries:
+        key = key_func(query)
+        hits += key in seen
+        seen.add(key)
+    return hits / len(queries), len(seen)
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else QUERY_LOG
+    with open(path, "r", encoding="utf-8") as f:
+        queries = [line.strip() for line in f if line.strip()]
+
+    print(f"{len(queries)} queries from {path}\n")
+    print(f"{'key':<12} {'hit rate':>9} {'searches':>9}")
+    for name, key_func in (("normalized", normalize_query), ("canonical", lambda q: canonicalize(q).key)):
+        rate, searches = hit_rate(queries, key_func)
+        print(f"{name:<12} {rate:>9.1%} {searches:>9}")
+
+    groups = defaultdict(list)
+    for query in queries:
+        groups[canonicalize(query).key].append(query)
+    merged = sorted((g for g in groups.values() if len({normalize_query(q) for q in g}) > 1), key=len, reverse=True)
+
+    print("\nQueries sharing a canonical key (Serper query first):")
+    for group in merged[:10]:
+        print(f"   {canonicalize(group[0]).query!r:<32} <- " + " | ".join(group))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Local fake Serper.dev server for benchmarks and manual testing
+Run from the repository root: python -m benchmarks.fake_serper [port]
+Then point the app at it with SERPER_BASE_URL=http://127.0.0.1:<port>
+"""
+import gzip
+import json
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeSerperHandler(BaseHTTPRequestHandler):
+    """Answers POST /search and /news with canned results"""
+
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+    batch = True
+    connections = 0
+    requests = 0
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out in separate writes; avoid delayed-ACK stalls
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        type(self).connections += 1
+
+    def do_POST(self):
+        type(self).requests += 1
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        time.sleep(self.latency)
+
+        if isinstance(body, list):
+            if not self.batch:
+                self.send_error(400, "Batch requests not supported")
+                return
+            payload = [self._results(item["q"]) for item in body]
+        else:
+            payload = self._results(body["q"])
+
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            data = gzip.compress(data)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _results(self, query):
+        key = "news" if self.path.rstrip("/").endswith("news") else "organic"
+        return {
+            "searchParameters": {"q": query},
+            key: [
+                {"title": f"Result {i} for {query}", "snippet": f"Snippet {i} about {query}."}
+                for i in range(10)
+            ],
+        }
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port=0, latency=0.0, batch=True):
+    """
+    Start the fake server in a background thread
+
+    Args:
+        port: Port to bind (0 picks a free one)
+        latency: Artificial delay per request in seconds
+        batch: Accept JSON array bodies (False answers them with 400)
+
+    Returns:
+        (server, base_url) tuple; call server.shutdown() when done
+    """
+    handler = type("Handler", (FakeSerperHandler,), {"latency": latency, "batch": batch})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    server, url = start_server(port)
+    print(f"Fake Serper listening on {url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,76 @@
+"""
+Benchmark: time to first chunk with and without hedged requests
+Uses a fake streaming model with a slow tail (a few requests stall); no API key needed
+Run from the repository root: python -m benchmarks.hedging
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from hedging import Hedger
+
+N_REQUESTS = 300
+CONCURRENCY = 8
+FAST_LATENCY = (0.05, 0.12)  # seconds to first chunk, uniform
+SLOW_LATENCY = (1.0, 2.0)    # seconds to first chunk for stalled requests
+SLOW_FRACTION = 0.05
+CHUNKS = 5
+
+
+class FakeModel:
+    """Streams a few chunks after a first-chunk delay; counts requests sent"""
+
+    def __init__(self):
+        self.sent = 0
+        self._lock = threading.Lock()
+
+    def stream(self):
+        with self._lock:
+            self.sent += 1
+        slow = random.random() < SLOW_FRACTION
+        time.sleep(random.uniform(*(SLOW_LATENCY if slow else FAST_LATENCY)))
+        for i in range(CHUNKS):
+            yield f"chunk {i} "
+            time.sleep(0.005)
+
+
+def run(percentile):
+    random.seed(0)
+    model = FakeModel()
+    hedge = percentile is not None
+    hedger = Hedger(percentile=percentile or 95, default_delay=0.3, min_delay=0.1,
+                    executor=ThreadPoolExecutor(max_workers=2 * CONCURRENCY))
+
+    def request(_):
+        start = time.perf_counter()
+        chunks = hedger.stream(model.stream) if hedge else model.stream()
+        first = None
+        for _ in chunks:
+            if first is None:
+                first = time.perf_counter() - start
+        return first
+
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        latencies = np.array(list(pool.map(request, range(N_REQUESTS))))
+    return latencies, model.sent, hedger.metrics()
+
+
+def main():
+    print(f"{N_REQUESTS} requests, {CONCURRENCY} concurrent; {SLOW_FRACTION:.0%} stall for "
+          f"{SLOW_LATENCY[0]}-{SLOW_LATENCY[1]}s, others {FAST_LATENCY[0]}-{FAST_LATENCY[1]}s\n")
+    print(f"{'mode':<10} {'p50':>7} {'p95':>7} {'p99':>7} {'max':>7} {'sent':>6}  hedges")
+
+    for percentile in (None, 95, 90):
+        latencies, sent, metrics = run(percentile)
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        hedges = f"{metrics['hedges_fired']} fired, {metrics['hedges_won']} won" if percentile else "-"
+        mode = f"hedge p{percentile}" if percentile else "plain"
+        print(f"{mode:<10} {p50:6.3f}s {p95:6.3f}s {p99:6.3f}s "
+              f"{latencies.max():6.3f}s {sent:>6}  {hedges}")
+
+
+if __name__ == "__main__":
+    main()
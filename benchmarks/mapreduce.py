@@ -0,0 +1,45 @@
+"""
+Benchmark: sequential versus concurrent map-reduce summarization
+Uses a fake model with Gemini-like latency; no API key needed
+Run from the repository root: python -m benchmarks.mapreduce
+"""
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import SUMMARY_MAX_CONCURRENCY
+from mapreduce import MapReduceSummarizer, chunk_text
+
+N_SENTENCES = 2000
+MODEL_LATENCY = (0.3, 0.8)  # seconds per call, uniform
+
+
+def fake_model(text, stage, max_tokens):
+    time.sleep(random.uniform(*MODEL_LATENCY))
+    return f"{stage} summary of {len(text)} characters."
+
+
+def run(workers, document):
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        summarizer = MapReduceSummarizer(fake_model, executor=executor)
+        start = time.perf_counter()
+        first_partial = None
+        for event in summarizer.stream(document):
+            if first_partial is None:
+                first_partial = time.perf_counter() - start
+        return first_partial, time.perf_counter() - start
+
+
+def main():
+    random.seed(0)
+    document = " ".join(f"Sentence {i} of the report covers finding {i % 13} in detail." for i in range(N_SENTENCES))
+    print(f"{len(document):,} characters, {len(chunk_text(document))} chunks, "
+          f"model latency {MODEL_LATENCY[0]}-{MODEL_LATENCY[1]}s\n")
+
+    for workers in (1, SUMMARY_MAX_CONCURRENCY):
+        first, total = run(workers, document)
+        print(f"{workers} worker(s): first partial {first:5.2f}s, final summary {total:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
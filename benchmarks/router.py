@@ -0,0 +1,81 @@
+"""
+Benchmark: compiled single-pass router versus the old per-keyword substring scans
+Run from the repository root: python -m benchmarks.router
+"""
+import random
+import time
+
+from router import router
+
+N_QUERIES = 200_000
+
+# The keyword lists previously inlined in app.py
+OLD_SEARCH_KEYWORDS = [
+    'search', 'find', 'what is', 'who is', 'when', 'where', 'latest',
+    'current', 'recent', 'news', 'today', 'tell me about'
+]
+OLD_CALC_KEYWORDS = [
+    'calculate', 'compute', 'math', '+', '-', '*', '/', 'sum', 'multiply', 'divide', '%'
+]
+
+TEMPLATES = [
+    "What is {topic}?",
+    "Tell me about {topic}",
+    "Search for {topic} news",
+    "Explain how {topic} works in simple terms",
+    "Calculate {a} * {b} + {c}",
+    "What is {a}% of {b}?",
+    "Give me a summary of recent research on {topic}",
+    "Who is the founder of {topic}",
+    "Write a short poem about {topic}",
+    "Compare {topic} with state-of-the-art alternatives",
+    "How do I divide {a} by {b}",
+]
+TOPICS = [
+    "machine learning", "retrieval augmented generation", "quantum computing",
+    "the James Webb telescope", "climate change", "OpenStreetMap", "CRISPR",
+]
+
+
+def make_corpus(n, seed=0):
+    """Build n synthetic questions from the templates"""
+    rng = random.Random(seed)
+    return [
+        rng.choice(TEMPLATES).format(
+            topic=rng.choice(TOPICS), a=rng.randint(1, 9999),
+            b=rng.randint(1, 9999), c=rng.randint(1, 99),
+        )
+        for _ in range(n)
+    ]
+
+
+def old_route(question):
+    should_search = any(keyword in question.lower() for keyword in OLD_SEARCH_KEYWORDS)
+    should_calculate = any(keyword in question.lower() for keyword in OLD_CALC_KEYWORDS)
+    return should_search, should_calculate
+
+
+def main():
+    corpus = make_corpus(N_QUERIES)
+
+    start = time.perf_counter()
+    old = [old_route(q) for q in corpus]
+    old_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new = [router.route(q) for q in corpus]
+    new_time = time.perf_counter() - start
+
+    disagreements = sum(
+        (d.search, d.calculate) != o for d, o in zip(new, old)
+    )
+
+    print(f"{N_QUERIES:,} queries\n")
+    print(f"keyword scans  : {old_time:6.2f}s ({old_time * 1e6 / N_QUERIES:5.2f} µs/query)")
+    print(f"compiled router: {new_time:6.2f}s ({new_time * 1e6 / N_QUERIES:5.2f} µs/query)")
+    print(f"\nDecisions that differ: {disagreements:,} "
+          "(word boundaries, e.g. 'summary' or 'state-of-the-art' no longer trigger the calculator)")
+
+
+if __name__ == "__main__":
+    main()
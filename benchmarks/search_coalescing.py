@@ -0,0 +1,59 @@
+"""
+Benchmark: upstream search calls per burst of simultaneous identical queries
+Run from the repository root: python -m benchmarks.search_coalescing
+"""
+import threading
+import time
+
+from coalesce import SingleFlight
+
+UPSTREAM_LATENCY = 0.5
+BURST_SIZES = [1, 10, 50, 200]
+
+
+def run_burst(search_func, n):
+    """Fire n identical queries at the same instant and wait for all of them"""
+    barrier = threading.Barrier(n)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(search_func("Latest AI news"))
+
+    threads = [threading.Thread(target=worker) for _ in range(n)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start, results
+
+
+def main():
+    print(f"Fake upstream latency: {UPSTREAM_LATENCY * 1000:.0f} ms\n")
+    print(f"{'queries':>8} | {'mode':>10} | {'upstream calls':>14} | {'wall time':>9}")
+    print("-" * 52)
+
+    for n in BURST_SIZES:
+        for mode in ["direct", "coalesced"]:
+            counter = {"calls": 0}
+            lock = threading.Lock()
+
+            def fake_serper(query):
+                with lock:
+                    counter["calls"] += 1
+                time.sleep(UPSTREAM_LATENCY)
+                return f"results for {query}"
+
+            if mode == "coalesced":
+                search_func = SingleFlight().wrap(fake_serper)
+            else:
+                search_func = fake_serper
+
+            elapsed, results = run_burst(search_func, n)
+            assert len(results) == n
+            print(f"{n:>8} | {mode:>10} | {counter['calls']:>14} | {elapsed:>8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
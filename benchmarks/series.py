@@ -0,0 +1,54 @@
+"""
+Benchmark: NumPy series operations versus the statistics module and Python loops
+Run from the repository root: python -m benchmarks.series
+"""
+import statistics
+import time
+
+import numpy as np
+
+from series import compute
+
+N_VALUES = 1_000_000
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    rng = np.random.default_rng(0)
+    array = rng.lognormal(mean=3.0, sigma=0.5, size=N_VALUES)
+    values = array.tolist()
+    starts, ends = array, array * rng.uniform(0.5, 3.0, size=N_VALUES)
+    start_list, end_list = starts.tolist(), ends.tolist()
+
+    cases = [
+        ("mean", lambda: statistics.fmean(values), lambda: compute("mean", array)),
+        ("median", lambda: statistics.median(values), lambda: compute("median", array)),
+        ("stdev", lambda: statistics.stdev(values), lambda: compute("stdev", array)),
+        ("90th percentile",
+         lambda: statistics.quantiles(values, n=10, method="inclusive")[-1],
+         lambda: compute("percentile", array, q=90)),
+        ("pct_change",
+         lambda: [(b - a) / a * 100 for a, b in zip(values, values[1:])],
+         lambda: compute("pct_change", array)),
+        ("cagr (1e6 pairs)",
+         lambda: [((e / s) ** (1 / 5) - 1) * 100 for s, e in zip(start_list, end_list)],
+         lambda: compute("cagr", (starts, ends), years=5)),
+    ]
+
+    print(f"{N_VALUES:,} values\n")
+    print(f"{'operation':<18} {'Python':>10} {'NumPy':>10} {'speedup':>9}")
+    for name, python_func, numpy_func in cases:
+        expected, python_time = timed(python_func)
+        result, numpy_time = timed(numpy_func)
+        assert np.allclose(expected, result), name
+        print(f"{name:<18} {python_time * 1000:>8.1f}ms {numpy_time * 1000:>8.1f}ms "
+              f"{python_time / numpy_time:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
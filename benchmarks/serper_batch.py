@@ -0,0 +1,49 @@
+"""
+Benchmark: one batched Serper request versus one request per query
+Run from the repository root: python -m benchmarks.serper_batch
+"""
+import time
+
+from benchmarks.fake_serper import start_server
+from serper_client import SerperClient
+
+LATENCY = 0.2  # seconds per request, as seen from a distant client
+QUERY_COUNTS = [2, 5, 20]
+
+
+def timed(handler, func, queries):
+    handler.requests = 0
+    start = time.perf_counter()
+    results = func(queries)
+    assert len(results) == len(queries)
+    return time.perf_counter() - start, handler.requests
+
+
+def main():
+    batch_server, batch_url = start_server(latency=LATENCY)
+    single_server, single_url = start_server(latency=LATENCY, batch=False)
+    batch_client = SerperClient("fake", base_url=batch_url)
+    fallback_client = SerperClient("fake", base_url=single_url)
+
+    print(f"Fake Serper with {LATENCY * 1000:.0f} ms per request\n")
+    print(f"{'queries':>8} {'sequential':>16} {'batched':>16} {'fallback':>16}")
+    try:
+        for n in QUERY_COUNTS:
+            queries = [f"product {i} pricing" for i in range(n)]
+            rows = [
+                timed(batch_server.RequestHandlerClass,
+                      lambda qs: [batch_client.run(q) for q in qs], queries),
+                timed(batch_server.RequestHandlerClass, batch_client.run_many, queries),
+                # Rejected batch, then concurrent pooled requests
+                timed(single_server.RequestHandlerClass, fallback_client.run_many, queries),
+            ]
+            print(f"{n:>8} " + " ".join(f"{t:6.2f}s {r:>3} req" for t, r in rows))
+    finally:
+        batch_client.close()
+        fallback_client.close()
+        batch_server.shutdown()
+        single_server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark: pooled SerperClient versus a fresh connection per request
+Run from the repository root: python -m benchmarks.serper_pooling
+"""
+import asyncio
+import time
+
+import requests
+
+from benchmarks.fake_serper import start_server
+from serper_client import SerperClient, format_results
+
+N_REQUESTS = 200
+
+
+def fresh_connection_search(base_url, query):
+    """What GoogleSerperAPIWrapper.run does: a new connection for every call"""
+    response = requests.post(
+        f"{base_url}/search",
+        headers={"X-API-KEY": "fake", "Content-Type": "application/json"},
+        json={"q": query},
+    )
+    response.raise_for_status()
+    return format_results(response.json())
+
+
+def main():
+    server, base_url = start_server()
+    handler = server.RequestHandlerClass
+    client = SerperClient("fake", base_url=base_url)
+
+    try:
+        handler.connections = 0
+        start = time.perf_counter()
+        for i in range(N_REQUESTS):
+            fresh_connection_search(base_url, f"query {i}")
+        fresh = time.perf_counter() - start
+        fresh_connections = handler.connections
+
+        handler.connections = 0
+        start = time.perf_counter()
+        for i in range(N_REQUESTS):
+            client.run(f"query {i}")
+        pooled = time.perf_counter() - start
+        pooled_connections = handler.connections
+
+        async def run_async():
+            return await asyncio.gather(*(client.arun(f"query {i}") for i in range(N_REQUESTS)))
+
+        start = time.perf_counter()
+        results = asyncio.run(run_async())
+        concurrent = time.perf_counter() - start
+        assert len(results) == N_REQUESTS
+    finally:
+        client.close()
+        server.shutdown()
+
+    print(f"{N_REQUESTS} searches against {base_url}\n")
+    print(f"fresh connection : {fresh * 1000 / N_REQUESTS:6.2f} ms/req, {fresh_connections} connections")
+    print(f"pooled keep-alive: {pooled * 1000 / N_REQUESTS:6.2f} ms/req, {pooled_connections} connections")
+    print(f"pooled + asyncio : {concurrent:6.2f} s total for {N_REQUESTS} concurrent searches")
+
+
+if __name__ == "__main__":
+    main()
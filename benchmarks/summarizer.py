@@ -0,0 +1,53 @@
+"""
+Benchmark: TextRank compression of web search context
+Run from the repository root: python -m benchmarks.summarizer
+"""
+import random
+import time
+
+from config import SEARCH_CONTEXT_MAX_TOKENS
+from summarizer import summarize
+from tokens import estimate_tokens
+
+N_RUNS = 200
+
+TOPICS = ["the James Webb telescope", "CRISPR gene editing", "retrieval augmented generation"]
+FACTS = [
+    "{topic} was announced in {year} after years of research.",
+    "Critics argue that {topic} is overhyped, citing costs of ${n} million.",
+    "A {year} study found {topic} improved results by {n} percent.",
+    "Researchers at {n} universities now work on {topic}.",
+    "The latest news about {topic} came out on {year}-05-{day}...",
+    "Experts expect {topic} to shape the next decade of science.",
+]
+
+
+def make_serper_output(topic, n_snippets, rng):
+    """Snippet text shaped like serper_client.format_results output"""
+    return " ".join(
+        rng.choice(FACTS).format(topic=topic, year=rng.randint(2015, 2025),
+                                 n=rng.randint(2, 900), day=rng.randint(10, 28))
+        for _ in range(n_snippets)
+    )
+
+
+def main():
+    rng = random.Random(0)
+    docs = [(topic, make_serper_output(topic, rng.randint(10, 40), rng))
+            for topic in TOPICS for _ in range(N_RUNS // len(TOPICS))]
+
+    before = after = 0
+    start = time.perf_counter()
+    for topic, text in docs:
+        before += estimate_tokens(text)
+        after += estimate_tokens(summarize(text, SEARCH_CONTEXT_MAX_TOKENS, query=f"latest on {topic}"))
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(docs)} search results, budget {SEARCH_CONTEXT_MAX_TOKENS} tokens\n")
+    print(f"search output : {before:>7,} (~{before // len(docs)} per prompt)")
+    print(f"after TextRank: {after:>7,} (~{after // len(docs)} per prompt, {1 - after / before:.0%} saved)")
+    print(f"time          : {elapsed * 1000 / len(docs):.2f} ms per summary")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,424 @@
+"""
+Persistent on-disk caches for the Research Agent
+Backed by SQLite so the CLI and the Streamlit app share the same entries
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from config import (
+    SEARCH_CACHE_PATH,
+    SEARCH_CACHE_MAX_ENTRIES,
+    SEARCH_CACHE_TTL_FRESH,
+    SEARCH_CACHE_TTL_DEFAULT,
+    SEARCH_CACHE_TTL_EMPTY,
+    SEARCH_CACHE_FRESH_KEYWORDS,
+    RESPONSE_CACHE_PATH,
+    RESPONSE_CACHE_ENABLED,
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_TTL,
+    SEARCH_CANONICALIZE,
+)
+from canonical import canonicalize
+from serper_client import NO_RESULTS
+
+
+class DiskCache:
+    """Key/value store with per-entry TTL and size-bounded LRU eviction"""
+
+    def __init__(self, path, table="cache", max_entries=1000):
+        """
+        Open (or create) a cache table
+
+        Args:
+            path: SQLite file path (use ":memory:" for a throwaway cache)
+            table: Table name, so several caches can share one file
+            max_entries: Entries kept before least recently used ones are evicted
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table} (accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        """
+        Look up a key
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None if missing or expired
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or row[1] <= now:
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key, value, ttl):
+        """
+        Store a value
+
+        Args:
+            key: Cache key
+            value: String value to store
+            ttl: Time-to-live in seconds
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, value, now + ttl, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def items(self):
+        """
+        Unexpired entries
+
+        Returns:
+            List of (key, value, expires_at) tuples
+        """
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT key, value, expires_at FROM {self.table} WHERE expires_at > ?", (time.time(),)
+            ).fetchall()
+
+    def ttl_remaining(self, key):
+        """
+        Seconds until a key expires
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Remaining time-to-live, or None if the key is missing or expired
+        """
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[0] <= time.time():
+            return None
+        return row[0] - time.time()
+
+    def _evict(self, now):
+        """Drop expired entries, then the least recently used ones above max_entries"""
+        self._conn.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (now,))
+        count = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f" SELECT key FROM {self.table} ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,),
+            )
+
+    def clear(self):
+        """Remove every entry and reset the counters"""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with hits, misses, hit_rate and entries
+        """
+        with self._lock:
+            entries = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+        }
+
+
+# Pre-compiled matcher for time-sensitive queries
+_FRESH_PATTERN = re.compile(
+    r"\b(?:" + "|".join(re.escape(k) for k in SEARCH_CACHE_FRESH_KEYWORDS) + r")\b"
+)
+
+
+def normalize_query(query):
+    """
+    Normalize a search query into a cache key
+
+    Args:
+        query: Raw query text
+
+    Returns:
+        Lowercased query with collapsed whitespace and no trailing punctuation
+    """
+    return " ".join(query.lower().split()).strip(" ?!.")
+
+
+def search_key(query):
+    """
+    Cache key of a search query
+
+    Args:
+        query: Raw query text
+
+    Returns:
+        Canonical key (see canonical.canonicalize) when SEARCH_CANONICALIZE
+        is on, else the normalized query
+    """
+    if SEARCH_CANONICALIZE:
+        return canonicalize(query).key
+    return normalize_query(query)
+
+
+def split_queries(query):
+    """
+    Queries in a WebSearch input
+
+    Args:
+        query: One query, a list, or several separated by ';' or newlines
+
+    Returns:
+        List of non-empty queries
+    """
+    if isinstance(query, str):
+        query = query.replace("\n", ";").split(";")
+    return [q.strip() for q in query if q.strip()]
+
+
+def ttl_for_query(query):
+    """
+    Pick a time-to-live for a query based on how time-sensitive it looks
+
+    Args:
+        query: Normalized query text
+
+    Returns:
+        TTL in seconds
+    """
+    if _FRESH_PATTERN.search(query):
+        return SEARCH_CACHE_TTL_FRESH
+    return SEARCH_CACHE_TTL_DEFAULT
+
+
+def ttl_for_result(query, result):
+    """
+    Pick a time-to-live for a search result
+
+    Args:
+        query: Raw query text
+        result: Result text the search returned
+
+    Returns:
+        SEARCH_CACHE_TTL_EMPTY for an empty or no-results reply, else
+        ttl_for_query() of the query
+    """
+    if not result or not result.strip() or result == NO_RESULTS:
+        return SEARCH_CACHE_TTL_EMPTY
+    # Decided on the query: a sorted key can split "this week"
+    return ttl_for_query(normalize_query(query))
+
+
+class SearchCache(DiskCache):
+    """Cache of WebSearch results keyed by canonical (or normalized) query"""
+
+    def __init__(self, path=SEARCH_CACHE_PATH, max_entries=SEARCH_CACHE_MAX_ENTRIES):
+        super().__init__(path, table="search_results", max_entries=max_entries)
+
+    def wrap(self, search_func, key_func=search_key):
+        """
+        Wrap a search function so results are served from the cache when fresh
+
+        Args:
+            search_func: Callable taking a query string and returning a string
+            key_func: Maps a query to its cache key
+
+        Returns:
+            Cached version of search_func
+        """
+        def cached_search(query):
+            key = key_func(query)
+            result = self.get(key)
+            if result is not None:
+                return result
+
+            result = search_func(query)
+            self.set(key, result, ttl_for_result(query, result))
+            return result
+
+        return cached_search
+
+    def wrap_many(self, search_many_func, key_func=search_key):
+        """
+        Wrap a multi-query search function so only uncached queries are sent
+
+        Args:
+            search_many_func: Callable taking a list of queries and returning
+                a list of result strings
+            key_func: Maps a query to its cache key
+
+        Returns:
+            Cached version of search_many_func
+        """
+        def cached_search_many(queries):
+            keys = [key_func(q) for q in queries]
+            results, missing = {}, {}
+            for key, query in zip(keys, queries):
+                if key in results or key in missing:
+                    continue
+                result = self.get(key)
+                if result is None:
+                    missing[key] = query
+                else:
+                    results[key] = result
+
+            if missing:
+                for key, result in zip(missing, search_many_func(list(missing.values()))):
+                    self.set(key, result, ttl_for_result(missing[key], result))
+                    results[key] = result
+            return [results[key] for key in keys]
+
+        return cached_search_many
+
+
+_search_cache = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache():
+    """
+    Get the process-wide search cache
+
+    Returns:
+        Shared SearchCache instance
+    """
+    global _search_cache
+    with _search_cache_lock:
+        if _search_cache is None:
+            _search_cache = SearchCache()
+        return _search_cache
+
+
+def response_cache_enabled(generation_config):
+    """
+    Whether answers generated with a config may be served from the response cache
+
+    Args:
+        generation_config: Generation config dict of the model
+
+    Returns:
+        True with temperature 0 (deterministic answers) or RESPONSE_CACHE_ENABLED
+    """
+    return RESPONSE_CACHE_ENABLED or generation_config.get("temperature") == 0
+
+
+class ResponseCache(DiskCache):
+    """Cache of model answers keyed by model, generation config and prompt"""
+
+    def __init__(self, path=RESPONSE_CACHE_PATH, max_entries=RESPONSE_CACHE_MAX_ENTRIES):
+        super().__init__(path, table="llm_responses", max_entries=max_entries)
+
+    @staticmethod
+    def key(model_name, generation_config, prompt):
+        """
+        Cache key of a request
+
+        Args:
+            model_name: Model name (with or without the "models/" prefix)
+            generation_config: Generation config dict
+            prompt: Final prompt text, tool results included
+
+        Returns:
+            "<model>:<sha256 of config and prompt>"
+        """
+        digest = hashlib.sha256()
+        digest.update(json.dumps(generation_config, sort_keys=True).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(prompt.encode("utf-8"))
+        return f"{model_name.split('/')[-1]}:{digest.hexdigest()}"
+
+    def ttl_for_answer(self, question, searched, queries=()):
+        """
+        Time-to-live of an answer
+
+        An answer built on web search results expires with the first of
+        them: each query's search cache entry, or ttl_for_query() when it
+        is not cached. Other answers last RESPONSE_CACHE_TTL.
+
+        Args:
+            question: User's question
+            searched: Whether the prompt included web search results
+            queries: Queries WebSearch was called with; results reused from
+                earlier turns have none, and the question stands in for them
+
+        Returns:
+            TTL in seconds
+        """
+        if not searched:
+            return RESPONSE_CACHE_TTL
+        cache = get_search_cache()
+        ttls = []
+        for query in queries or [question]:
+            remaining = cache.ttl_remaining(search_key(query))
+            ttls.append(remaining if remaining is not None else ttl_for_query(normalize_query(query)))
+        return min(ttls)
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """
+    Get the process-wide response cache
+
+    Returns:
+        Shared ResponseCache instance
+    """
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+        return _response_cache
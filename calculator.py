@@ -0,0 +1,460 @@
+"""
+Safe calculator engine for the Research Agent
+Evaluates arithmetic through a whitelisted AST instead of eval(), with bounded cost
+"""
+import ast
+import math
+import operator
+import re
+from functools import lru_cache
+
+from config import (
+    CALC_MAX_LENGTH,
+    CALC_MAX_NODES,
+    CALC_MAX_EXPONENT,
+    CALC_MAX_DIGITS,
+    CALC_CACHE_SIZE,
+)
+
+
+class CalculationError(ValueError):
+    """Raised for expressions that are invalid, unsupported or too expensive"""
+
+
+# log2(10): converts bit lengths to decimal digit counts
+_BITS_PER_DIGIT = math.log2(10)
+
+
+def _check_int(value):
+    """Reject integers with more than CALC_MAX_DIGITS digits"""
+    if isinstance(value, int) and value.bit_length() / _BITS_PER_DIGIT > CALC_MAX_DIGITS:
+        raise CalculationError(f"Result exceeds {CALC_MAX_DIGITS} digits")
+    return value
+
+
+def _safe_pow(base, exponent):
+    """Power with limits on the exponent and on the size of integer results"""
+    if abs(exponent) > CALC_MAX_EXPONENT:
+        raise CalculationError(f"Exponent {exponent} exceeds the limit of {CALC_MAX_EXPONENT}")
+    # Estimate the digits of base**exponent before computing it
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0 and abs(base) > 1:
+        if exponent * math.log10(abs(base)) > CALC_MAX_DIGITS:
+            raise CalculationError(f"Result exceeds {CALC_MAX_DIGITS} digits")
+    return operator.pow(base, exponent)
+
+
+def _safe_mul(left, right):
+    """Multiplication that refuses to build oversized integers"""
+    if isinstance(left, int) and isinstance(right, int):
+        if (left.bit_length() + right.bit_length()) / _BITS_PER_DIGIT > CALC_MAX_DIGITS + 1:
+            raise CalculationError(f"Result exceeds {CALC_MAX_DIGITS} digits")
+    return operator.mul(left, right)
+
+
+def _safe_factorial(n):
+    """Factorial limited to results within CALC_MAX_DIGITS"""
+    if not float(n).is_integer() or n < 0:
+        raise CalculationError("factorial() needs a non-negative integer")
+    n = int(n)
+    if n > 0 and math.lgamma(n + 1) / math.log(10) > CALC_MAX_DIGITS:
+        raise CalculationError(f"Result exceeds {CALC_MAX_DIGITS} digits")
+    return math.factorial(n)
+
+
+BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: _safe_mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: _safe_pow,
+}
+
+UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+FUNCTIONS = {
+    "abs": abs,
+    "round": round,
+    "min": min,
+    "max": max,
+    "sqrt": math.sqrt,
+    "exp": math.exp,
+    "log": math.log,
+    "log10": math.log10,
+    "log2": math.log2,
+    "sin": math.sin,
+    "cos": math.cos,
+    "tan": math.tan,
+    "floor": math.floor,
+    "ceil": math.ceil,
+    "factorial": _safe_factorial,
+}
+
+CONSTANTS = {
+    "pi": math.pi,
+    "e": math.e,
+}
+
+
+def _compile(node):
+    """
+    Turn a validated AST node into a zero-argument closure
+
+    Args:
+        node: ast node
+
+    Returns:
+        Callable producing the node's value
+    """
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise CalculationError(f"Unsupported literal: {node.value!r}")
+        value = _check_int(node.value)
+        return lambda: value
+
+    if isinstance(node, ast.Name):
+        if node.id not in CONSTANTS:
+            raise CalculationError(f"Unknown name: {node.id}")
+        value = CONSTANTS[node.id]
+        return lambda: value
+
+    if isinstance(node, ast.BinOp):
+        op = BINARY_OPERATORS.get(type(node.op))
+        if op is None:
+            raise CalculationError(f"Unsupported operator: {type(node.op).__name__}")
+        left, right = _compile(node.left), _compile(node.right)
+        return lambda: _check_int(op(left(), right()))
+
+    if isinstance(node, ast.UnaryOp):
+        op = UNARY_OPERATORS.get(type(node.op))
+        if op is None:
+            raise CalculationError(f"Unsupported operator: {type(node.op).__name__}")
+        operand = _compile(node.operand)
+        return lambda: op(operand())
+
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS or node.keywords:
+            raise CalculationError("Unsupported function call")
+        func = FUNCTIONS[node.func.id]
+        args = [_compile(arg) for arg in node.args]
+        return lambda: _check_int(func(*(arg() for arg in args)))
+
+    raise CalculationError(f"Unsupported syntax: {type(node).__name__}")
+
+
+@lru_cache(maxsize=CALC_CACHE_SIZE)
+def compile_expression(expression):
+    """
+    Parse, validate and compile an expression (cached)
+
+    "^" is read as exponentiation, as users mean it in chat.
+
+    Args:
+        expression: Arithmetic expression string
+
+    Returns:
+        Zero-argument callable that evaluates the expression
+    """
+    if len(expression) > CALC_MAX_LENGTH:
+        raise CalculationError(f"Expression longer than {CALC_MAX_LENGTH} characters")
+
+    try:
+        tree = ast.parse(expression.replace("^", "**").strip(), mode="eval")
+    except SyntaxError:
+        raise CalculationError(f"Invalid expression: {expression!r}") from None
+
+    if sum(1 for _ in ast.walk(tree)) > CALC_MAX_NODES:
+        raise CalculationError(f"Expression has more than {CALC_MAX_NODES} nodes")
+
+    return _compile(tree.body)
+
+
+def evaluate(expression):
+    """
+    Evaluate an arithmetic expression safely
+
+    Args:
+        expression: Arithmetic expression string, e.g. "(25 + 75) * 3"
+
+    Returns:
+        int or float result
+
+    Raises:
+        CalculationError: invalid, unsupported or too expensive expression
+        ZeroDivisionError, OverflowError, ValueError: math errors
+    """
+    return compile_expression(expression)()
+
+
+# ============================================================================
+# EXPRESSION EXTRACTION
+# ============================================================================
+
+# Multipliers for magnitude suffixes ("1.2M", "3 billion")
+MAGNITUDES = {
+    "k": 10**3, "thousand": 10**3,
+    "m": 10**6, "mm": 10**6, "million": 10**6,
+    "b": 10**9, "bn": 10**9, "billion": 10**9,
+    "t": 10**12, "trillion": 10**12,
+}
+
+# Phrase -> (token kind, value); longest phrases are matched first
+WORD_TOKENS = {
+    "plus": ("op", "+"),
+    "added to": ("op", "+"),
+    "minus": ("op", "-"),
+    "less": ("op", "-"),
+    "times": ("op", "*"),
+    "multiplied by": ("op", "*"),
+    "x": ("op", "*"),
+    "×": ("op", "*"),
+    "divided by": ("op", "/"),
+    "÷": ("op", "/"),
+    "over": ("op", "/"),
+    "to the power of": ("op", "**"),
+    "raised to": ("op", "**"),
+    "raised to the power of": ("op", "**"),
+    "mod": ("op", "%"),
+    "modulo": ("op", "%"),
+    "squared": ("post", "**2"),
+    "cubed": ("post", "**3"),
+    "percent": ("pct", None),
+    "per cent": ("pct", None),
+    "%": ("pct", None),
+    "of": ("of", None),
+    "by": ("by", None),
+    "divide": ("verb", "/"),
+    "multiply": ("verb", "*"),
+    "square root of": ("func", "sqrt"),
+    "sqrt": ("func", "sqrt"),
+}
+
+_NUMBER = r"[$€£]?(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?|\.\d+"
+_MAGNITUDE = "|".join(sorted(MAGNITUDES, key=len, reverse=True))
+_WORDS = "|".join(
+    re.escape(w) + (r"\b" if w[-1].isalpha() else "")
+    for w in sorted(WORD_TOKENS, key=len, reverse=True)
+)
+
+# One compiled tokenizer: numbers (with thousands separators and magnitude
+# suffixes), operator words, symbols, and everything else as a break
+_TOKEN_PATTERN = re.compile(
+    rf"(?P<num>{_NUMBER})(?:\s*(?P<mag>{_MAGNITUDE})\b)?"
+    rf"|(?P<word>{_WORDS})"
+    r"|(?P<sym>\*\*|[-+*/^()])"
+    r"|(?P<other>[^\s\d]+)",
+    re.IGNORECASE,
+)
+
+
+def _tokenize(text):
+    """Yield (kind, value) tokens; unrecognized words become 'break' tokens"""
+    for match in _TOKEN_PATTERN.finditer(text):
+        if match.group("num"):
+            number = match.group("num").lstrip("$€£").replace(",", "")
+            magnitude = match.group("mag")
+            if magnitude:
+                value = float(number) * MAGNITUDES[magnitude.lower()]
+                number = str(int(value)) if value.is_integer() else repr(value)
+            yield "num", number
+        elif match.group("word"):
+            yield WORD_TOKENS[" ".join(match.group("word").lower().split())]
+        elif match.group("sym"):
+            sym = match.group("sym")
+            if sym == "(":
+                yield "lp", sym
+            elif sym == ")":
+                yield "rp", sym
+            else:
+                yield "op", "**" if sym == "^" else sym
+        else:
+            yield "break", None
+
+
+def extract_numbers(text):
+    """
+    Find every number in a text, in order
+
+    Handles thousands separators, currency signs, magnitude suffixes ("1.2M")
+    and leading minus signs.
+
+    Args:
+        text: Free text
+
+    Returns:
+        List of floats
+    """
+    numbers = []
+    kinds = [None, None]
+    for kind, value in _tokenize(text):
+        if kind == "num":
+            number = float(value)
+            # "-5" is negative unless the minus follows a number ("10 - 5")
+            if kinds[-1] == "-" and kinds[-2] != "num":
+                number = -number
+            numbers.append(number)
+        kinds = [kinds[-1], value if kind == "op" else kind]
+    return numbers
+
+
+# "20% less than 500" -> "500 - 20% of 500"; "5 more than 10" -> "10 + 5"
+_OPERAND = rf"(?:{_NUMBER})(?:\s*(?:{_MAGNITUDE})\b)?"
+_RELATIVE_PATTERN = re.compile(
+    rf"(?P<x>{_OPERAND})\s*(?P<pct>%|percent\b|per cent\b)?\s*(?P<rel>less|fewer|more)\s+than\s+(?P<y>{_OPERAND})",
+    re.IGNORECASE,
+)
+# "Is 5 less than 10?" compares rather than computes
+_COMPARISON_START = re.compile(r"(?:^|[.!?])\s*(?:is|are|was|were)\s*$", re.IGNORECASE)
+
+_OPERATORS = ("+", "-", "*", "/", "**", "%")
+
+
+def _relative(match):
+    """Rewrite "X [%] less/more than Y" as arithmetic on Y"""
+    if _COMPARISON_START.search(match.string[:match.start()]):
+        return match.group(0)
+    op = "+" if match.group("rel").lower() == "more" else "-"
+    x, y = match.group("x"), match.group("y")
+    if match.group("pct"):
+        return f"{y} {op} {x}% of {y}"
+    return f"{y} {op} {x}"
+
+
+class _ExpressionBuilder:
+    """Accumulates tokens into one candidate expression"""
+
+    def __init__(self):
+        self.parts = []
+        self.depth = 0
+        self.expect_operand = True
+        self.has_operation = False
+        self.last_was_percent = False
+        self.pending_func = None
+        self.pending_verb = None
+
+    def add_operand(self, text):
+        if self.pending_func:
+            text = f"{self.pending_func}({text})"
+            self.pending_func = None
+            self.has_operation = True
+        self.parts.append(text)
+        self.expect_operand = False
+        self.last_was_percent = False
+
+    def result(self):
+        parts = list(self.parts)
+        # Drop dangling operators and close open parentheses
+        while parts and (parts[-1] in _OPERATORS or parts[-1].endswith("(")):
+            if parts.pop().endswith("("):
+                self.depth -= 1
+        # What is left must still compute something, not be a lone operand
+        # ("20% less than" trimmed to "(20 / 100)")
+        has_operation = any(
+            p in _OPERATORS and i > 0 and parts[i - 1] not in _OPERATORS and not parts[i - 1].endswith("(")
+            for i, p in enumerate(parts)
+        ) or any(p.startswith("sqrt(") or p.endswith(("**2", "**3")) for p in parts)
+        if not self.has_operation or not has_operation:
+            return None
+        expression = " ".join(parts) + ")" * self.depth
+        return expression.replace("( ", "(").replace(" )", ")")
+
+
+def extract_expressions(text):
+    """
+    Find every arithmetic expression in a question
+
+    Understands symbols and words ("times", "divided by", "squared",
+    "to the power of"), percentages ("15% of 2500" -> "(15 / 100) * 2500"),
+    "20% less than 500" / "5 more than 10", thousands separators and
+    magnitude suffixes ("1.2M"). A lone number is never an expression.
+
+    Args:
+        text: User's question
+
+    Returns:
+        List of Python-syntax expressions, in order of appearance and
+        validated by the calculator
+    """
+    text = _RELATIVE_PATTERN.sub(_relative, text)
+    expressions = []
+    builder = _ExpressionBuilder()
+
+    def flush():
+        nonlocal builder
+        expression = builder.result()
+        if expression and expression not in expressions:
+            try:
+                compile_expression(expression)
+                expressions.append(expression)
+            except CalculationError:
+                pass
+        builder = _ExpressionBuilder()
+
+    for kind, value in _tokenize(text):
+        if builder.expect_operand:
+            if kind == "num":
+                builder.add_operand(value)
+            elif kind == "lp":
+                builder.parts.append(f"{builder.pending_func or ''}(")
+                builder.has_operation |= bool(builder.pending_func)
+                builder.pending_func = None
+                builder.depth += 1
+            elif kind == "func":
+                builder.pending_func = value
+            elif kind == "op" and value in ("+", "-") and not builder.pending_func:
+                builder.parts.append(value)
+            elif kind == "verb" and not builder.parts:
+                # "divide 1,000 by 8": the operator arrives with "by"
+                builder.pending_verb = value
+            elif kind == "of" and not builder.parts:
+                continue
+            else:
+                flush()
+                if kind == "func":
+                    builder.pending_func = value
+                elif kind == "verb":
+                    builder.pending_verb = value
+            continue
+
+        # After an operand
+        if kind == "op":
+            builder.parts.append(value)
+            builder.expect_operand = True
+            builder.has_operation = True
+        elif kind == "by" and builder.pending_verb:
+            builder.parts.append(builder.pending_verb)
+            builder.pending_verb = None
+            builder.expect_operand = True
+            builder.has_operation = True
+        elif kind == "pct":
+            # A bare percentage ("a 15% tip") is not a calculation by itself
+            builder.parts[-1] = f"({builder.parts[-1]} / 100)"
+            builder.last_was_percent = True
+        elif kind == "post":
+            builder.parts[-1] = f"{builder.parts[-1]}{value}"
+            builder.has_operation = True
+        elif kind == "of" and (builder.last_was_percent or builder.parts[-2:-1] == ["/"]):
+            builder.parts.append("*")
+            builder.expect_operand = True
+            builder.has_operation = True
+        elif kind == "rp" and builder.depth > 0:
+            builder.parts.append(")")
+            builder.depth -= 1
+        else:
+            flush()
+            if kind == "num":
+                builder.add_operand(value)
+            elif kind == "lp":
+                builder.parts.append("(")
+                builder.depth += 1
+            elif kind == "func":
+                builder.pending_func = value
+            elif kind == "verb":
+                builder.pending_verb = value
+
+    flush()
+    return expressions
@@ -0,0 +1,234 @@
+"""
+Query canonicalization for the Research Agent
+Turns a user prompt into a keyword search query and a cache key that ignores word order except around "from"/"to"/"than"
+"""
+import re
+from collections import defaultdict
+from functools import lru_cache
+from typing import NamedTuple
+
+from config import CANONICAL_MAX_KEYPHRASES, SEARCH_CACHE_FRESH_KEYWORDS
+from summarizer import STOPWORDS
+
+# Request wrappers stripped from the start of a query, including the
+# router's search triggers; longest first so "search the web for" wins
+# over "search for". A bare "search" or "find" stays: it may be the topic
+FILLER_PHRASES = [
+    "can you", "could you", "would you", "if you could", "if you can", "i want to know",
+    "i would like to know", "i'd like to know", "i wonder", "i was wondering", "do you know",
+    "let me know", "tell me about", "tell me", "give me", "show me", "search the web for",
+    "search the internet for", "search online for", "search for", "look up", "find out",
+    "find me", "information about", "information on", "info about",
+    "info on", "details about", "details on", "explain", "describe", "what is", "what's",
+    "what are", "what was", "what were", "who is", "who's", "who are",
+]
+_FILLER_PATTERN = re.compile(
+    r"^(?:[\s,.:!?]*(?:" + "|".join(
+        re.escape(p) for p in sorted(FILLER_PHRASES, key=len, reverse=True)
+    ) + r")\b)+"
+)
+
+# Politeness stripped anywhere
+_POLITE_PATTERN = re.compile(r"\b(?:please|kindly|thanks|thank you)\b")
+
+# Words that change what is asked or how fresh the answer must be are kept
+_KEEP = frozenset(["who", "when", "where", "why", "how", "not", "no"]) | frozenset(
+    w for k in SEARCH_CACHE_FRESH_KEYWORDS for w in k.split()
+)
+# Words that say which way a query goes ("flights from X to Y", "X faster
+# than Y"); they stay inside keyphrases, whose word order the key keeps
+DIRECTION_WORDS = frozenset(["from", "to", "than", "into", "vs", "versus"])
+_STOPWORDS = STOPWORDS - _KEEP - DIRECTION_WORDS
+
+# Words (with "gpt-4", "3.5", "c++" kept whole) and phrase-breaking punctuation
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[.\-][a-z0-9]+)*[+#]*|[,;:!?()\"]")
+
+
+# Attributes a comparison asks about ("compare X and Y pricing")
+COMPARISON_ATTRIBUTES = frozenset("""
+price prices pricing cost costs fees plans features specs specifications performance
+speed benchmarks battery camera reviews ratings salary salaries population gdp
+size market share revenue sales stock valuation safety reliability pros cons
+""".split())
+# "latest news on X vs Y": words like these before a preposition apply to every entity
+_PREFIX_WORDS = COMPARISON_ATTRIBUTES | frozenset(
+    w for k in SEARCH_CACHE_FRESH_KEYWORDS for w in k.split()
+) | frozenset(["the", "a"])
+_PREFIX_PREPOSITIONS = frozenset(["on", "about", "of", "for", "regarding"])
+# "How fast is X vs Y": a question opener up to its last stopword is shared too
+_QUESTION_OPENERS = frozenset([
+    "how", "what", "which", "why", "who", "where", "when", "is", "are", "does", "do", "can", "should", "will",
+])
+# "X vs Y for web servers": a phrase from one of these on applies to every entity
+_SUFFIX_PREPOSITIONS = frozenset(["for", "in", "on", "at", "with", "during", "under", "when"])
+_COMPARE_PATTERN = re.compile(
+    r"^\s*(?:compare|comparison of|comparing|difference between|differences between)\s+(.+?)[\s?!.]*$",
+    re.IGNORECASE,
+)
+
+
+def _names_stopword(query):
+    """
+    Whether a stopword is capitalized mid-sentence, i.e. part of a name
+    ("the movie Her", "The Who"); Title Case queries, with no stopword in
+    lowercase, don't count
+    """
+    words = re.findall(r"[A-Za-z']+|[.!?]", query)
+    if not any(w[0].islower() and w in _STOPWORDS for w in words):
+        return False
+    sentence_start = True
+    for word in words:
+        if word in ".!?":
+            sentence_start = True
+            continue
+        if not sentence_start and word != "I" and word[0].isupper() and word.lower() in _STOPWORDS:
+            return True
+        sentence_start = False
+    return False
+
+
+class Canonical(NamedTuple):
+    """Canonical form of a search query"""
+
+    query: str
+    key: str
+    phrases: tuple
+
+
+def keyphrases(tokens):
+    """
+    Rank candidate phrases RAKE-style
+
+    Candidates are runs of tokens between stopwords and punctuation. Each
+    word scores degree / frequency over the candidates, and a phrase
+    scores the sum of its words.
+
+    Args:
+        tokens: Lowercased tokens, punctuation included
+
+    Returns:
+        List of (phrase tuple, score), in order of first appearance
+    """
+    phrases, current = [], []
+    for token in tokens + [","]:
+        if token in _STOPWORDS or not token[0].isalnum():
+            # A direction word needs words on both sides
+            while current and current[-1] in DIRECTION_WORDS:
+                current.pop()
+            while current and current[0] in DIRECTION_WORDS:
+                current.pop(0)
+            if current:
+                phrases.append(tuple(current))
+            current = []
+        else:
+            current.append(token)
+
+    frequency, degree = defaultdict(int), defaultdict(int)
+    for phrase in phrases:
+        for word in phrase:
+            frequency[word] += 1
+            degree[word] += len(phrase)
+
+    ranked, seen = [], set()
+    for phrase in phrases:
+        if phrase not in seen:
+            seen.add(phrase)
+            ranked.append((phrase, sum(degree[w] / frequency[w] for w in phrase)))
+    return ranked
+
+
+@lru_cache(maxsize=1024)
+def canonicalize(query, max_phrases=CANONICAL_MAX_KEYPHRASES):
+    """
+    Canonicalize a search query
+
+    Lowercases, strips leading request phrases ("tell me about",
+    "search for") and politeness ("please"), drops stopwords and keeps
+    the top keyphrases in their original order. The cache key is the sorted set of their words, so
+    "What is RAG?", "what is rag" and "tell me about RAG please" share it.
+    Phrases with a direction word ("from new york to london") go into the
+    key whole, so a reverse trip gets its own entry.
+
+    Args:
+        query: Raw query text
+        max_phrases: Keyphrases kept from long queries
+
+    Returns:
+        Canonical(query, key, phrases); query and key fall back to the
+        lowercased text when nothing is left or a dropped stopword is part
+        of a name ("the movie Her")
+    """
+    text = _POLITE_PATTERN.sub(" , ", query.lower().replace("’", "'")).strip()
+    text = re.sub(r"'s\b", "", _FILLER_PATTERN.sub("", text))
+    ranked = keyphrases(_TOKEN_PATTERN.findall(text))
+
+    if len(ranked) > max_phrases:
+        kept = {p for p, _ in sorted(ranked, key=lambda r: -r[1])[:max_phrases]}
+        ranked = [(p, s) for p, s in ranked if p in kept]
+
+    phrases = tuple(" ".join(p) for p, _ in ranked)
+    if not phrases or _names_stopword(query):
+        fallback = " ".join(query.lower().split()).strip(" ?!.")
+        return Canonical(fallback, fallback, ())
+    parts = {w for p, _ in ranked if DIRECTION_WORDS.isdisjoint(p) for w in p}
+    parts |= {" ".join(p) for p, _ in ranked if not DIRECTION_WORDS.isdisjoint(p)}
+    return Canonical(" ".join(phrases), " ".join(sorted(parts)), phrases)
+
+
+def decompose(question):
+    """
+    Split a comparison into one search query per entity
+
+    "Compare Python and Rust performance" -> ["Python performance",
+    "Rust performance"]; "AWS vs Azure vs GCP pricing" -> one query for
+    each. Context around the entities is shared by all of them: leading
+    "latest news on" / "price of" / "how fast is", trailing
+    COMPARISON_ATTRIBUTES words and a trailing "for web servers". Only
+    named things are split: "Python 2 vs 3" and "5 vs 7" are not.
+
+    Args:
+        question: User's question
+
+    Returns:
+        List of queries; [question] when it isn't a comparison
+    """
+    match = _COMPARE_PATTERN.match(question)
+    if match:
+        entities = re.split(r"\s*,\s*|\s+(?:and|with|to|vs\.?|versus)\s+", match.group(1))
+        max_words = 6
+    else:
+        entities = re.split(r"\s+(?:vs\.?|versus)\s+", question.strip(" ?!."))
+        max_words = 4
+    entities = [e.strip(" ?!.,") for e in entities if e.strip(" ?!.,")]
+    if len(entities) < 2:
+        return [question]
+    # A version or quantity after "vs" belongs to the subject before it
+    if any(e.split()[0][0].isdigit() for e in entities[1:]):
+        return [question]
+
+    # Attribute or freshness words before a preposition in the first entity
+    # apply to all of them; "Bank of America" has no such prefix. So does a
+    # question opener up to its last stopword ("how fast is")
+    first = entities[0].split()
+    head = []
+    for i, word in enumerate(first[:-1]):
+        if word.lower() in _PREFIX_PREPOSITIONS and all(w.lower() in _PREFIX_WORDS for w in first[:i]):
+            head = first[:i + 1]
+    if not head and first[0].lower() in _QUESTION_OPENERS:
+        stops = [i for i, w in enumerate(first[:-1]) if w.lower() in STOPWORDS]
+        head = first[:stops[-1] + 1]
+    entities[0] = " ".join(first[len(head):])
+
+    # A phrase from a preposition on and attribute words after the last
+    # entity apply to all of them
+    last = entities[-1].split()
+    cut = next((i for i, w in enumerate(last) if i and w.lower() in _SUFFIX_PREPOSITIONS), len(last))
+    last, tail = last[:cut], last[cut:]
+    while len(last) > 1 and last[-1].lower() in COMPARISON_ATTRIBUTES:
+        tail.insert(0, last.pop())
+    entities[-1] = " ".join(last)
+    if any(len(e.split()) > max_words or not re.search(r"[a-z]", e, re.IGNORECASE) for e in entities):
+        return [question]
+    prefix = f"{' '.join(head)} " if head else ""
+    suffix = f" {' '.join(tail)}" if tail else ""
+    return [f"{prefix}{entity}{suffix}" for entity in entities]
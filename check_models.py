@@ -1,29 +1,29 @@
 """
 Check available Google Gemini models with your API key
 """
-import google.generativeai as genai
+import sys
 from config import GOOGLE_API_KEY
+from model_registry import get_models
 
 print("🔍 Checking available models with your API key...\n")
 
 try:
-    # Configure API
-    genai.configure(api_key=GOOGLE_API_KEY)
-    
     # List all available models
     print("=" * 70)
     print("AVAILABLE MODELS:")
     print("=" * 70)
     
-    models = genai.list_models()
+    # Pass --refresh to bypass the on-disk model registry
+    models = get_models(GOOGLE_API_KEY, refresh='--refresh' in sys.argv)
     content_gen_models = []
     
     for model in models:
-        if 'generateContent' in model.supported_generation_methods:
-            content_gen_models.append(model.name)
-            print(f"\n✅ {model.name}")
-            print(f"   Display Name: {model.display_name}")
-            print(f"   Description: {model.description[:100] if model.description else 'N/A'}...")
+        if 'generateContent' in model["supported_generation_methods"]:
+            content_gen_models.append(model["name"])
+            print(f"\n✅ {model['name']}")
+            print(f"   Display Name: {model['display_name']}")
+            print(f"   Description: {model['description'][:100] if model['description'] else 'N/A'}...")
+            print(f"   Token Limits: {model['input_token_limit']} in / {model['output_token_limit']} out")
     
     print("\n" + "=" * 70)
     print(f"TOTAL: {len(content_gen_models)} models support content generation")
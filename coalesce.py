@@ -0,0 +1,104 @@
+"""
+Single-flight request coalescing for the Research Agent
+Concurrent identical calls share one in-flight upstream request
+"""
+import threading
+
+from cache import normalize_query
+
+
+class _Call:
+    """An in-flight upstream call and the waiters sharing it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share the same key"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.upstream_calls = 0
+        self.coalesced_calls = 0
+
+    def do(self, key, func, *args):
+        """
+        Run func(*args) unless a call with the same key is already in flight,
+        in which case wait for it and return its result
+
+        Args:
+            key: Deduplication key
+            func: Callable performing the upstream request
+            *args: Arguments passed to func
+
+        Returns:
+            Result of the (possibly shared) call; its exception is re-raised
+            in every waiter
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced_calls += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.upstream_calls += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+    def wrap(self, func, key_func=normalize_query):
+        """
+        Wrap a single-argument function so concurrent identical calls are coalesced
+
+        Args:
+            func: Callable taking one argument (e.g. a search query)
+            key_func: Maps the argument to a deduplication key
+
+        Returns:
+            Coalesced version of func
+        """
+        def coalesced(arg):
+            return self.do(key_func(arg), func, arg)
+
+        return coalesced
+
+    def stats(self):
+        """
+        Get coalescing statistics
+
+        Returns:
+            Dictionary with upstream_calls, coalesced_calls and in_flight
+        """
+        with self._lock:
+            in_flight = len(self._calls)
+        return {
+            "upstream_calls": self.upstream_calls,
+            "coalesced_calls": self.coalesced_calls,
+            "in_flight": in_flight,
+        }
+
+
+# Process-wide coalescer shared by every WebSearch tool instance
+search_flight = SingleFlight()
@@ -33,6 +33,9 @@ TEMPERATURE = 0.5
 # Maximum output tokens
 MAX_TOKENS = 2048
 
+# Stream responses token-by-token instead of waiting for the full answer
+STREAM_RESPONSES = True
+
 # ============================================================================
 # AGENT CONFIGURATION
 # ============================================================================
@@ -43,6 +46,291 @@ MAX_ITERATIONS = 5
 # Show agent thinking process
 VERBOSE = True
 
+# How the agent uses tools:
+#   "prefetch"         - keyword/classifier routing runs tools before one generation
+#   "function_calling" - Gemini requests tools itself, up to MAX_ITERATIONS rounds
+AGENT_MODE = "prefetch"
+
+# ============================================================================
+# MODEL ROUTING CONFIGURATION
+# ============================================================================
+
+# Which model answers a question:
+#   "auto"   - simple questions go to the fast tier, complex research to the strong tier
+#   "fast" / "strong" - always use that tier
+#   "off"    - always MODEL_NAME
+MODEL_ROUTING = "auto"
+
+# Candidate models per tier, in order of preference; within a tier the one
+# with the best live latency and error record is used
+MODEL_TIERS = {
+    "fast": ["gemini-2.5-flash", "gemini-2.0-flash", "gemini-1.5-flash"],
+    "strong": ["gemini-2.5-pro", "gemini-1.5-pro"],
+}
+
+# Complexity score (0-1) from which a question is sent to the strong tier
+MODEL_ROUTER_COMPLEXITY_THRESHOLD = 0.5
+
+# Weight of the newest sample in the latency and error-rate moving averages
+MODEL_ROUTER_EWMA_ALPHA = 0.2
+
+# Models failing more often than this are skipped while another is healthy
+MODEL_ROUTER_MAX_ERROR_RATE = 0.5
+
+# ============================================================================
+# HEDGED REQUESTS CONFIGURATION
+# ============================================================================
+
+# Send a backup request when the first has produced no text after a
+# percentile of recent first-token latencies
+HEDGE_ENABLED = False
+
+# Percentile of recent first-token latencies to wait before hedging
+HEDGE_PERCENTILE = 95
+
+# Bounds on the hedge delay, and the delay used until HEDGE_MIN_SAMPLES
+# latencies have been seen
+HEDGE_MIN_DELAY = 0.5
+HEDGE_MAX_DELAY = 10.0
+HEDGE_DEFAULT_DELAY = 3.0
+HEDGE_MIN_SAMPLES = 20
+
+# Recent first-token latencies kept
+HEDGE_WINDOW = 200
+
+# Model for the backup request (None = same model as the first request)
+HEDGE_ALTERNATE_MODEL = None
+
+# ============================================================================
+# SPECULATIVE DRAFT CONFIGURATION
+# ============================================================================
+
+# Write a knowledge-only answer while the web search runs, and keep it
+# when the results add little the draft doesn't already say
+SPECULATIVE_DRAFT_ENABLED = False
+
+# Frequent words of the search results checked against the draft
+SPECULATIVE_KEY_TERMS = 20
+
+# Highest share of the results' key words and numbers the draft may miss
+SPECULATIVE_MAX_NOVELTY = 0.5
+
+# Seconds to wait, once the search is done, for a draft still being
+# written; after that it is stopped and the answer uses the results
+SPECULATIVE_DRAFT_WAIT = 1.0
+
+# ============================================================================
+# WEB SEARCH CONFIGURATION
+# ============================================================================
+
+# Serper.dev endpoint (override to point at a local fake server)
+SERPER_BASE_URL = os.getenv("SERPER_BASE_URL", "https://google.serper.dev")
+
+# Seconds to wait for a connection / for the response body
+SERPER_CONNECT_TIMEOUT = 3.05
+SERPER_READ_TIMEOUT = 10
+
+# Keep-alive connections kept open to Serper
+SERPER_POOL_SIZE = 20
+
+# Number of organic results requested per search
+SERPER_NUM_RESULTS = 10
+
+# Queries sent in one batched request (Serper accepts a JSON array body)
+SERPER_MAX_BATCH = 100
+
+# ============================================================================
+# TOOL EXECUTION CONFIGURATION
+# ============================================================================
+
+# Seconds each tool may run before its result is dropped from the prompt
+TOOL_TIMEOUTS = {
+    "WebSearch": 8,
+    "Calculator": 2,
+    "Summarizer": 60,
+}
+
+# Timeout for tools not listed above
+TOOL_DEFAULT_TIMEOUT = 10
+
+# Worker threads shared by all concurrent tool calls in the process
+TOOL_MAX_WORKERS = 16
+
+# Calculator limits (an expression like 9**9**9 must not pin a CPU core)
+CALC_MAX_LENGTH = 500          # characters per expression
+CALC_MAX_NODES = 200           # syntax tree nodes per expression
+CALC_MAX_EXPONENT = 10_000     # absolute value of any exponent
+CALC_MAX_DIGITS = 1_000        # digits of any integer operand or result
+
+# Parsed expressions kept in the calculator's LRU cache
+CALC_CACHE_SIZE = 1024
+
+# ============================================================================
+# INTENT CLASSIFIER CONFIGURATION
+# ============================================================================
+
+# Let the learned classifier veto keyword-triggered web searches
+INTENT_CLASSIFIER_ENABLED = True
+
+# Minimum predicted probability before the classifier overrides the keyword rules
+INTENT_CONFIDENCE_THRESHOLD = 0.7
+
+# Labeled seed questions shipped with the repo (label<TAB>question)
+INTENT_SEED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "intent_seed.tsv")
+
+# ============================================================================
+# SUMMARIZER CONFIGURATION
+# ============================================================================
+
+# Token budget of a Summarizer tool result
+SUMMARY_MAX_TOKENS = 150
+
+# Token budget for web search results inside the answer prompt
+SEARCH_CONTEXT_MAX_TOKENS = 250
+
+# TextRank: PageRank damping factor and edges kept per sentence
+TEXTRANK_DAMPING = 0.85
+TEXTRANK_NEIGHBORS = 8
+
+# Long documents are summarized map-reduce style with Gemini: chunks of at
+# most SUMMARY_CHUNK_TOKENS are summarized concurrently, then partial
+# summaries are merged SUMMARY_REDUCE_FAN_IN at a time
+SUMMARY_MODEL_NAME = MODEL_NAME
+SUMMARY_CHUNK_TOKENS = 2000
+SUMMARY_REDUCE_FAN_IN = 4
+
+# Maximum Gemini summarization calls in flight at once
+SUMMARY_MAX_CONCURRENCY = 4
+
+# ============================================================================
+# PROMPT CONFIGURATION
+# ============================================================================
+
+# Offline token estimate (Gemini averages about four characters per token
+# for English text)
+TOKEN_CHARS_PER_TOKEN = 4.0
+
+# Fit the estimate with one count_tokens request when the agent starts
+TOKEN_CALIBRATION_ENABLED = False
+
+# Total input token budget of an answer prompt
+PROMPT_MAX_TOKENS = 2000
+
+# Per-section token budgets; when the total is still over budget, sections
+# are trimmed in the order listed in PROMPT_TRIM_ORDER
+PROMPT_SECTION_BUDGETS = {
+    "question": 500,
+    "history": 600,
+    "search": SEARCH_CONTEXT_MAX_TOKENS,
+    "calculation": 200,
+}
+PROMPT_TRIM_ORDER = ["history", "search", "calculation", "question"]
+
+# ============================================================================
+# CONVERSATION MEMORY CONFIGURATION
+# ============================================================================
+
+# Most recent turns kept verbatim; older turns are folded into a running
+# summary in the background
+MEMORY_RECENT_TURNS = 3
+
+# Token budget of the running summary and of each remembered answer
+MEMORY_SUMMARY_TOKENS = 200
+MEMORY_TURN_MAX_TOKENS = 150
+
+# ============================================================================
+# CACHE CONFIGURATION
+# ============================================================================
+
+# Directory for on-disk caches shared by the CLI and the Streamlit app
+CACHE_DIR = os.getenv("DIVEIN_CACHE_DIR", ".cache")
+
+# SQLite file holding cached WebSearch results
+SEARCH_CACHE_PATH = os.path.join(CACHE_DIR, "search_cache.sqlite3")
+
+# Maximum number of cached searches kept before the least recently used are evicted
+SEARCH_CACHE_MAX_ENTRIES = 5000
+
+# Time-to-live (seconds) for time-sensitive queries ("news", "latest", "today", ...)
+SEARCH_CACHE_TTL_FRESH = 15 * 60
+
+# Time-to-live (seconds) for evergreen queries
+SEARCH_CACHE_TTL_DEFAULT = 7 * 24 * 60 * 60
+
+# Time-to-live (seconds) for searches that returned no results (or an error
+# entry in a batch), so a transient miss isn't served for a week
+SEARCH_CACHE_TTL_EMPTY = 5 * 60
+
+# Words that mark a query as time-sensitive
+SEARCH_CACHE_FRESH_KEYWORDS = [
+    'news', 'latest', 'today', 'current', 'recent', 'now', 'this week',
+    'yesterday', 'tonight', 'live', 'price', 'score', 'weather'
+]
+
+# Search (and cache) canonical keyword queries instead of raw prompts
+SEARCH_CANONICALIZE = True
+
+# Keyphrases kept from long queries when canonicalizing
+CANONICAL_MAX_KEYPHRASES = 8
+
+# SQLite file holding cached model answers, keyed by model, generation
+# config and prompt
+RESPONSE_CACHE_PATH = os.path.join(CACHE_DIR, "response_cache.sqlite3")
+
+# Cache answers even when TEMPERATURE > 0 (always on when TEMPERATURE is 0)
+RESPONSE_CACHE_ENABLED = False
+
+# Maximum number of cached answers kept before the least recently used are evicted
+RESPONSE_CACHE_MAX_ENTRIES = 2000
+
+# Time-to-live (seconds) for answers without web search results; answers
+# built on search results expire with those results
+RESPONSE_CACHE_TTL = 7 * 24 * 60 * 60
+
+# SQLite file holding answers for the semantic (near-duplicate question) cache
+SEMANTIC_CACHE_PATH = os.path.join(CACHE_DIR, "semantic_cache.sqlite3")
+
+# Reuse the answer of an earlier question worded differently
+SEMANTIC_CACHE_ENABLED = False
+
+# Cosine similarity of question embeddings needed to reuse an answer
+# (tune with python tune_semantic_cache.py)
+SEMANTIC_CACHE_THRESHOLD = 0.80
+
+# Maximum number of cached answers kept before the least recently used are evicted
+SEMANTIC_CACHE_MAX_ENTRIES = 1000
+
+# Longest time (seconds) an answer is reused; time-sensitive questions
+# expire sooner (SEARCH_CACHE_TTL_FRESH)
+SEMANTIC_CACHE_TTL = 24 * 60 * 60
+
+# Hashed embedding dimensions (a power of two)
+SEMANTIC_CACHE_DIM = 2048
+
+# Seconds between reloads of entries added by other processes
+SEMANTIC_CACHE_RELOAD_INTERVAL = 30
+
+# JSON file caching the list of Gemini models available to the API key
+MODEL_REGISTRY_PATH = os.path.join(CACHE_DIR, "models.json")
+
+# Seconds before the model list is refreshed (in the background) from the API
+MODEL_REGISTRY_TTL = 24 * 60 * 60
+
+# JSON file recording the latest health probe of each model
+MODEL_HEALTH_PATH = os.path.join(CACHE_DIR, "model_health.json")
+
+# Seconds a health probe result is trusted before models are probed again
+MODEL_HEALTH_TTL = 30 * 60
+
+# Seconds to wait for concurrent health probes before giving up on stragglers
+MODEL_HEALTH_DEADLINE = 10
+
+# Maximum number of candidate models probed at once
+MODEL_HEALTH_MAX_CANDIDATES = 6
+
+# Trained intent classifier weights (rebuilt from INTENT_SEED_PATH when missing)
+INTENT_MODEL_PATH = os.path.join(CACHE_DIR, "intent_model.npz")
+
 # ============================================================================
 # VALIDATION FUNCTION
 # ============================================================================
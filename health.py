@@ -0,0 +1,156 @@
+"""
+Model health probing for the Research Agent
+Probes candidate models concurrently and remembers the fastest healthy one
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import google.generativeai as genai
+
+from config import (
+    MODEL_HEALTH_PATH,
+    MODEL_HEALTH_TTL,
+    MODEL_HEALTH_DEADLINE,
+    MODEL_HEALTH_MAX_CANDIDATES,
+)
+
+_lock = threading.Lock()
+
+
+def load_health():
+    """
+    Read the recorded probe results
+
+    Returns:
+        Dictionary mapping model name to {ok, latency, error, checked_at}
+    """
+    try:
+        with open(MODEL_HEALTH_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_health(results):
+    """Merge probe results into the state file atomically"""
+    with _lock:
+        state = load_health()
+        state.update(results)
+        os.makedirs(os.path.dirname(os.path.abspath(MODEL_HEALTH_PATH)), exist_ok=True)
+        tmp_path = f"{MODEL_HEALTH_PATH}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, MODEL_HEALTH_PATH)
+
+
+def probe_model(model_name):
+    """
+    Send a minimal request to one model
+
+    Args:
+        model_name: Model to probe
+
+    Returns:
+        Dictionary with ok, latency (seconds), error and checked_at
+    """
+    start = time.perf_counter()
+    try:
+        model = genai.GenerativeModel(
+            model_name=model_name,
+            generation_config={"max_output_tokens": 1},
+        )
+        model.generate_content("Say hi")
+        return {
+            "ok": True,
+            "latency": time.perf_counter() - start,
+            "error": None,
+            "checked_at": time.time(),
+        }
+    except Exception as e:
+        return {
+            "ok": False,
+            "latency": time.perf_counter() - start,
+            "error": str(e)[:200],
+            "checked_at": time.time(),
+        }
+
+
+def probe_models(candidates, deadline=MODEL_HEALTH_DEADLINE):
+    """
+    Probe several models concurrently and record the results
+
+    Args:
+        candidates: Model names to probe
+        deadline: Seconds to wait before marking unfinished probes as timed out
+
+    Returns:
+        Dictionary mapping model name to its probe result
+    """
+    candidates = list(dict.fromkeys(candidates))[:MODEL_HEALTH_MAX_CANDIDATES]
+    if not candidates:
+        return {}
+
+    executor = ThreadPoolExecutor(max_workers=len(candidates))
+    futures = {executor.submit(probe_model, name): name for name in candidates}
+    wait(futures, timeout=deadline)
+    # Don't block on stragglers; their threads finish in the background
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    results = {}
+    for future, name in futures.items():
+        if future.done():
+            results[name] = future.result()
+        else:
+            results[name] = {
+                "ok": False,
+                "latency": deadline,
+                "error": f"Timed out after {deadline}s",
+                "checked_at": time.time(),
+            }
+
+    _save_health(results)
+    return results
+
+
+def pick_model(candidates, preferred=None, refresh=False):
+    """
+    Choose the preferred model if healthy, else the fastest healthy candidate
+
+    Recorded results younger than MODEL_HEALTH_TTL are reused (across
+    restarts); otherwise the candidates are probed concurrently.
+
+    Args:
+        candidates: Model names to consider
+        preferred: Model to use whenever it is healthy (e.g. the user's choice)
+        refresh: Ignore recorded results and probe again
+
+    Returns:
+        (model_name or None, results) where results maps each candidate to its
+        probe result
+    """
+    if preferred:
+        candidates = [preferred] + list(candidates)
+    candidates = list(dict.fromkeys(candidates))[:MODEL_HEALTH_MAX_CANDIDATES]
+    now = time.time()
+    state = {} if refresh else load_health()
+    results = {
+        name: state[name] for name in candidates
+        if name in state and now - state[name]["checked_at"] < MODEL_HEALTH_TTL
+    }
+
+    # Probe everything when nothing healthy is on record, otherwise only a
+    # preferred model we know nothing about yet
+    if not any(r["ok"] for r in results.values()):
+        results.update(probe_models(candidates))
+    elif preferred and preferred not in results:
+        results.update(probe_models([preferred]))
+
+    healthy = [name for name in candidates if results.get(name, {}).get("ok")]
+    if not healthy:
+        return None, results
+    if preferred in healthy:
+        return preferred, results
+    return min(healthy, key=lambda name: results[name]["latency"]), results
@@ -0,0 +1,176 @@
+"""
+Hedged LLM requests for the Research Agent
+Fires a backup request when the first is slower than recent latencies suggest, and keeps whichever streams first
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np
+
+from config import (
+    HEDGE_PERCENTILE,
+    HEDGE_MIN_DELAY,
+    HEDGE_MAX_DELAY,
+    HEDGE_DEFAULT_DELAY,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_WINDOW,
+    HEDGE_ALTERNATE_MODEL,
+)
+
+# Marks a stream that ended without producing any text
+_EMPTY = object()
+
+# Each hedged request occupies up to two threads while waiting for a first chunk
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="hedge")
+
+
+def _first_chunk(start):
+    """Send a request and block until its first chunk; returns (iterator, chunk, seconds)"""
+    began = time.perf_counter()
+    chunks = iter(start())
+    first = next(chunks, _EMPTY)
+    return chunks, first, time.perf_counter() - began
+
+
+def _close(future):
+    """Abandon a losing request: close its stream once it has one"""
+    try:
+        chunks, _, _ = future.result()
+    except Exception:
+        return
+    close = getattr(chunks, "close", None)
+    if close:
+        close()
+
+
+def alternate_model(available):
+    """
+    Model a backup request goes to instead of the first request's model
+
+    Args:
+        available: Names (without "models/") of the models the API key can use
+
+    Returns:
+        HEDGE_ALTERNATE_MODEL when it is set and available, else None
+    """
+    if HEDGE_ALTERNATE_MODEL and HEDGE_ALTERNATE_MODEL in available:
+        return HEDGE_ALTERNATE_MODEL
+    return None
+
+
+class Hedger:
+    """Hedges streaming requests against the tail of their first-token latency"""
+
+    def __init__(self, percentile=HEDGE_PERCENTILE, window=HEDGE_WINDOW, min_samples=HEDGE_MIN_SAMPLES,
+                 min_delay=HEDGE_MIN_DELAY, max_delay=HEDGE_MAX_DELAY, default_delay=HEDGE_DEFAULT_DELAY,
+                 executor=None):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.default_delay = default_delay
+        self.executor = executor or _executor
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hedges_fired = 0
+        self.hedges_won = 0
+
+    def delay(self):
+        """Seconds to wait for a first chunk before firing the backup request"""
+        with self._lock:
+            samples = list(self._latencies)
+        if len(samples) < self.min_samples:
+            return self.default_delay
+        delay = float(np.percentile(samples, self.percentile))
+        return min(max(delay, self.min_delay), self.max_delay)
+
+    def _record(self, future):
+        """Add a finished request's first-token latency (winners and losers alike)"""
+        try:
+            _, _, latency = future.result()
+        except Exception:
+            return
+        with self._lock:
+            self._latencies.append(latency)
+
+    def stream(self, start, backup=None):
+        """
+        Stream a response, hedging if the first chunk is late
+
+        Args:
+            start: Zero-argument callable that sends the request and returns
+                an iterator of text chunks
+            backup: Callable for the backup request (defaults to start, i.e.
+                the same request again)
+
+        Yields:
+            Text chunks of whichever request produced a first chunk first;
+            raises the first request's error if both fail
+        """
+        with self._lock:
+            self.requests += 1
+
+        primary = self.executor.submit(_first_chunk, start)
+        primary.add_done_callback(self._record)
+        done, _ = wait([primary], timeout=self.delay())
+
+        # Hedge a late first chunk; an early failure gets the backup right away
+        futures = [primary]
+        if not done or primary.exception() is not None:
+            with self._lock:
+                self.hedges_fired += 1
+            secondary = self.executor.submit(_first_chunk, backup or start)
+            secondary.add_done_callback(self._record)
+            futures.append(secondary)
+
+        # The first request to deliver a chunk wins; a failure only loses if
+        # the other request also fails
+        winner, pending, error = None, list(futures), None
+        while pending and winner is None:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.remove(future)
+                if future.exception() is None and winner is None:
+                    winner = future
+                elif future is primary:
+                    error = future.exception()
+
+        for future in futures:
+            if future is not winner:
+                if not future.cancel():
+                    future.add_done_callback(_close)
+
+        if winner is None:
+            raise error
+        if winner is not primary:
+            with self._lock:
+                self.hedges_won += 1
+
+        chunks, first, _ = winner.result()
+        if first is _EMPTY:
+            return
+        yield first
+        yield from chunks
+
+    def metrics(self):
+        """
+        Hedging counters
+
+        Returns:
+            Dictionary with requests, hedges_fired, hedges_won and the current delay
+        """
+        with self._lock:
+            counters = {
+                "requests": self.requests,
+                "hedges_fired": self.hedges_fired,
+                "hedges_won": self.hedges_won,
+            }
+        counters["delay"] = self.delay()
+        return counters
+
+
+# Process-wide hedger; latencies from every session share one window
+hedger = Hedger()
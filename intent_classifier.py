@@ -0,0 +1,200 @@
+"""
+Learned intent classifier for the Research Agent
+Hashed n-gram features with a NumPy softmax model: needs-search / needs-calc / knowledge-only
+"""
+import csv
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+
+from config import INTENT_MODEL_PATH, INTENT_SEED_PATH
+
+LABELS = ["search", "calc", "knowledge"]
+
+# 2^14 hashed feature buckets
+N_FEATURES = 1 << 14
+
+_TOKEN_PATTERN = re.compile(r"[a-z]+(?:'[a-z]+)?|\d+(?:[.,]\d+)*|[%+\-*/^$?]")
+
+
+def _bucket(feature):
+    """Stable hash of a feature string into a bucket (crc32, unlike hash(), is not salted)"""
+    return zlib.crc32(feature.encode("utf-8")) & (N_FEATURES - 1)
+
+
+def extract_features(text):
+    """
+    Turn a question into hashed feature indices
+
+    Uses word unigrams and bigrams (numbers collapsed to a <num> token) plus
+    character trigrams.
+
+    Args:
+        text: Question text
+
+    Returns:
+        Sorted array of unique feature indices
+    """
+    text = text.lower()
+    tokens = ["<num>" if t[0].isdigit() else t for t in _TOKEN_PATTERN.findall(text)]
+
+    features = [f"w:{t}" for t in tokens]
+    features += [f"b:{a} {b}" for a, b in zip(["<s>"] + tokens, tokens + ["</s>"])]
+    padded = f" {' '.join(tokens)} "
+    features += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+
+    return np.unique(np.fromiter((_bucket(f) for f in features), dtype=np.int64))
+
+
+def featurize(texts):
+    """
+    Build an L2-normalized binary feature matrix
+
+    Args:
+        texts: List of questions
+
+    Returns:
+        Array of shape (len(texts), N_FEATURES)
+    """
+    X = np.zeros((len(texts), N_FEATURES), dtype=np.float32)
+    for i, text in enumerate(texts):
+        idx = extract_features(text)
+        if len(idx):
+            X[i, idx] = 1.0 / np.sqrt(len(idx))
+    return X
+
+
+class IntentClassifier:
+    """Multinomial logistic regression over hashed n-gram features"""
+
+    def __init__(self, weights=None, bias=None):
+        self.weights = weights if weights is not None else np.zeros((N_FEATURES, len(LABELS)), dtype=np.float32)
+        self.bias = bias if bias is not None else np.zeros(len(LABELS), dtype=np.float32)
+
+    def fit(self, texts, labels, epochs=300, learning_rate=2.0, l2=1e-4):
+        """
+        Train with full-batch gradient descent on the cross-entropy loss
+
+        Args:
+            texts: List of questions
+            labels: List of labels from LABELS
+            epochs: Gradient steps
+            learning_rate: Step size
+            l2: L2 regularization strength
+
+        Returns:
+            self
+        """
+        X = featurize(texts)
+        y = np.array([LABELS.index(label) for label in labels])
+        Y = np.eye(len(LABELS), dtype=np.float32)[y]
+        n = len(texts)
+
+        # Buckets never seen in training keep zero weight, so optimize only
+        # the active columns
+        active = np.flatnonzero(X.any(axis=0))
+        X = X[:, active]
+        W = self.weights[active]
+
+        for _ in range(epochs):
+            P = _softmax(X @ W + self.bias)
+            grad = P - Y
+            W -= learning_rate * (X.T @ grad / n + l2 * W)
+            self.bias -= learning_rate * grad.mean(axis=0)
+
+        self.weights[active] = W
+        return self
+
+    def predict_proba(self, text):
+        """
+        Class probabilities for one question
+
+        Args:
+            text: Question text
+
+        Returns:
+            Array of probabilities aligned with LABELS
+        """
+        # Only the active rows of the weight matrix are touched
+        idx = extract_features(text)
+        logits = self.bias.copy()
+        if len(idx):
+            logits += self.weights[idx].sum(axis=0) / np.sqrt(len(idx))
+        return _softmax(logits)
+
+    def predict(self, text):
+        """
+        Most likely intent for one question
+
+        Args:
+            text: Question text
+
+        Returns:
+            (label, confidence) tuple
+        """
+        proba = self.predict_proba(text)
+        best = int(np.argmax(proba))
+        return LABELS[best], float(proba[best])
+
+    def save(self, path=INTENT_MODEL_PATH):
+        """Write the weights to an .npz file"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        np.savez_compressed(path, weights=self.weights, bias=self.bias)
+
+    @classmethod
+    def load(cls, path=INTENT_MODEL_PATH):
+        """Read weights written by save()"""
+        with np.load(path) as data:
+            return cls(data["weights"], data["bias"])
+
+
+def _softmax(logits):
+    shifted = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+def load_dataset(path=INTENT_SEED_PATH):
+    """
+    Read a labeled dataset
+
+    Args:
+        path: TSV file with a header row and label<TAB>question rows
+
+    Returns:
+        (texts, labels) lists
+    """
+    texts, labels = [], []
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f, delimiter="\t", quoting=csv.QUOTE_NONE):
+            texts.append(row["question"])
+            labels.append(row["label"])
+    return texts, labels
+
+
+_classifier = None
+_classifier_lock = threading.Lock()
+
+
+def get_classifier():
+    """
+    Get the process-wide classifier
+
+    Loads INTENT_MODEL_PATH, or trains on the seed dataset and saves it there
+    when no trained model exists yet.
+
+    Returns:
+        IntentClassifier, or None if neither a model nor the seed data is available
+    """
+    global _classifier
+    with _classifier_lock:
+        if _classifier is None:
+            if os.path.exists(INTENT_MODEL_PATH):
+                _classifier = IntentClassifier.load()
+            elif os.path.exists(INTENT_SEED_PATH):
+                _classifier = IntentClassifier().fit(*load_dataset())
+                _classifier.save()
+        return _classifier
@@ -2,10 +2,21 @@
 Main entry point for the Research Assistant
 """
 import sys
-from config import validate_config
+import time
+from config import validate_config, STREAM_RESPONSES
 from agent import ResearchAgent
 from tools import create_tools
-from utils import display_banner, display_tips, get_user_input, display_response
+from cache import get_search_cache, get_response_cache
+from semantic_cache import get_semantic_cache
+from mapreduce import MapReduceSummarizer
+from model_router import model_router
+from hedging import hedger
+from speculation import speculation_stats
+from utils import (
+    display_banner, display_tips, get_user_input, display_response,
+    display_cache_stats, display_summary_stream, display_router_metrics,
+    display_hedge_metrics, display_speculation_stats,
+)
 
 def main():
     """Main application loop"""
@@ -44,12 +55,34 @@ def main():
                 break
             
             if user_input.lower() == 'clear':
+                agent.memory.clear()
                 import os
                 os.system('cls' if os.name == 'nt' else 'clear')
                 display_banner()
                 display_tips()
                 continue
             
+            if user_input.lower() == 'stats':
+                display_cache_stats(get_search_cache().stats())
+                display_cache_stats(get_response_cache().stats(), "Response cache")
+                display_cache_stats(get_semantic_cache().stats(), "Similar-question cache")
+                display_router_metrics(model_router.metrics())
+                display_hedge_metrics(hedger.metrics())
+                display_speculation_stats(speculation_stats.metrics())
+                continue
+            
+            if user_input.lower().startswith('summarize '):
+                path = user_input[len('summarize '):].strip()
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        document = f.read()
+                except OSError as e:
+                    print(f"\n❌ Could not read {path}: {e}\n")
+                    continue
+                print(f"\n📄 Summarizing {path} ({len(document):,} characters)...")
+                display_summary_stream(MapReduceSummarizer().stream(document))
+                continue
+            
             # Skip empty inputs
             if not user_input.strip():
                 continue
@@ -57,11 +90,15 @@ def main():
             # Process query
             print("\n🤖 Assistant: Processing your question...\n")
             print("=" * 70)
-            response = agent.query(user_input)
+            started_at = time.perf_counter()
+            if STREAM_RESPONSES:
+                response = agent.query_stream(user_input)
+            else:
+                response = agent.query(user_input)
             print("=" * 70)
             
-            # Display response
-            display_response(response)
+            # Display response (printed incrementally when streaming)
+            display_response(response, started_at=started_at)
             print()
     
     except KeyboardInterrupt:
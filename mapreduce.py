@@ -0,0 +1,184 @@
+"""
+Map-reduce summarization for long documents
+Chunks text by token budget, summarizes chunks concurrently with Gemini and merges the results in a tree
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import google.generativeai as genai
+
+from config import (
+    SUMMARY_MODEL_NAME,
+    SUMMARY_CHUNK_TOKENS,
+    SUMMARY_REDUCE_FAN_IN,
+    SUMMARY_MAX_CONCURRENCY,
+    SUMMARY_MAX_TOKENS,
+)
+from summarizer import split_sentences, summarize
+from tokens import estimate_tokens, estimator
+
+MAP_PROMPT = (
+    "Summarize the following part of a longer document in at most {words} words. "
+    "Keep names, numbers and dates exactly as written. Reply with the summary only.\n\n{text}"
+)
+REDUCE_PROMPT = (
+    "The following are summaries of consecutive parts of one document. Merge them "
+    "into a single summary of at most {words} words, removing repetition and keeping "
+    "names, numbers and dates exactly as written. Reply with the summary only.\n\n{text}"
+)
+
+# Bounded pool: at most SUMMARY_MAX_CONCURRENCY Gemini calls in flight
+_executor = ThreadPoolExecutor(max_workers=SUMMARY_MAX_CONCURRENCY, thread_name_prefix="summary")
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_summary_model():
+    """Process-wide Gemini model for summarization (genai must already be configured)"""
+    global _model
+    with _model_lock:
+        if _model is None:
+            _model = genai.GenerativeModel(
+                model_name=SUMMARY_MODEL_NAME,
+                generation_config={"temperature": 0.2},
+            )
+        return _model
+
+
+def gemini_summarize(text, stage, max_tokens=SUMMARY_MAX_TOKENS):
+    """
+    Summarize one chunk (stage "map") or a group of summaries (stage "reduce")
+
+    Args:
+        text: Input text
+        stage: "map" or "reduce"
+        max_tokens: Target length of the summary
+
+    Returns:
+        Summary string
+    """
+    template = MAP_PROMPT if stage == "map" else REDUCE_PROMPT
+    # About 0.75 words per token
+    prompt = template.format(words=int(max_tokens * 0.75), text=text)
+    return get_summary_model().generate_content(prompt).text.strip()
+
+
+def chunk_text(text, max_tokens=SUMMARY_CHUNK_TOKENS):
+    """
+    Pack whole sentences into chunks of at most max_tokens
+
+    Sentences longer than a chunk are cut at the chunk size.
+
+    Args:
+        text: Document text
+        max_tokens: Token budget per chunk
+
+    Returns:
+        List of chunk strings
+    """
+    max_chars = estimator.max_chars(max_tokens)
+    chunks, current, used = [], [], 0
+
+    for sentence in split_sentences(text):
+        pieces = [sentence[i:i + max_chars] for i in range(0, len(sentence), max_chars)]
+        for piece in pieces:
+            cost = estimate_tokens(piece)
+            if current and used + cost > max_tokens:
+                chunks.append(" ".join(current))
+                current, used = [], 0
+            current.append(piece)
+            used += cost
+
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+class MapReduceSummarizer:
+    """Concurrent chunk summaries merged level by level into one summary"""
+
+    def __init__(self, summarize_func=gemini_summarize, chunk_tokens=SUMMARY_CHUNK_TOKENS,
+                 fan_in=SUMMARY_REDUCE_FAN_IN, max_tokens=SUMMARY_MAX_TOKENS, executor=None):
+        """
+        Args:
+            summarize_func: func(text, stage, max_tokens) -> summary
+            chunk_tokens: Token budget of each map input
+            fan_in: Partial summaries merged per reduce call
+            max_tokens: Target length of every summary
+            executor: Pool the calls run on (defaults to the shared bounded pool)
+        """
+        self.summarize_func = summarize_func
+        self.chunk_tokens = chunk_tokens
+        self.fan_in = max(2, fan_in)
+        self.max_tokens = max_tokens
+        self.executor = executor or _executor
+
+    def _call(self, text, stage):
+        """Summarize with the model, falling back to TextRank if the call fails"""
+        try:
+            return self.summarize_func(text, stage, self.max_tokens), False
+        except Exception:
+            return summarize(text, self.max_tokens), True
+
+    def _run_level(self, texts, stage, level):
+        """Summarize texts concurrently, yielding an event for each as it finishes"""
+        futures = {self.executor.submit(self._call, text, stage): i for i, text in enumerate(texts)}
+        for future in as_completed(futures):
+            summary, fallback = future.result()
+            yield {
+                "stage": stage, "level": level, "index": futures[future],
+                "total": len(texts), "summary": summary, "fallback": fallback,
+            }
+
+    def stream(self, text):
+        """
+        Summarize a document, yielding partial results as they complete
+
+        Map events arrive in completion order, not document order; the reduce
+        step always merges summaries in document order.
+
+        Args:
+            text: Document text
+
+        Yields:
+            Event dicts with stage ("map", "reduce" or "done"), level, index,
+            total, summary and fallback (True when TextRank stood in for a
+            failed model call). The last event has stage "done".
+        """
+        chunks = chunk_text(text, self.chunk_tokens)
+        if not chunks:
+            yield {"stage": "done", "level": 0, "index": 0, "total": 1, "summary": "", "fallback": False}
+            return
+
+        summaries = [None] * len(chunks)
+        for event in self._run_level(chunks, "map", 0):
+            summaries[event["index"]] = event["summary"]
+            yield event
+
+        level = 0
+        while len(summaries) > 1:
+            level += 1
+            groups = ["\n\n".join(summaries[i:i + self.fan_in]) for i in range(0, len(summaries), self.fan_in)]
+            merged = [None] * len(groups)
+            for event in self._run_level(groups, "reduce", level):
+                merged[event["index"]] = event["summary"]
+                yield event
+            summaries = merged
+
+        yield {"stage": "done", "level": level, "index": 0, "total": 1,
+               "summary": summaries[0], "fallback": False}
+
+    def summarize(self, text):
+        """
+        Summarize a document and return only the final summary
+
+        Args:
+            text: Document text
+
+        Returns:
+            Summary string
+        """
+        for event in self.stream(text):
+            pass
+        return event["summary"]
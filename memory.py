@@ -0,0 +1,217 @@
+"""
+Conversation memory for the Research Agent
+Recent turns kept verbatim, older turns folded into a running summary in the background
+"""
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from cache import normalize_query, ttl_for_query
+from config import (
+    MEMORY_RECENT_TURNS,
+    MEMORY_SUMMARY_TOKENS,
+    MEMORY_TURN_MAX_TOKENS,
+    PROMPT_SECTION_BUDGETS,
+    SEARCH_CACHE_TTL_FRESH,
+)
+from mapreduce import get_summary_model
+from summarizer import content_terms, summarize
+from tokens import estimate_tokens, truncate_to_tokens
+
+SUMMARY_PROMPT = (
+    "Update the running summary of a conversation between a user and a research "
+    "assistant. Keep the topics discussed, facts, numbers and names; drop small talk. "
+    "Reply with the updated summary only, at most {words} words.\n\n"
+    "Current summary:\n{summary}\n\nNew turns:\n{turns}"
+)
+
+# Pronouns pointing back at earlier turns ("what about its price?"); words
+# like "this", "that", "more" or "why" open standalone questions just as often
+_FOLLOW_UP_PATTERN = re.compile(
+    r"\b(?:it|its|they|them|their|he|she|him|his|her|else)\b",
+    re.IGNORECASE,
+)
+_FOLLOW_UP_MAX_WORDS = 10
+
+# Background summarization; a memory never has more than one job running
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="memory")
+
+
+def gemini_update_summary(summary, turns_text, max_tokens=MEMORY_SUMMARY_TOKENS):
+    """Fold new turns into the running summary with Gemini"""
+    prompt = SUMMARY_PROMPT.format(
+        words=int(max_tokens * 0.75), summary=summary or "(empty)", turns=turns_text
+    )
+    return get_summary_model().generate_content(prompt).text.strip()
+
+
+def _is_anaphoric(question):
+    """Short question leaning on earlier turns ("what about its price?")"""
+    return len(question.split()) <= _FOLLOW_UP_MAX_WORDS and bool(_FOLLOW_UP_PATTERN.search(question))
+
+
+def _format_turn(turn, max_tokens=MEMORY_TURN_MAX_TOKENS):
+    return f"User: {turn['question']}\nAssistant: {truncate_to_tokens(turn['answer'], max_tokens)}"
+
+
+class ConversationMemory:
+    """Bounded memory of one conversation (one CLI session or one browser session)"""
+
+    def __init__(self, recent_turns=MEMORY_RECENT_TURNS, summary_tokens=MEMORY_SUMMARY_TOKENS,
+                 summarize_func=gemini_update_summary, background=True):
+        """
+        Args:
+            recent_turns: Turns kept verbatim
+            summary_tokens: Token budget of the running summary
+            summarize_func: func(summary, turns_text, max_tokens) -> new summary
+            background: Summarize on a worker thread (False runs inline)
+        """
+        self.recent_turns = recent_turns
+        self.summary_tokens = summary_tokens
+        self.summarize_func = summarize_func
+        self.background = background
+        self.summary = ""
+        self.turns = []
+        self._evicted = []
+        self._summarizing = False
+        self._lock = threading.Lock()
+
+    def add_turn(self, question, answer, search=None):
+        """
+        Remember a finished turn
+
+        Args:
+            question: User's question
+            answer: Assistant's answer
+            search: Web search context the answer was based on, if any
+        """
+        with self._lock:
+            self.turns.append({"question": question, "answer": answer, "search": search or ""})
+            while len(self.turns) > self.recent_turns:
+                self._evicted.append(self.turns.pop(0))
+            start = bool(self._evicted) and not self._summarizing
+            if start:
+                self._summarizing = True
+
+        if start:
+            if self.background:
+                _executor.submit(self._fold_evicted)
+            else:
+                self._fold_evicted()
+
+    def _fold_evicted(self):
+        """Fold evicted turns into the summary until none are left"""
+        while True:
+            with self._lock:
+                evicted, summary = list(self._evicted), self.summary
+                if not evicted:
+                    self._summarizing = False
+                    return
+
+            turns_text = "\n\n".join(_format_turn(t) for t in evicted)
+            try:
+                new_summary = self.summarize_func(summary, turns_text, self.summary_tokens)
+            except Exception:
+                new_summary = summarize(f"{summary}\n{turns_text}".strip(), self.summary_tokens)
+
+            with self._lock:
+                # clear() may have run meanwhile
+                if self._evicted[:len(evicted)] == evicted:
+                    self.summary = truncate_to_tokens(new_summary, self.summary_tokens)
+                    del self._evicted[:len(evicted)]
+
+    def context(self, max_tokens=PROMPT_SECTION_BUDGETS["history"]):
+        """
+        Conversation so far, sized to a token budget
+
+        Newest turns are kept first; the running summary comes before them.
+        Turns evicted but not yet summarized are still included verbatim.
+
+        Args:
+            max_tokens: Token budget
+
+        Returns:
+            History text, or "" for a new conversation
+        """
+        with self._lock:
+            summary = self.summary
+            turns = self._evicted + self.turns
+
+        parts, used = [], 0
+        if summary:
+            summary = f"Summary of earlier conversation: {summary}"
+            used = estimate_tokens(summary)
+
+        for turn in reversed(turns):
+            text = _format_turn(turn)
+            cost = estimate_tokens(text)
+            if used + cost > max_tokens:
+                break
+            parts.append(text)
+            used += cost
+
+        if summary and used <= max_tokens:
+            parts.append(summary)
+        return "\n\n".join(reversed(parts))
+
+    def recent_search(self):
+        """Web search context of the recent turns, newest first"""
+        with self._lock:
+            return "\n".join(t["search"] for t in reversed(self.turns) if t["search"])
+
+    def covers(self, question):
+        """
+        Whether the recent conversation already has the context to answer a follow-up
+
+        True for short anaphoric follow-ups ("what about its mass?") whose
+        key terms all appear in the recent turns, provided an earlier turn
+        searched the web and the question doesn't ask for fresh information
+        ("latest", "today", ...). A question without a pronoun, or with
+        anything new to look up, gets its own search.
+
+        Args:
+            question: User's question
+
+        Returns:
+            bool: True if a new web search would be redundant
+        """
+        with self._lock:
+            turns = list(self.turns)
+        if not any(t["search"] for t in turns):
+            return False
+        if ttl_for_query(normalize_query(question)) == SEARCH_CACHE_TTL_FRESH:
+            return False
+
+        # Five-letter prefixes act as a crude stemmer ("orbits" ~ "orbiting")
+        terms = {t[:5] for t in content_terms(question)}
+        if not terms:
+            return True
+        if not _is_anaphoric(question):
+            return False
+
+        known = {t[:5] for t in content_terms(" ".join(
+            f"{t['question']} {t['answer']} {t['search']}" for t in turns
+        ))}
+        return terms <= known
+
+    def is_follow_up(self, question):
+        """
+        Whether a question only makes sense with the conversation so far
+
+        Args:
+            question: User's question
+
+        Returns:
+            bool: True for short anaphoric questions once the conversation has turns
+        """
+        with self._lock:
+            if not self.turns and not self._evicted:
+                return False
+        return _is_anaphoric(question)
+
+    def clear(self):
+        """Forget the conversation"""
+        with self._lock:
+            self.summary = ""
+            self.turns = []
+            self._evicted = []
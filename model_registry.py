@@ -0,0 +1,132 @@
+"""
+Model capability registry for the Research Agent
+Caches genai.list_models() on disk so warm starts skip the network round-trip
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+import google.generativeai as genai
+
+from config import MODEL_REGISTRY_PATH, MODEL_REGISTRY_TTL
+
+_lock = threading.Lock()
+_refreshing = set()
+
+
+def _key_id(api_key):
+    """Identify an API key in the registry file without storing the key itself"""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+def _load():
+    """Read the registry file, returning {} if it is missing or corrupt"""
+    try:
+        with open(MODEL_REGISTRY_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save(key_id, models):
+    """Write one API key's model list atomically"""
+    with _lock:
+        registry = _load()
+        registry[key_id] = {"fetched_at": time.time(), "models": models}
+        os.makedirs(os.path.dirname(os.path.abspath(MODEL_REGISTRY_PATH)), exist_ok=True)
+        tmp_path = f"{MODEL_REGISTRY_PATH}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(registry, f, indent=2)
+        os.replace(tmp_path, MODEL_REGISTRY_PATH)
+
+
+def fetch_models(api_key):
+    """
+    List models from the API and store them in the registry
+
+    Args:
+        api_key: Google API key the models are listed for
+
+    Returns:
+        List of model dictionaries
+    """
+    genai.configure(api_key=api_key)
+    models = [
+        {
+            "name": m.name,
+            "display_name": m.display_name,
+            "description": m.description,
+            "supported_generation_methods": list(m.supported_generation_methods),
+            "input_token_limit": m.input_token_limit,
+            "output_token_limit": m.output_token_limit,
+        }
+        for m in genai.list_models()
+    ]
+    _save(_key_id(api_key), models)
+    return models
+
+
+def _refresh_in_background(api_key):
+    """Refetch the model list on a daemon thread (at most one per key at a time)"""
+    key_id = _key_id(api_key)
+    with _lock:
+        if key_id in _refreshing:
+            return
+        _refreshing.add(key_id)
+
+    def refresh():
+        try:
+            fetch_models(api_key)
+        except Exception as e:
+            print(f"⚠️ Background model refresh failed: {e}")
+        finally:
+            with _lock:
+                _refreshing.discard(key_id)
+
+    threading.Thread(target=refresh, daemon=True).start()
+
+
+def get_models(api_key, refresh=False):
+    """
+    Get the models available to an API key
+
+    Fresh entries are returned straight from disk. Stale entries are returned
+    immediately while a background refresh runs; only a cold start (or
+    refresh=True) waits for the API.
+
+    Args:
+        api_key: Google API key
+        refresh: Force a synchronous refetch
+
+    Returns:
+        List of model dictionaries (name, display_name, description,
+        supported_generation_methods, input_token_limit, output_token_limit)
+    """
+    entry = _load().get(_key_id(api_key))
+
+    if refresh or not entry:
+        return fetch_models(api_key)
+
+    if time.time() - entry["fetched_at"] > MODEL_REGISTRY_TTL:
+        _refresh_in_background(api_key)
+
+    return entry["models"]
+
+
+def get_generation_models(api_key, refresh=False):
+    """
+    Get the models that support generateContent
+
+    Args:
+        api_key: Google API key
+        refresh: Force a synchronous refetch
+
+    Returns:
+        List of model dictionaries
+    """
+    return [
+        m for m in get_models(api_key, refresh)
+        if "generateContent" in m["supported_generation_methods"]
+    ]
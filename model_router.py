@@ -0,0 +1,205 @@
+"""
+Latency-aware model routing for the Research Agent
+Sends simple questions to the fast tier and complex research to the strong tier, using live EWMA statistics
+"""
+import re
+import threading
+import time
+
+from config import (
+    MODEL_NAME,
+    MODEL_ROUTING,
+    MODEL_TIERS,
+    MODEL_ROUTER_COMPLEXITY_THRESHOLD,
+    MODEL_ROUTER_EWMA_ALPHA,
+    MODEL_ROUTER_MAX_ERROR_RATE,
+)
+from health import load_health
+
+# Phrases that mark analysis or multi-step research rather than a lookup
+COMPLEX_PHRASES = [
+    "compare", "comparison", "versus", "vs", "pros and cons", "trade-offs", "tradeoffs",
+    "explain why", "analyze", "analyse", "analysis", "evaluate", "implications",
+    "step by step", "in detail", "detailed", "comprehensive", "in depth", "critique",
+    "strategy", "design", "derive", "prove", "literature review", "research plan",
+]
+_COMPLEX_PATTERN = re.compile(
+    r"\b(?:" + "|".join(re.escape(p) for p in sorted(COMPLEX_PHRASES, key=len, reverse=True)) + r")\b"
+)
+
+# Seconds assumed for a model with no samples and no health probe on record
+_UNKNOWN_LATENCY = 5.0
+
+# Seconds after its last request before a failing model is tried again
+_RETRY_AFTER = 60.0
+
+
+def complexity(question, decision=None):
+    """
+    Score how demanding a question is
+
+    Args:
+        question: User's question
+        decision: Optional router.RouteDecision for the question
+
+    Returns:
+        Score between 0 (lookup or arithmetic) and 1 (multi-part research)
+    """
+    text = question.lower()
+    words = len(text.split())
+    score = min(words / 80, 0.4)
+    score += 0.3 * min(len(_COMPLEX_PATTERN.findall(text)), 2)
+    if text.count("?") > 1:
+        score += 0.15
+    # Plain arithmetic is handled by the Calculator; the model only phrases it
+    if decision is not None and decision.calculate and not decision.search and words < 20:
+        score -= 0.2
+    return max(0.0, min(score, 1.0))
+
+
+class ModelRouter:
+    """Picks a tier per question and a model per tier from live statistics"""
+
+    def __init__(self, tiers=MODEL_TIERS, mode=MODEL_ROUTING, alpha=MODEL_ROUTER_EWMA_ALPHA,
+                 threshold=MODEL_ROUTER_COMPLEXITY_THRESHOLD, max_error_rate=MODEL_ROUTER_MAX_ERROR_RATE):
+        self.tiers = tiers
+        self.mode = mode
+        self.alpha = alpha
+        self.threshold = threshold
+        self.max_error_rate = max_error_rate
+        self._stats = {}
+        self._served = {tier: 0 for tier in tiers}
+        self._lock = threading.Lock()
+
+        # Seed latencies with the most recent health probes
+        for name, probe in load_health().items():
+            if probe.get("ok"):
+                self._stats[name] = {
+                    "latency": probe["latency"], "error_rate": 0.0, "requests": 0,
+                    "updated_at": probe["checked_at"],
+                }
+
+    def record(self, model_name, latency, ok=True):
+        """
+        Add one observation to a model's moving averages
+
+        Args:
+            model_name: Model that served the request
+            latency: Seconds until the first text arrived (the whole response
+                when not streaming)
+            ok: False if the request failed
+        """
+        with self._lock:
+            stats = self._stats.get(model_name)
+            if stats is None:
+                self._stats[model_name] = {
+                    "latency": latency, "error_rate": 0.0 if ok else 1.0, "requests": 1,
+                    "updated_at": time.time(),
+                }
+                return
+            a = self.alpha
+            if ok:
+                stats["latency"] = a * latency + (1 - a) * stats["latency"]
+            stats["error_rate"] = a * (0.0 if ok else 1.0) + (1 - a) * stats["error_rate"]
+            stats["requests"] += 1
+            stats["updated_at"] = time.time()
+
+    def _score(self, name):
+        stats = self._stats.get(name)
+        if stats is None:
+            return _UNKNOWN_LATENCY
+        # A model failing half the time costs about two attempts
+        return stats["latency"] / max(1.0 - stats["error_rate"], 0.05)
+
+    def _healthy(self, name):
+        """Error rate acceptable, or failing but idle long enough to retry"""
+        stats = self._stats.get(name)
+        return (stats is None or stats["error_rate"] <= self.max_error_rate
+                or time.time() - stats["updated_at"] > _RETRY_AFTER)
+
+    def _best(self, tier, available):
+        """Best candidate of a tier, and whether it is healthy"""
+        candidates = [m for m in self.tiers.get(tier, []) if available is None or m in available]
+        with self._lock:
+            healthy = [m for m in candidates if self._healthy(m)]
+            pool = healthy or candidates
+            if not pool:
+                return None, False
+            return min(pool, key=self._score), bool(healthy)
+
+    def choose(self, question, decision=None, available=None, override=None):
+        """
+        Pick the model for a question
+
+        Args:
+            question: User's question
+            decision: Optional router.RouteDecision for the question
+            available: Optional collection of model names the API key can use
+            override: "fast", "strong" or "off" to bypass complexity scoring
+                (defaults to MODEL_ROUTING)
+
+        Returns:
+            (tier, model_name); tier is "default" when routing is off or no
+            tier model is available
+        """
+        mode = override or self.mode
+        if mode == "off":
+            return "default", MODEL_NAME
+
+        tier = mode if mode in self.tiers else (
+            "strong" if complexity(question, decision) >= self.threshold else "fast"
+        )
+        model_name, healthy = self._best(tier, available)
+        if not healthy:
+            # Every model of the tier is failing or missing: use the other tier
+            other = "fast" if tier == "strong" else "strong"
+            fallback, fallback_healthy = self._best(other, available)
+            if fallback_healthy or model_name is None:
+                tier, model_name = other, fallback
+        if model_name is None:
+            return "default", MODEL_NAME
+
+        with self._lock:
+            self._served[tier] = self._served.get(tier, 0) + 1
+        return tier, model_name
+
+    def track_stream(self, model_name, chunks, started_at=None):
+        """
+        Pass a response stream through, recording time to first chunk or failure
+
+        Args:
+            model_name: Model producing the stream
+            chunks: Iterator of text chunks
+            started_at: time.perf_counter() when the request was sent
+
+        Yields:
+            The chunks unchanged
+        """
+        started_at = started_at if started_at is not None else time.perf_counter()
+        first = True
+        try:
+            for chunk in chunks:
+                if first:
+                    self.record(model_name, time.perf_counter() - started_at)
+                    first = False
+                yield chunk
+        except Exception:
+            self.record(model_name, time.perf_counter() - started_at, ok=False)
+            raise
+
+    def metrics(self):
+        """
+        Requests served per tier and live statistics per model
+
+        Returns:
+            {"tiers": {tier: count}, "models": {name: {latency, error_rate, requests, updated_at}}}
+        """
+        with self._lock:
+            return {
+                "tiers": dict(self._served),
+                "models": {name: dict(stats) for name, stats in self._stats.items()},
+            }
+
+
+# Process-wide router shared by the CLI agent and every app session
+model_router = ModelRouter()
@@ -0,0 +1,113 @@
+"""
+Token-budgeted prompt assembly for the Research Agent
+Fits the question, conversation history and tool results into one input budget
+"""
+from typing import NamedTuple
+
+from config import PROMPT_MAX_TOKENS, PROMPT_SECTION_BUDGETS, PROMPT_TRIM_ORDER
+from summarizer import summarize
+from tokens import estimate_tokens, truncate_to_tokens
+
+# Sections shrunk below this many tokens are dropped instead
+MIN_SECTION_TOKENS = 20
+
+
+class PromptReport(NamedTuple):
+    """Estimated tokens before and after fitting, per section and in total"""
+
+    sections: dict
+    before: int
+    after: int
+
+    @property
+    def saved(self):
+        return self.before - self.after
+
+    def summary(self):
+        """One-line description, e.g. '~1,840 -> ~1,020 prompt tokens (saved ~820)'"""
+        text = f"~{self.after:,} prompt tokens"
+        if self.saved > 0:
+            text = f"~{self.before:,} -> {text} (saved ~{self.saved:,})"
+        return text
+
+
+class PromptBuilder:
+    """
+    Collects prompt sections and shrinks them to fit a token budget
+
+    Each section first gets its own budget (PROMPT_SECTION_BUDGETS). If the
+    prompt is still too long, sections are trimmed further in
+    PROMPT_TRIM_ORDER, lowest priority first. Multi-sentence sections are
+    compressed with the extractive summarizer; the question is only ever
+    truncated.
+    """
+
+    def __init__(self, max_tokens=PROMPT_MAX_TOKENS, budgets=None, trim_order=None):
+        self.max_tokens = max_tokens
+        self.budgets = {**PROMPT_SECTION_BUDGETS, **(budgets or {})}
+        self.trim_order = trim_order or PROMPT_TRIM_ORDER
+        self.sections = {}
+        self.queries = {}
+
+    def add(self, name, text, query=None):
+        """
+        Add a section
+
+        Args:
+            name: Section name, e.g. "question", "history", "search"
+            text: Section text (empty sections are ignored)
+            query: Optional question that compression should favor
+
+        Returns:
+            self, for chaining
+        """
+        if text:
+            self.sections[name] = str(text)
+            self.queries[name] = query
+        return self
+
+    def _shrink(self, name, text, budget):
+        if name == "question":
+            return truncate_to_tokens(text, budget)
+        return summarize(text, budget, query=self.queries.get(name))
+
+    def fit(self, template=""):
+        """
+        Shrink the sections to their budgets and the prompt to max_tokens
+
+        Args:
+            template: Fixed prompt text around the sections, counted against
+                the budget
+
+        Returns:
+            (sections, report): {name: fitted text} for every added section
+            ("" when dropped) and a PromptReport
+        """
+        overhead = estimate_tokens(template) if template else 0
+        before = {name: estimate_tokens(text) for name, text in self.sections.items()}
+
+        fitted = {}
+        for name, text in self.sections.items():
+            budget = self.budgets.get(name, self.max_tokens)
+            fitted[name] = self._shrink(name, text, budget) if before[name] > budget else text
+        after = {name: estimate_tokens(text) if text else 0 for name, text in fitted.items()}
+
+        for name in self.trim_order:
+            excess = overhead + sum(after.values()) - self.max_tokens
+            if excess <= 0:
+                break
+            if not fitted.get(name):
+                continue
+            budget = after[name] - excess
+            if budget < MIN_SECTION_TOKENS and name != "question":
+                fitted[name] = ""
+            else:
+                fitted[name] = self._shrink(name, fitted[name], max(budget, MIN_SECTION_TOKENS))
+            after[name] = estimate_tokens(fitted[name]) if fitted[name] else 0
+
+        report = PromptReport(
+            sections={name: (before[name], after[name]) for name in self.sections},
+            before=overhead + sum(before.values()),
+            after=overhead + sum(after.values()),
+        )
+        return fitted, report
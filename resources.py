@@ -0,0 +1,82 @@
+"""
+Process-wide resource registry for the Research Agent
+Lets every Streamlit session share one model and one tool set per configuration
+"""
+import threading
+
+
+def config_key(*parts):
+    """
+    Build a hashable registry key from names and (possibly nested) dictionaries
+
+    Args:
+        *parts: Strings, numbers or dictionaries describing a configuration
+
+    Returns:
+        Tuple usable as a dictionary key
+    """
+    return tuple(
+        tuple(sorted(part.items())) if isinstance(part, dict) else part
+        for part in parts
+    )
+
+
+class ResourceRegistry:
+    """Thread-safe, lazily constructed resources shared across sessions"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._resources = {}
+        self._building = {}
+
+    def get(self, key, factory):
+        """
+        Get the resource for key, building it with factory() on first use
+
+        Concurrent callers asking for the same missing key wait for a single
+        construction instead of each running the factory.
+
+        Args:
+            key: Hashable key (see config_key)
+            factory: Zero-argument callable that builds the resource
+
+        Returns:
+            The shared resource
+        """
+        with self._lock:
+            if key in self._resources:
+                return self._resources[key]
+            key_lock = self._building.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                if key in self._resources:
+                    return self._resources[key]
+
+            resource = factory()
+
+            with self._lock:
+                self._resources[key] = resource
+                self._building.pop(key, None)
+            return resource
+
+    def invalidate(self, key=None):
+        """
+        Drop a cached resource so the next get() rebuilds it
+
+        Args:
+            key: Key to drop, or None to drop everything
+        """
+        with self._lock:
+            if key is None:
+                self._resources.clear()
+            else:
+                self._resources.pop(key, None)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._resources
+
+
+# Shared by every session in the process
+registry = ResourceRegistry()
@@ -0,0 +1,192 @@
+"""
+Intent routing for the Research Agent
+Decides which tools a question needs with one compiled, single-pass pattern
+"""
+import re
+from typing import NamedTuple
+
+from canonical import decompose
+from config import INTENT_CLASSIFIER_ENABLED, INTENT_CONFIDENCE_THRESHOLD
+from intent_classifier import get_classifier
+
+# Keyword rules: rule name -> (tool, phrases). Phrases are matched on word
+# boundaries, so "sum" no longer fires on "summary" or "find" on "findings"
+KEYWORD_RULES = {
+    "search": ("WebSearch", ["search"]),
+    "find": ("WebSearch", ["find"]),
+    "what is": ("WebSearch", ["what is", "what's"]),
+    "who is": ("WebSearch", ["who is", "who's"]),
+    "when": ("WebSearch", ["when"]),
+    "where": ("WebSearch", ["where"]),
+    "latest": ("WebSearch", ["latest"]),
+    "current": ("WebSearch", ["current"]),
+    "recent": ("WebSearch", ["recent"]),
+    "news": ("WebSearch", ["news"]),
+    "today": ("WebSearch", ["today"]),
+    "tell me about": ("WebSearch", ["tell me about"]),
+    "calculate": ("Calculator", ["calculate"]),
+    "compute": ("Calculator", ["compute"]),
+    "math": ("Calculator", ["math"]),
+    "sum": ("Calculator", ["sum"]),
+    "multiply": ("Calculator", ["multiply"]),
+    "divide": ("Calculator", ["divide"]),
+    "arithmetic words": ("Calculator", [
+        "plus", "minus", "times", "divided by", "multiplied by", "squared",
+        "cubed", "square root", "to the power of", "percent",
+    ]),
+    "statistics": ("Calculator", [
+        "average", "mean", "median", "standard deviation", "stdev", "variance",
+        "percentile", "cagr", "compound annual growth", "growth rate",
+        "percent change", "percentage change",
+    ]),
+}
+
+# Symbolic rules: an arithmetic operator between operands, or a percentage
+OPERATOR_PATTERN = r"\d\s*[-+*/^]\s*[\d(.]"
+PERCENT_PATTERN = r"\d\s*%"
+
+
+class RouteDecision(NamedTuple):
+    """Which tools a question needs and the rules that said so"""
+
+    search: bool = False
+    calculate: bool = False
+    matched: tuple = ()
+
+    @property
+    def tools(self):
+        """Names of the tools to run"""
+        tools = []
+        if self.search:
+            tools.append("WebSearch")
+        if self.calculate:
+            tools.append("Calculator")
+        return tools
+
+
+def _trie_pattern(node):
+    """Turn a character trie into an equivalent regex without alternation overlap"""
+    branches = [
+        re.escape(ch) + _trie_pattern(child)
+        for ch, child in sorted(node.items()) if ch
+    ]
+    if not branches:
+        return ""
+    pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if "" in node:
+        pattern = f"(?:{pattern})?"
+    return pattern
+
+
+class IntentRouter:
+    """Evaluates every routing rule in a single regex pass"""
+
+    def __init__(self, keyword_rules=KEYWORD_RULES):
+        """
+        Compile all rules into one alternation
+
+        Args:
+            keyword_rules: Dictionary of rule name -> (tool name, phrases)
+        """
+        self._phrases = {}
+        for name, (tool, phrases) in keyword_rules.items():
+            for phrase in phrases:
+                self._phrases[phrase] = (name, tool)
+
+        # Phrases are folded into a trie so the regex engine tests each
+        # character position once per branch instead of once per phrase
+        trie = {}
+        for phrase in self._phrases:
+            node = trie
+            for ch in phrase:
+                node = node.setdefault(ch, {})
+            node[""] = {}
+
+        self._pattern = re.compile(
+            rf"\b{_trie_pattern(trie)}\b|{OPERATOR_PATTERN}|{PERCENT_PATTERN}"
+        )
+
+    def route(self, question):
+        """
+        Route a question to tools
+
+        Args:
+            question: User's input question
+
+        Returns:
+            RouteDecision
+        """
+        matched = []
+        search = calculate = False
+        # No capture groups: findall returns plain strings, and the matched
+        # text alone identifies the rule
+        for text in self._pattern.findall(question.lower()):
+            rule = self._phrases.get(text)
+            if rule is None:
+                rule = ("percent" if text.endswith("%") else "operator", "Calculator")
+            matched.append((rule[0], text))
+            if rule[1] == "WebSearch":
+                search = True
+            else:
+                calculate = True
+
+        return RouteDecision(search=search, calculate=calculate, matched=tuple(matched))
+
+
+# Shared by the CLI agent and the Streamlit app
+router = IntentRouter()
+
+
+def apply_classifier(question, decision, threshold=INTENT_CONFIDENCE_THRESHOLD):
+    """
+    Let the learned intent classifier decide whether to search
+
+    When the classifier is confident it replaces the keyword rules' search
+    decision, so knowledge-only questions that happen to contain "when",
+    "where" or "find" skip the web search (and searches the keywords miss
+    are added). The calculator decision stays with the rules, which need an
+    expression to evaluate anyway.
+
+    Args:
+        question: User's input question
+        decision: RouteDecision from the keyword rules
+        threshold: Minimum confidence needed to override the rules
+
+    Returns:
+        RouteDecision
+    """
+    classifier = get_classifier()
+    if classifier is None:
+        return decision
+
+    label, confidence = classifier.predict(question)
+    if confidence < threshold:
+        return decision
+
+    return decision._replace(
+        search=(label == "search"),
+        matched=decision.matched + ((f"classifier:{label}", f"{confidence:.2f}"),),
+    )
+
+
+def route(question):
+    """
+    Route a question with the default rules and, if enabled, the intent classifier
+
+    Comparisons ("AWS vs Azure pricing") search, one query per entity (see
+    canonical.decompose), unless the rules sent the question to the
+    Calculator; neither the rules nor the classifier recognize them
+    reliably.
+
+    Args:
+        question: User's input question
+
+    Returns:
+        RouteDecision
+    """
+    decision = router.route(question)
+    if INTENT_CLASSIFIER_ENABLED:
+        decision = apply_classifier(question, decision)
+    if not decision.search and not decision.calculate and len(decompose(question)) > 1:
+        decision = decision._replace(search=True, matched=decision.matched + (("comparison", "vs"),))
+    return decision
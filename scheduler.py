@@ -0,0 +1,65 @@
+"""
+Concurrent tool execution for the Research Agent
+Runs the selected tools in parallel so a question costs the slowest tool, not their sum
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from config import TOOL_TIMEOUTS, TOOL_DEFAULT_TIMEOUT, TOOL_MAX_WORKERS
+
+# Shared pool; a timed-out call keeps its thread until it returns on its own
+_executor = ThreadPoolExecutor(max_workers=TOOL_MAX_WORKERS, thread_name_prefix="tool")
+
+
+def _timed_call(func, arg):
+    """Run func(arg) and return (output, seconds taken)"""
+    start = time.perf_counter()
+    output = func(arg)
+    return output, time.perf_counter() - start
+
+
+def run_tools(calls, timeouts=None):
+    """
+    Run tool calls concurrently, each bounded by its own timeout
+
+    Args:
+        calls: List of (name, func, arg) tuples; a name may carry a "#suffix"
+            (e.g. "WebSearch#1") to run the same tool several times
+        timeouts: Optional {tool name: seconds} overriding TOOL_TIMEOUTS
+
+    Returns:
+        Dictionary mapping each name to {"ok", "output", "error", "elapsed",
+        "timed_out"}; failed or timed-out tools have ok=False and output=None
+    """
+    timeouts = {**TOOL_TIMEOUTS, **(timeouts or {})}
+    start = time.perf_counter()
+    futures = [
+        (name, _executor.submit(_timed_call, func, arg))
+        for name, func, arg in calls
+    ]
+
+    results = {}
+    for name, future in futures:
+        # Deadlines are measured from the common start, so waiting on one
+        # tool never eats into another's budget
+        deadline = timeouts.get(name.partition("#")[0], TOOL_DEFAULT_TIMEOUT)
+        remaining = max(0.0, deadline - (time.perf_counter() - start))
+        try:
+            output, elapsed = future.result(timeout=remaining)
+            results[name] = {
+                "ok": True, "output": output, "error": None,
+                "elapsed": elapsed, "timed_out": False,
+            }
+        except TimeoutError:
+            future.cancel()
+            results[name] = {
+                "ok": False, "output": None, "error": f"Timed out after {deadline}s",
+                "elapsed": deadline, "timed_out": True,
+            }
+        except Exception as e:
+            results[name] = {
+                "ok": False, "output": None, "error": str(e),
+                "elapsed": time.perf_counter() - start, "timed_out": False,
+            }
+
+    return results
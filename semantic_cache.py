@@ -0,0 +1,298 @@
+"""
+Semantic answer cache for the Research Agent
+Reuses the answer to an earlier question worded differently, found with hashed character n-gram embeddings
+"""
+import json
+import re
+import threading
+import time
+import zlib
+from itertools import combinations
+
+import numpy as np
+
+from cache import DiskCache, normalize_query, ttl_for_query
+from config import (
+    SEMANTIC_CACHE_PATH,
+    SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_MAX_ENTRIES,
+    SEMANTIC_CACHE_TTL,
+    SEMANTIC_CACHE_DIM,
+    SEMANTIC_CACHE_RELOAD_INTERVAL,
+)
+from summarizer import STOPWORDS
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+_NAME_PATTERN = re.compile(r"[A-Za-z0-9]+")
+_NUMBER_PATTERN = re.compile(r"\d+(?:[.,]\d+)*")
+
+# Question words change what is asked ("who founded" vs "when was ... founded")
+_QUESTION_WORDS = frozenset(["what", "when", "where", "which", "who", "whom", "why", "how"])
+_IGNORED = STOPWORDS - _QUESTION_WORDS
+
+# Words whose object says which way a question goes ("from X to Y", "X than Y")
+_DIRECTION_WORDS = frozenset(["from", "to", "than", "into", "vs", "versus"])
+
+
+def _words(text):
+    return [w for w in _WORD_PATTERN.findall(text.lower()) if w not in _IGNORED]
+
+
+def _features(text):
+    """Content words, their bigrams, and their character 3- and 4-grams"""
+    words = _words(text)
+    features = [f"w:{w}" for w in words]
+    features += [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f" {word} "
+        for n in (3, 4):
+            features += [f"c:{padded[i:i + n]}" for i in range(len(padded) - n + 1)]
+    return features
+
+
+def embed(text, dim=SEMANTIC_CACHE_DIM):
+    """
+    Embed a question as an L2-normalized signed hashed n-gram vector
+
+    Args:
+        text: Question text
+        dim: Vector dimensions (a power of two)
+
+    Returns:
+        float32 array of shape (dim,)
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature in _features(text):
+        # crc32, unlike hash(), is not salted per process
+        h = zlib.crc32(feature.encode("utf-8"))
+        vector[h & (dim - 1)] += 1.0 if h & 0x80000000 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def numbers(text):
+    """Numbers in a question; near-duplicates must mention the same ones"""
+    return frozenset(n.replace(",", "") for n in _NUMBER_PATTERN.findall(text))
+
+
+def entities(text):
+    """
+    Named things in a question: capitalized words after the first, and acronyms
+
+    Lowercased; the first word is capitalized anyway and only counts when it
+    is an acronym ("AWS pricing").
+    """
+    words = _NAME_PATTERN.findall(text)
+    return frozenset(
+        w.lower() for i, w in enumerate(words)
+        if (w.isupper() and len(w) > 1) or (i and w[0].isupper() and w.lower() not in STOPWORDS)
+    )
+
+
+def entity_conflict(a, b):
+    """
+    Whether a question names something the other doesn't mention
+
+    Character n-grams make "capital of Australia" and "capital of Austria"
+    look alike; a name must appear in both questions, in any case, for one
+    answer to serve them. Questions written in lowercase name nothing.
+    """
+    words_a, words_b = (frozenset(w.lower() for w in _NAME_PATTERN.findall(t)) for t in (a, b))
+    return not (entities(a) <= words_b and entities(b) <= words_a)
+
+
+def order_conflict(a, b):
+    """
+    Whether two questions ask about the same things in opposite directions
+
+    Bigram features only lower the similarity of "Is Python faster than
+    Java?" and "Is Java faster than Python?"; this rules such pairs out.
+    They conflict when a direction word in both is followed by different
+    words ("from London" / "from New York"), or when three shared words
+    appear in reversed order ("Apple acquire Beats" / "Beats acquire
+    Apple"). Moving a whole phrase ("Mars rover latest news") is not a
+    conflict.
+    """
+    tokens_a, tokens_b = (
+        [w for w in _WORD_PATTERN.findall(t.lower()) if w not in _IGNORED or w in _DIRECTION_WORDS]
+        for t in (a, b)
+    )
+    objects_a, objects_b = (
+        {w: nxt for w, nxt in zip(tokens, tokens[1:]) if w in _DIRECTION_WORDS and nxt not in _DIRECTION_WORDS}
+        for tokens in (tokens_a, tokens_b)
+    )
+    if any(objects_a[w] != objects_b[w] for w in objects_a.keys() & objects_b.keys()):
+        return True
+
+    position = {w: i for i, w in enumerate(w for w in tokens_b if w not in _DIRECTION_WORDS)}
+    shared = [position[w] for w in dict.fromkeys(_words(a)) if w in position]
+    return any(z < y < x for x, y, z in combinations(shared, 3))
+
+
+def conflict(a, b):
+    """Whether two questions differ in numbers, names or direction whatever their similarity"""
+    return numbers(a) != numbers(b) or entity_conflict(a, b) or order_conflict(a, b)
+
+
+def similarity(a, b):
+    """Cosine similarity of two questions (0 when their numbers, names or directions differ)"""
+    if conflict(a, b):
+        return 0.0
+    return float(embed(a) @ embed(b))
+
+
+class SemanticCache:
+    """
+    Answers of earlier questions, looked up by embedding similarity
+
+    Entries live in a DiskCache table shared by the CLI and the web app;
+    each process keeps a NumPy matrix of their embeddings and reloads it
+    every SEMANTIC_CACHE_RELOAD_INTERVAL seconds to see other processes'
+    entries.
+    """
+
+    def __init__(self, path=SEMANTIC_CACHE_PATH, threshold=SEMANTIC_CACHE_THRESHOLD,
+                 max_entries=SEMANTIC_CACHE_MAX_ENTRIES, dim=SEMANTIC_CACHE_DIM,
+                 reload_interval=SEMANTIC_CACHE_RELOAD_INTERVAL):
+        self.store = DiskCache(path, table="semantic_answers", max_entries=max_entries)
+        self.threshold = threshold
+        self.dim = dim
+        self.reload_interval = reload_interval
+        self.hits = 0
+        self.misses = 0
+        self._keys = []
+        self._questions = []
+        self._expires = np.zeros(0)
+        self._matrix = np.zeros((0, dim), dtype=np.float32)
+        self._embeddings = {}
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def _reload(self):
+        """Rebuild the index from the unexpired entries on disk"""
+        keys, questions, expires, rows = [], [], [], []
+        for key, value, expires_at in self.store.items():
+            question = json.loads(value)["question"]
+            if key not in self._embeddings:
+                self._embeddings[key] = embed(question, self.dim)
+            keys.append(key)
+            questions.append(question)
+            expires.append(expires_at)
+            rows.append(self._embeddings[key])
+        self._embeddings = {k: self._embeddings[k] for k in keys}
+        self._keys, self._questions = keys, questions
+        self._expires = np.array(expires)
+        self._matrix = np.array(rows, dtype=np.float32).reshape(len(rows), self.dim)
+        self._loaded_at = time.monotonic()
+
+    def lookup(self, question):
+        """
+        Find the answer to a near-duplicate question
+
+        Args:
+            question: User's question
+
+        Returns:
+            {"question", "answer", "similarity"} of the closest earlier
+            question above the threshold, or None
+        """
+        query = embed(question, self.dim)
+        with self._lock:
+            if self._loaded_at is None or time.monotonic() - self._loaded_at > self.reload_interval:
+                self._reload()
+            scores = self._matrix @ query
+            scores[self._expires <= time.time()] = -1.0
+            best = None
+            for i in np.argsort(-scores):
+                if scores[i] < self.threshold:
+                    break
+                if not conflict(question, self._questions[i]):
+                    best = i
+                    break
+            key = self._keys[best] if best is not None else None
+            score = float(scores[best]) if best is not None else 0.0
+
+        # The entry may have been evicted by another process since the reload
+        value = self.store.get(key) if key is not None else None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        entry = json.loads(value)
+        return {"question": entry["question"], "answer": entry["answer"], "similarity": score}
+
+    def add(self, question, answer):
+        """
+        Remember the answer to a question
+
+        Time-sensitive questions ("latest", "today", ...) expire after
+        SEARCH_CACHE_TTL_FRESH, others after at most SEMANTIC_CACHE_TTL.
+
+        Args:
+            question: User's question
+            answer: Answer given
+        """
+        key = normalize_query(question)
+        ttl = min(ttl_for_query(key), SEMANTIC_CACHE_TTL)
+        self.store.set(key, json.dumps({"question": question, "answer": answer}), ttl)
+
+        vector = embed(question, self.dim)
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            self._embeddings[key] = vector
+            expires_at = time.time() + ttl
+            if key in self._keys:
+                i = self._keys.index(key)
+                self._matrix[i] = vector
+                self._expires[i] = expires_at
+                self._questions[i] = question
+            else:
+                self._keys.append(key)
+                self._questions.append(question)
+                self._expires = np.append(self._expires, expires_at)
+                self._matrix = np.vstack([self._matrix, vector[None, :]])
+
+    def clear(self):
+        """Remove every entry and reset the counters"""
+        self.store.clear()
+        with self._lock:
+            self._loaded_at = None
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with hits, misses, hit_rate and entries
+        """
+        entries = self.store.stats()["entries"]
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": entries,
+            }
+
+
+_semantic_cache = None
+_semantic_cache_lock = threading.Lock()
+
+
+def get_semantic_cache():
+    """
+    Get the process-wide semantic cache
+
+    Returns:
+        Shared SemanticCache instance
+    """
+    global _semantic_cache
+    with _semantic_cache_lock:
+        if _semantic_cache is None:
+            _semantic_cache = SemanticCache()
+        return _semantic_cache
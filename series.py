@@ -0,0 +1,183 @@
+"""
+Statistics and finance mode for the Calculator tool
+Vectorized NumPy operations over number series: averages, spread, percentiles, growth
+"""
+import re
+
+import numpy as np
+
+from calculator import extract_numbers
+
+
+def mean(values):
+    """Arithmetic mean"""
+    return np.mean(values)
+
+
+def median(values):
+    """Middle value (mean of the two middle values for even counts)"""
+    return np.median(values)
+
+
+def stdev(values):
+    """Sample standard deviation (n - 1 denominator, like statistics.stdev)"""
+    return np.std(values, ddof=1)
+
+
+def variance(values):
+    """Sample variance"""
+    return np.var(values, ddof=1)
+
+
+def total(values):
+    """Sum of the values"""
+    return np.sum(values)
+
+
+def percentile(values, q):
+    """q-th percentile with linear interpolation"""
+    return np.percentile(values, q)
+
+
+def cagr(start, end, years):
+    """
+    Compound annual growth rate in percent
+
+    Broadcasts, so arrays of start and end values are handled in one call.
+
+    Args:
+        start: Starting value(s)
+        end: Ending value(s)
+        years: Number of periods
+
+    Returns:
+        Growth rate(s) in percent
+    """
+    start, end = np.asarray(start, dtype=float), np.asarray(end, dtype=float)
+    return (np.power(end / start, 1.0 / years) - 1.0) * 100.0
+
+
+def pct_change(values):
+    """Percentage change between consecutive values"""
+    values = np.asarray(values, dtype=float)
+    return np.diff(values) / values[:-1] * 100.0
+
+
+# Operation -> (phrase pattern, function, minimum number of values)
+OPERATIONS = {
+    "percentile": (r"(\d+(?:\.\d+)?)(?:st|nd|rd|th)?[ -]percentile", percentile, 2),
+    "cagr": (r"cagr|compound annual growth(?: rate)?", cagr, 2),
+    "pct_change": (r"percent(?:age)? change|% change|growth rate", pct_change, 2),
+    "stdev": (r"standard deviation|std ?dev|stdev", stdev, 2),
+    "variance": (r"variance", variance, 2),
+    "median": (r"median", median, 2),
+    "mean": (r"average|mean", mean, 2),
+    "total": (r"sum|total", total, 2),
+}
+
+_OPERATION_PATTERN = re.compile(
+    r"\b(?:" + "|".join(f"(?P<{name}>{pattern})" for name, (pattern, _, _) in OPERATIONS.items()) + r")\b",
+    re.IGNORECASE,
+)
+_YEARS_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*(?:years?|yrs?)\b", re.IGNORECASE)
+# "in 2024" dates the question; the year is not a data point
+_YEAR_PATTERN = re.compile(r"\b(?:in|during|since)\s+(?:1[89]|20)\d{2}\b(?![.,]?\d)", re.IGNORECASE)
+
+
+def parse_request(text):
+    """
+    Recognize a statistics/finance question
+
+    Values are the numbers after the operation phrase, e.g.
+    "average of 12, 18, 22 and 40" or "CAGR from 1.2M to 3.4M over 5 years";
+    years after "in" ("average salary in 2024") are not values, and every
+    operation needs at least two. "Growth rate from A to B over N years"
+    is a CAGR.
+
+    Args:
+        text: Question or tool input
+
+    Returns:
+        (operation, values, params) tuple, or None if the text is not a
+        series request
+    """
+    match = _OPERATION_PATTERN.search(text)
+    if not match:
+        return None
+
+    operation = match.lastgroup
+    rest = _YEAR_PATTERN.sub(" ", text[match.end():])
+    params = {}
+
+    if operation == "percentile":
+        params["q"] = extract_numbers(match.group(operation))[0]
+
+    # A period length ("over 5 years") is not a data point either
+    years = _YEARS_PATTERN.search(rest) if operation in ("cagr", "pct_change") else None
+    if years:
+        rest = rest[:years.start()] + rest[years.end():]
+
+    values = np.array(extract_numbers(rest))
+    if operation == "pct_change" and years and len(values) == 2 and "growth" in match.group(operation).lower():
+        operation = "cagr"
+    if len(values) < OPERATIONS[operation][2]:
+        return None
+    if operation == "cagr":
+        if not years or len(values) != 2:
+            return None
+        params["years"] = float(years.group(1))
+    return operation, values, params
+
+
+def compute(operation, values, **params):
+    """
+    Run one operation over an array
+
+    Args:
+        operation: Key of OPERATIONS
+        values: Sequence or NumPy array of numbers
+        **params: q for percentile, years for cagr
+
+    Returns:
+        float or NumPy array
+    """
+    func = OPERATIONS[operation][1]
+    if operation == "cagr":
+        return cagr(values[0], values[1], params["years"])
+    return func(np.asarray(values, dtype=float), **params)
+
+
+def _format(value):
+    """Readable number: up to 4 decimals, thousands separators"""
+    return f"{value:,.4f}".rstrip("0").rstrip(".")
+
+
+def solve(text):
+    """
+    Answer a statistics/finance question
+
+    Args:
+        text: Question or tool input
+
+    Returns:
+        Result string, or None if the text is not a series request
+    """
+    request = parse_request(text)
+    if request is None:
+        return None
+
+    operation, values, params = request
+    result = compute(operation, values, **params)
+    n = len(values)
+
+    if operation == "cagr":
+        return (f"CAGR from {_format(values[0])} to {_format(values[1])} "
+                f"over {_format(params['years'])} years: {_format(result)}%")
+    if operation == "pct_change":
+        changes = ", ".join(f"{_format(c)}%" for c in result[:10])
+        more = f" (+{len(result) - 10} more)" if len(result) > 10 else ""
+        overall = (values[-1] - values[0]) / values[0] * 100.0
+        return f"Percentage change: {changes}{more}; overall {_format(overall)}%"
+    if operation == "percentile":
+        return f"{_format(params['q'])}th percentile of {n} values: {_format(result)}"
+    return f"{operation.capitalize()} of {n} values: {_format(result)}"
@@ -0,0 +1,237 @@
+"""
+Native Serper.dev client for the Research Agent
+Keeps HTTPS connections alive in a shared pool instead of reconnecting per search
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import (
+    SERPER_BASE_URL,
+    SERPER_CONNECT_TIMEOUT,
+    SERPER_READ_TIMEOUT,
+    SERPER_POOL_SIZE,
+    SERPER_NUM_RESULTS,
+    SERPER_MAX_BATCH,
+)
+
+# Key holding the result list for each search type
+RESULT_KEYS = {
+    "search": "organic",
+    "news": "news",
+}
+
+# format_results() text for a response without snippets, including the
+# error entries a batch can hold
+NO_RESULTS = "No good Google Search Result was found"
+
+
+# Per-query requests when an endpoint rejects batches; shares the client's pool
+_executor = ThreadPoolExecutor(max_workers=SERPER_POOL_SIZE, thread_name_prefix="serper")
+
+
+class SerperClient:
+    """Pooled, keep-alive Serper.dev client with sync and asyncio entry points"""
+
+    def __init__(self, api_key, base_url=SERPER_BASE_URL,
+                 timeout=(SERPER_CONNECT_TIMEOUT, SERPER_READ_TIMEOUT),
+                 pool_size=SERPER_POOL_SIZE, k=SERPER_NUM_RESULTS, gl="us", hl="en"):
+        """
+        Create a client
+
+        Args:
+            api_key: Serper.dev API key
+            base_url: API endpoint, e.g. a local fake server for testing
+            timeout: (connect, read) timeouts in seconds
+            pool_size: Maximum keep-alive connections to the endpoint
+            k: Number of results requested per search
+            gl: Country code passed to Serper
+            hl: Language code passed to Serper
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.k = k
+        self.gl = gl
+        self.hl = hl
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            "X-API-KEY": api_key,
+            "Content-Type": "application/json",
+            "Accept-Encoding": "gzip",
+        })
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def results(self, query, search_type="search"):
+        """
+        Run a search and return the raw Serper response
+
+        Args:
+            query: Search query string
+            search_type: "search" or "news"
+
+        Returns:
+            Parsed JSON response as a dictionary
+        """
+        response = self.session.post(
+            f"{self.base_url}/{search_type}",
+            json=self._params(query),
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def _params(self, query):
+        return {"q": query, "num": self.k, "gl": self.gl, "hl": self.hl}
+
+    def _batch(self, queries, search_type):
+        """One request with a JSON array body; one response per query"""
+        response = self.session.post(
+            f"{self.base_url}/{search_type}",
+            json=[self._params(q) for q in queries],
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        payload = response.json()
+        if not isinstance(payload, list) or len(payload) != len(queries):
+            raise ValueError("Batch response doesn't match the queries sent")
+        return payload
+
+    def results_many(self, queries, search_type="search"):
+        """
+        Run several searches in as few requests as possible
+
+        Queries go out in batches of up to SERPER_MAX_BATCH. If the endpoint
+        rejects a batch, its queries are sent as concurrent single requests
+        over the connection pool instead.
+
+        Args:
+            queries: List of search query strings
+            search_type: "search" or "news"
+
+        Returns:
+            List of parsed JSON responses, aligned with queries
+        """
+        if len(queries) == 1:
+            return [self.results(queries[0], search_type)]
+
+        results = []
+        for start in range(0, len(queries), SERPER_MAX_BATCH):
+            batch = queries[start:start + SERPER_MAX_BATCH]
+            try:
+                results += self._batch(batch, search_type)
+            except (requests.HTTPError, ValueError):
+                results += list(_executor.map(lambda q: self.results(q, search_type), batch))
+        return results
+
+    def run(self, query, search_type="search"):
+        """
+        Run a search and return the snippets as one string
+
+        Args:
+            query: Search query string
+            search_type: "search" or "news"
+
+        Returns:
+            Search result text
+        """
+        return format_results(self.results(query, search_type), search_type, self.k)
+
+    def run_many(self, queries, search_type="search"):
+        """
+        Run several searches and return each one's snippets
+
+        Args:
+            queries: List of search query strings
+            search_type: "search" or "news"
+
+        Returns:
+            List of search result texts, aligned with queries
+        """
+        return [format_results(r, search_type, self.k) for r in self.results_many(queries, search_type)]
+
+    async def aresults(self, query, search_type="search"):
+        """Async version of results(), sharing the same connection pool"""
+        return await asyncio.to_thread(self.results, query, search_type)
+
+    async def arun(self, query, search_type="search"):
+        """Async version of run(), sharing the same connection pool"""
+        return await asyncio.to_thread(self.run, query, search_type)
+
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
+
+
+def format_results(results, search_type="search", k=SERPER_NUM_RESULTS):
+    """
+    Flatten a Serper response into snippet text
+
+    Matches the output of LangChain's GoogleSerperAPIWrapper.run so prompts
+    built from it are unchanged.
+
+    Args:
+        results: Raw Serper response
+        search_type: Search type the response came from
+        k: Maximum number of result entries to include
+
+    Returns:
+        Snippets joined by spaces
+    """
+    answer_box = results.get("answerBox")
+    if answer_box:
+        if answer_box.get("answer"):
+            return answer_box["answer"]
+        if answer_box.get("snippet"):
+            return answer_box["snippet"].replace("\n", " ")
+        if answer_box.get("snippetHighlighted"):
+            return " ".join(answer_box["snippetHighlighted"])
+
+    snippets = []
+
+    kg = results.get("knowledgeGraph")
+    if kg:
+        title = kg.get("title")
+        if kg.get("type"):
+            snippets.append(f"{title}: {kg['type']}.")
+        if kg.get("description"):
+            snippets.append(kg["description"])
+        for attribute, value in kg.get("attributes", {}).items():
+            snippets.append(f"{title} {attribute}: {value}.")
+
+    for result in results.get(RESULT_KEYS.get(search_type, "organic"), [])[:k]:
+        if "snippet" in result:
+            snippets.append(result["snippet"])
+        for attribute, value in result.get("attributes", {}).items():
+            snippets.append(f"{attribute}: {value}.")
+
+    if not snippets:
+        return NO_RESULTS
+    return " ".join(snippets)
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_serper_client(api_key):
+    """
+    Get the process-wide client for an API key, creating it on first use
+
+    Args:
+        api_key: Serper.dev API key
+
+    Returns:
+        Shared SerperClient instance
+    """
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            client = SerperClient(api_key)
+            _clients[api_key] = client
+        return client
@@ -0,0 +1,111 @@
+"""
+Speculative drafts for the Research Agent
+Judges whether an answer written before the web search finished is still good once the results arrive
+"""
+import re
+import threading
+from collections import Counter
+
+from config import SPECULATIVE_KEY_TERMS, SPECULATIVE_MAX_NOVELTY
+from summarizer import content_terms
+
+# Figures in search results (years, prices, counts) a draft may have wrong
+_NUMBER_PATTERN = re.compile(r"\b\d[\d,.]*\d\b")
+
+
+def _stems(text):
+    # Five-letter prefixes act as a crude stemmer, as in memory.covers()
+    return [t[:5] for t in content_terms(text) if not t.isdigit()]
+
+
+def _numbers(text):
+    return {n.replace(",", "").rstrip(".") for n in _NUMBER_PATTERN.findall(text)}
+
+
+def search_novelty(draft, search, question="", key_terms=SPECULATIVE_KEY_TERMS):
+    """
+    Share of the search results' key facts missing from a draft answer
+
+    Key facts are the most frequent content words of the results (words of
+    the question excluded, since the draft echoes them anyway) plus every
+    multi-digit number.
+
+    Args:
+        draft: Answer written without the search results
+        search: Search results text
+        question: User's question
+        key_terms: Number of frequent words taken from the results
+
+    Returns:
+        Novelty between 0 (draft already covers the results) and 1
+    """
+    asked = set(_stems(question))
+    counts = Counter(s for s in _stems(search) if s not in asked)
+    terms = {s for s, _ in counts.most_common(key_terms)}
+    numbers = _numbers(search) - _numbers(question)
+    if not terms and not numbers:
+        return 0.0
+
+    known_terms, known_numbers = set(_stems(draft)), _numbers(draft)
+    missing = len(terms - known_terms) + len(numbers - known_numbers)
+    return missing / (len(terms) + len(numbers))
+
+
+def keep_draft(draft, search, question="", max_novelty=SPECULATIVE_MAX_NOVELTY):
+    """
+    Decide whether a speculative draft can be used as the answer
+
+    Args:
+        draft: Answer written without the search results ("" if it failed)
+        search: Search results text ("" if the search failed or found nothing)
+        question: User's question
+        max_novelty: Highest search_novelty() at which the draft is kept
+
+    Returns:
+        (keep, novelty)
+    """
+    if not draft:
+        return False, 1.0
+    novelty = search_novelty(draft, search, question) if search else 0.0
+    return novelty <= max_novelty, novelty
+
+
+class SpeculationStats:
+    """Counts of speculative drafts kept and discarded, and the time discarded drafts cost"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.kept = 0
+        self.discarded = 0
+        self.wasted = 0.0
+
+    def record(self, kept, wasted=0.0):
+        """
+        Args:
+            kept: Whether the draft became the answer
+            wasted: Seconds spent on a discarded draft, from its start
+                until it was dropped
+        """
+        with self._lock:
+            if kept:
+                self.kept += 1
+            else:
+                self.discarded += 1
+            self.wasted += wasted
+
+    def metrics(self):
+        """
+        Returns:
+            Dictionary with drafts, kept, discarded and wasted_seconds
+        """
+        with self._lock:
+            return {
+                "drafts": self.kept + self.discarded,
+                "kept": self.kept,
+                "discarded": self.discarded,
+                "wasted_seconds": self.wasted,
+            }
+
+
+# Process-wide counters shared by the CLI agent and every app session
+speculation_stats = SpeculationStats()
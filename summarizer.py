@@ -0,0 +1,176 @@
+"""
+Extractive summarizer for the Research Agent
+TextRank over TF-IDF sentence vectors in NumPy, trimmed to a token budget
+"""
+import re
+
+import numpy as np
+
+from config import SUMMARY_MAX_TOKENS, TEXTRANK_DAMPING, TEXTRANK_NEIGHBORS
+from tokens import estimate_tokens, truncate_to_tokens
+
+# Sentence ends: terminal punctuation (including the "..." Serper puts on
+# truncated snippets) followed by whitespace, or a line break
+_SENTENCE_PATTERN = re.compile(r"(?<=[.!?…])\s+(?=[\"'(\[A-Z0-9])|\s*\n+\s*")
+_WORD_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been
+before being below between both but by can could did do does doing down during
+each few for from further had has have having he her here hers him his how i if
+in into is it its just me more most my no nor not now of off on once only or
+other our out over own same she should so some such than that the their them
+then there these they this those through to too under until up very was we
+were what when where which while who whom why will with would you your
+""".split())
+
+
+def split_sentences(text):
+    """
+    Split text into sentences
+
+    Args:
+        text: Free text
+
+    Returns:
+        List of non-empty sentence strings
+    """
+    return [s.strip() for s in _SENTENCE_PATTERN.split(text) if s and s.strip()]
+
+
+def content_terms(sentence):
+    """Lowercased words of a sentence without stopwords"""
+    return [w for w in _WORD_PATTERN.findall(sentence.lower()) if w not in STOPWORDS]
+
+
+def tfidf_matrix(sentences, query=None):
+    """
+    L2-normalized TF-IDF vectors for sentences (and optionally a query)
+
+    Args:
+        sentences: List of sentences
+        query: Optional text vectorized with the same vocabulary
+
+    Returns:
+        (matrix, query_vector) where matrix has one row per sentence and
+        query_vector is None without a query
+    """
+    vocabulary = {}
+    rows = [[vocabulary.setdefault(t, len(vocabulary)) for t in content_terms(s)] for s in sentences]
+
+    X = np.zeros((len(sentences), max(len(vocabulary), 1)), dtype=np.float32)
+    for i, ids in enumerate(rows):
+        np.add.at(X[i], ids, 1.0)
+
+    df = np.count_nonzero(X, axis=0)
+    idf = np.log((1 + len(sentences)) / (1 + df)) + 1.0
+    X *= idf
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    X /= np.where(norms == 0, 1.0, norms)
+
+    q = None
+    if query:
+        q = np.zeros(X.shape[1], dtype=np.float32)
+        ids = [vocabulary[t] for t in content_terms(query) if t in vocabulary]
+        np.add.at(q, ids, 1.0)
+        q *= idf
+        norm = np.linalg.norm(q)
+        q = q / norm if norm else None
+    return X, q
+
+
+def similarity_graph(X, neighbors=TEXTRANK_NEIGHBORS):
+    """
+    Sparse sentence graph: each sentence keeps its strongest cosine neighbors
+
+    Args:
+        X: Normalized sentence vectors
+        neighbors: Edges kept per sentence
+
+    Returns:
+        Symmetric weight matrix with zero diagonal
+    """
+    S = X @ X.T
+    np.fill_diagonal(S, 0.0)
+    if neighbors < len(S) - 1:
+        # Zero everything below each row's k-th largest similarity
+        cutoff = np.partition(S, -neighbors, axis=1)[:, -neighbors][:, None]
+        S = np.where(S >= cutoff, S, 0.0)
+        S = np.maximum(S, S.T)
+    return S
+
+
+def pagerank(W, damping=TEXTRANK_DAMPING, personalization=None, tol=1e-6, max_iter=100):
+    """
+    Weighted PageRank by power iteration
+
+    Args:
+        W: Non-negative weight matrix (row i holds edges out of node i)
+        damping: Probability of following an edge rather than teleporting
+        personalization: Optional teleport distribution (biases toward a query)
+        tol: L1 convergence tolerance
+        max_iter: Iteration cap
+
+    Returns:
+        Score per node, summing to 1
+    """
+    n = len(W)
+    teleport = np.full(n, 1.0 / n) if personalization is None else personalization / personalization.sum()
+    out = W.sum(axis=1)
+    dangling = out == 0
+    # Column-stochastic transition matrix; dangling nodes teleport
+    M = (W / np.where(dangling, 1.0, out)[:, None]).T
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        new = damping * (M @ scores + scores[dangling].sum() * teleport) + (1 - damping) * teleport
+        if np.abs(new - scores).sum() < tol:
+            return new
+        scores = new
+    return scores
+
+
+def summarize(text, max_tokens=SUMMARY_MAX_TOKENS, query=None):
+    """
+    Extract the most central sentences that fit a token budget
+
+    Text already within the budget is returned unchanged. Selected sentences
+    keep their original order.
+
+    Args:
+        text: Text to summarize
+        max_tokens: Token budget of the summary
+        query: Optional question; biases the ranking toward sentences about it
+
+    Returns:
+        Summary string
+    """
+    text = text.strip()
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    sentences = split_sentences(text)
+    if len(sentences) == 1:
+        return truncate_to_tokens(text, max_tokens)
+
+    X, q = tfidf_matrix(sentences, query)
+    personalization = None
+    if q is not None:
+        # Mostly query-driven teleports, with a floor so every sentence can be reached
+        personalization = X @ q + 0.02
+    scores = pagerank(similarity_graph(X), personalization=personalization)
+
+    # Leftover budget is not filled with sentences ranked far below average
+    min_score = 0.5 / len(sentences)
+    chosen, used = [], 0
+    for i in np.argsort(-scores, kind="stable"):
+        if scores[i] < min_score:
+            break
+        cost = estimate_tokens(sentences[i])
+        if used + cost <= max_tokens:
+            chosen.append(i)
+            used += cost
+
+    if not chosen:
+        return truncate_to_tokens(sentences[int(np.argmax(scores))], max_tokens)
+    return " ".join(sentences[i] for i in sorted(chosen))
@@ -0,0 +1,47 @@
+"""
+Tests for search and response cache expiry
+Run with: python -m pytest -q test_cache.py
+"""
+import pytest
+
+import cache
+from cache import SearchCache, ResponseCache, search_key
+from config import RESPONSE_CACHE_TTL, SEARCH_CACHE_TTL_EMPTY
+from serper_client import NO_RESULTS
+
+
+@pytest.fixture
+def caches(monkeypatch):
+    search_cache = SearchCache(path=":memory:")
+    monkeypatch.setattr(cache, "get_search_cache", lambda: search_cache)
+    return search_cache, ResponseCache(path=":memory:")
+
+
+def test_answer_expires_with_its_first_search(caches):
+    search_cache, response_cache = caches
+    search_cache.set(search_key("AWS pricing"), "aws", 1000)
+    search_cache.set(search_key("Azure pricing"), "azure", 100)
+    ttl = response_cache.ttl_for_answer(
+        "Compare AWS and Azure pricing", searched=True, queries=["AWS pricing", "Azure pricing"]
+    )
+    assert 90 < ttl <= 100
+
+
+def test_answer_without_search_keeps_default_ttl(caches):
+    _, response_cache = caches
+    assert response_cache.ttl_for_answer("What is 2 + 2?", searched=False) == RESPONSE_CACHE_TTL
+
+
+@pytest.mark.parametrize("reply", [NO_RESULTS, "", "  "])
+def test_empty_search_reply_gets_a_short_ttl(caches, reply):
+    search_cache, _ = caches
+    search = search_cache.wrap(lambda query: reply)
+    search("population of Tokyo")
+    assert search_cache.ttl_remaining(search_key("population of Tokyo")) <= SEARCH_CACHE_TTL_EMPTY
+
+
+def test_search_reply_keeps_its_query_ttl(caches):
+    search_cache, _ = caches
+    search = search_cache.wrap(lambda query: "Tokyo has about 14 million people.")
+    search("population of Tokyo")
+    assert search_cache.ttl_remaining(search_key("population of Tokyo")) > SEARCH_CACHE_TTL_EMPTY
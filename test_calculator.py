@@ -0,0 +1,32 @@
+"""
+Tests for arithmetic extraction from questions
+Run with: python -m pytest -q test_calculator.py
+"""
+import pytest
+
+from calculator import evaluate, extract_expressions
+
+
+@pytest.mark.parametrize("question, expected", [
+    ("What is 15% of 2500?", 375),
+    ("how much is 20% less than 500", 400),
+    ("20% more than 500", 600),
+    ("what is 5 less than 10?", 5),
+    ("5 more than 10", 15),
+    ("divide 1,000 by 8", 125),
+    ("5 squared plus 3", 28),
+])
+def test_extracted_expression_value(question, expected):
+    expressions = extract_expressions(question)
+    assert len(expressions) == 1
+    assert evaluate(expressions[0]) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("question", [
+    "what is 7 plus",
+    "Is 5 less than 10?",
+    "a 15% tip on a $80 bill",
+    "in 2024 the price rose by 10%",
+])
+def test_lone_operand_is_not_a_calculation(question):
+    assert extract_expressions(question) == []
@@ -0,0 +1,39 @@
+"""
+Tests for comparison decomposition and routing
+Run with: python -m pytest -q test_canonical.py
+"""
+import pytest
+
+from canonical import decompose
+from router import route
+
+
+@pytest.mark.parametrize("question,expected", [
+    ("Compare AWS and Azure pricing", ["AWS pricing", "Azure pricing"]),
+    ("AWS vs Azure vs GCP pricing", ["AWS pricing", "Azure pricing", "GCP pricing"]),
+    ("latest news on iPhone vs Pixel", ["latest news on iPhone", "latest news on Pixel"]),
+    ("Bank of America vs Chase", ["Bank of America", "Chase"]),
+    ("How fast is Python vs Rust?", ["How fast is Python", "How fast is Rust"]),
+    ("Python vs Rust for web servers", ["Python for web servers", "Rust for web servers"]),
+])
+def test_decompose_splits_comparisons(question, expected):
+    assert decompose(question) == expected
+
+
+@pytest.mark.parametrize("question", [
+    "How does Python 2 vs 3 handle strings?",
+    "Is 5 vs 7 bigger",
+    "iPhone 15 vs 16",
+])
+def test_decompose_keeps_numeric_comparisons_whole(question):
+    assert decompose(question) == [question]
+
+
+def test_comparison_forces_search():
+    assert route("AWS vs Azure pricing").search
+
+
+def test_calculator_route_is_not_forced_to_search():
+    decision = route("What is 5 vs 7 times 3?")
+    assert decision.calculate
+    assert not decision.search
@@ -0,0 +1,50 @@
+"""
+Tests for conversation memory follow-up detection
+Run with: python -m pytest -q test_memory.py
+"""
+import pytest
+
+from memory import ConversationMemory
+
+TOKYO_SEARCH = (
+    "Tokyo is the capital of Japan. The Tokyo metropolis has a population of about "
+    "14 million people and an area of 2,194 square kilometres."
+)
+
+STANDALONE = [
+    "Why do cats purr?",
+    "Who won this year's Nobel Prize in Physics?",
+    "Tell me more about quantum computing",
+    "Is that song by Taylor Swift?",
+    "What is the population of Osaka?",
+]
+
+
+@pytest.fixture
+def memory():
+    memory = ConversationMemory(background=False)
+    memory.add_turn("What is the population of Tokyo?", "About 14 million people.", search=TOKYO_SEARCH)
+    return memory
+
+
+@pytest.mark.parametrize("question", STANDALONE)
+def test_standalone_questions_still_search(memory, question):
+    assert not memory.covers(question)
+    assert not memory.is_follow_up(question)
+
+
+@pytest.mark.parametrize("question", ["What about its area?", "What is its capital?"])
+def test_follow_ups_reuse_results(memory, question):
+    assert memory.covers(question)
+    assert memory.is_follow_up(question)
+
+
+def test_follow_up_with_new_terms_searches(memory):
+    assert memory.is_follow_up("What is its tallest building?")
+    assert not memory.covers("What is its tallest building?")
+
+
+def test_nothing_covered_without_earlier_search():
+    memory = ConversationMemory(background=False)
+    memory.add_turn("Hi", "Hello!")
+    assert not memory.covers("What about its area?")
@@ -0,0 +1,37 @@
+"""
+Tests for semantic cache answer reuse
+Run with: python -m pytest -q test_semantic_cache.py
+"""
+import pytest
+
+from semantic_cache import SemanticCache, entity_conflict, similarity
+
+
+@pytest.fixture
+def cache():
+    cache = SemanticCache(path=":memory:", threshold=0.5)
+    cache.add("What is the capital of Australia?", "Canberra")
+    return cache
+
+
+@pytest.mark.parametrize("a,b", [
+    ("What is the capital of Australia?", "What is the capital of Austria?"),
+    ("AWS pricing", "Azure pricing"),
+])
+def test_different_names_conflict(a, b):
+    assert entity_conflict(a, b)
+    assert similarity(a, b) == 0.0
+
+
+@pytest.mark.parametrize("a,b", [
+    ("What is the population of Tokyo?", "Tokyo population"),
+    ("What is the capital of Australia?", "capital city of australia"),
+    ("What is quantum computing?", "Explain quantum computing"),
+])
+def test_same_names_do_not_conflict(a, b):
+    assert not entity_conflict(a, b)
+
+
+def test_lookup_reuses_only_answers_about_the_same_names(cache):
+    assert cache.lookup("capital city of Australia")["answer"] == "Canberra"
+    assert cache.lookup("What is the capital of Austria?") is None
@@ -0,0 +1,63 @@
+"""
+Tests for the WebSearch tool's caching
+Run with: python -m pytest -q test_tools.py
+"""
+import pytest
+
+import tools
+from cache import SearchCache, search_key
+
+
+class FakeSerper:
+    """Records the queries sent to Serper"""
+
+    def __init__(self):
+        self.sent = []
+
+    def run(self, query):
+        self.sent.append(query)
+        return f"results for {query}"
+
+    def run_many(self, queries):
+        self.sent.extend(queries)
+        return [f"results for {q}" for q in queries]
+
+
+@pytest.fixture
+def web_search(monkeypatch):
+    serper, cache = FakeSerper(), SearchCache(path=":memory:")
+    monkeypatch.setenv("SERPER_API_KEY", "test")
+    monkeypatch.setattr(tools, "get_serper_client", lambda key: serper)
+    monkeypatch.setattr(tools, "get_search_cache", lambda: cache)
+    tool = next(t for t in tools.create_tools() if t.name == "WebSearch")
+    return tool.func, serper, cache
+
+
+def test_cache_key_is_computed_from_the_raw_query(web_search):
+    search, serper, cache = web_search
+    questions = ["Tell me about the movie Her", "Tell me about the movie", "Tell me about The Who"]
+    for question in questions:
+        search(question)
+
+    keys = {key for key, _, _ in cache.items()}
+    assert keys == {search_key(q) for q in questions}
+    assert len(keys) == 3
+    assert "who" not in keys
+    assert len(serper.sent) == 3
+
+
+def test_repeated_query_is_served_from_cache(web_search):
+    search, serper, _ = web_search
+    search("What is RAG?")
+    search("tell me about RAG please")
+    assert serper.sent == ["rag"]
+
+
+def test_batched_queries_use_the_same_keys(web_search):
+    search, serper, cache = web_search
+    search("Tell me about the movie Her; Tell me about The Who")
+    assert {key for key, _, _ in cache.items()} == {
+        search_key("Tell me about the movie Her"), search_key("Tell me about The Who"),
+    }
+    search("Tell me about the movie Her")
+    assert len(serper.sent) == 2
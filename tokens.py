@@ -0,0 +1,83 @@
+"""
+Token estimation for the Research Agent
+Fast offline token counts, optionally calibrated against Gemini's count_tokens
+"""
+import math
+
+from config import TOKEN_CHARS_PER_TOKEN
+
+# Representative prompt text for calibrate(): prose, numbers and snippet-style fragments
+CALIBRATION_SAMPLE = (
+    "You are a helpful AI research assistant. Answer questions clearly and concisely. "
+    "Question: What are the latest findings from the James Webb Space Telescope? "
+    "Web Search Results: NASA's James Webb Space Telescope has captured the most "
+    "distant galaxy known, JADES-GS-z14-0, seen 290 million years after the Big Bang... "
+    "Jan 15, 2025 - Astronomers report carbon dioxide and methane in the atmosphere of "
+    "K2-18 b, a planet 8.6 times as massive as Earth, about 120 light-years away. "
+    "Calculation Result: Result: 375.0 (15% of 2,500). Provide a clear, helpful answer:"
+)
+
+
+class TokenEstimator:
+    """Characters-per-token estimator; calibrate() fits the ratio to a real model"""
+
+    def __init__(self, chars_per_token=TOKEN_CHARS_PER_TOKEN):
+        self.chars_per_token = chars_per_token
+        self.calibrated = False
+
+    def estimate(self, text):
+        """Estimated token count of text (at least 1)"""
+        return max(1, math.ceil(len(text) / self.chars_per_token))
+
+    def max_chars(self, tokens):
+        """Number of characters that fit in a token budget"""
+        return int(tokens * self.chars_per_token)
+
+    def calibrate(self, model, samples):
+        """
+        Fit the characters-per-token ratio with the model's own tokenizer
+
+        Costs one count_tokens request per sample, so call it once at startup.
+
+        Args:
+            model: genai.GenerativeModel
+            samples: Representative texts (e.g. a prompt with search results)
+
+        Returns:
+            The new characters-per-token ratio
+        """
+        samples = [s for s in samples if s]
+        chars = sum(len(s) for s in samples)
+        tokens = sum(model.count_tokens(s).total_tokens for s in samples)
+        if chars and tokens:
+            self.chars_per_token = chars / tokens
+            self.calibrated = True
+        return self.chars_per_token
+
+
+# Process-wide estimator shared by the summarizer and the prompt builder
+estimator = TokenEstimator()
+
+
+def estimate_tokens(text):
+    """Estimated token count of text with the shared estimator"""
+    return estimator.estimate(text)
+
+
+def truncate_to_tokens(text, max_tokens):
+    """
+    Cut text to a token budget, at a word boundary when possible
+
+    Args:
+        text: Text to cut
+        max_tokens: Token budget
+
+    Returns:
+        text unchanged if it fits, else a prefix ending in "..."
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    cut = text[:max(0, estimator.max_chars(max_tokens) - 3)]
+    if " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return cut.rstrip() + "..."
@@ -3,7 +3,16 @@ Tool definitions for the Research Agent
 Compatible with LangChain latest versions
 """
 from langchain_core.tools import Tool
-from langchain_community.utilities import GoogleSerperAPIWrapper
+from cache import get_search_cache, search_key, split_queries
+from canonical import canonicalize
+from coalesce import search_flight
+from serper_client import get_serper_client
+from calculator import evaluate, extract_expressions, CalculationError
+from series import solve as solve_series
+from summarizer import summarize as summarize_text
+from tokens import estimate_tokens
+from mapreduce import MapReduceSummarizer
+from config import SUMMARY_CHUNK_TOKENS, SEARCH_CANONICALIZE
 import os
 
 def create_tools():
@@ -19,44 +28,101 @@ def create_tools():
     try:
         serper_key = os.environ.get('SERPER_API_KEY')
         if serper_key:
-            search = GoogleSerperAPIWrapper(serper_api_key=serper_key)
+            search = get_serper_client(serper_key)
+            # Serve repeated queries from the shared on-disk cache and let
+            # concurrent identical queries share one in-flight request. Both
+            # see the raw query and key it with search_key(); only Serper
+            # gets the canonical keywords, so canonicalization runs on the
+            # original text once and names in it ("the movie Her") survive
+            def serper_query(query):
+                return canonicalize(query).query if SEARCH_CANONICALIZE else query
+            
+            search_one = search_flight.wrap(
+                get_search_cache().wrap(lambda q: search.run(serper_query(q))), key_func=search_key
+            )
+            search_many = get_search_cache().wrap_many(
+                lambda qs: search.run_many([serper_query(q) for q in qs]), key_func=search_key
+            )
+            
+            def web_search(query) -> str:
+                """Search for one query, or several (a list, or separated by ';' or newlines) in one batch"""
+                queries = split_queries(query)
+                # One search per cache key
+                unique = {}
+                for q in queries:
+                    unique.setdefault(search_key(q), q)
+                queries = list(unique.values())
+                if len(queries) == 1:
+                    return search_one(queries[0])
+                
+                # Uncached queries go out in one batched request
+                results = search_many(queries)
+                return "\n\n".join(f'Results for "{serper_query(q)}":\n{r}' for q, r in zip(queries, results))
+            
             web_search_tool = Tool(
                 name="WebSearch",
-                func=search.run,
-                description="Search the internet for current information, news, facts, and data. Input should be a search query string."
+                func=web_search,
+                description="Search the internet for current information, news, facts, and data. Input should be a search query string; separate several queries with ';' (e.g. one per product being compared) to search them in one batch."
             )
             tools.append(web_search_tool)
     except Exception as e:
         print(f"Warning: Could not create WebSearch tool: {e}")
     
     # Calculator Tool
+    def calculate_one(expression):
+        try:
+            # Whitelisted AST evaluation with bounded cost (no eval)
+            return str(evaluate(expression))
+        except CalculationError:
+            # Natural language ("15% of 2500"): pull the arithmetic out of it
+            expressions = extract_expressions(expression)
+            if len(expressions) != 1:
+                raise
+            return str(evaluate(expressions[0]))
+    
     def calculate(expression: str) -> str:
-        """Simple calculator for mathematical expressions"""
+        """Calculator for one expression, or several separated by ';' or newlines"""
+        # Statistics/finance over a list of numbers ("average of 12, 18 and 40")
         try:
-            # Safe evaluation
-            result = eval(expression, {"__builtins__": {}}, {})
-            return f"Result: {result}"
+            series_result = solve_series(expression)
         except Exception as e:
             return f"Error: {str(e)}"
+        if series_result is not None:
+            return f"Result: {series_result}"
+        
+        expressions = [e.strip() for e in expression.replace("\n", ";").split(";") if e.strip()]
+        if len(expressions) == 1:
+            try:
+                return f"Result: {calculate_one(expressions[0])}"
+            except Exception as e:
+                return f"Error: {str(e)}"
+        
+        lines = []
+        for e in expressions:
+            try:
+                lines.append(f"{e} = {calculate_one(e)}")
+            except Exception as err:
+                lines.append(f"{e}: Error: {str(err)}")
+        return "Results:\n" + "\n".join(lines)
     
     calculator_tool = Tool(
         name="Calculator",
         func=calculate,
-        description="Perform mathematical calculations. Input should be a valid mathematical expression like '2+2' or '10*5'."
+        description="Perform mathematical calculations. Input should be a mathematical expression like '2+2' or '15% of 2500'; separate several expressions with ';'. Also handles statistics and growth over lists of numbers, e.g. 'average of 12, 18, 22 and 40' or 'CAGR from 1.2M to 3.4M over 5 years'."
     )
     tools.append(calculator_tool)
     
     # Summarizer Tool
     def summarize(text: str) -> str:
-        """Summarize long text"""
-        if len(text) <= 200:
-            return text
-        return text[:200] + "..."
+        """Summarize text: TextRank for short inputs, concurrent Gemini map-reduce for long ones"""
+        if estimate_tokens(text) <= SUMMARY_CHUNK_TOKENS:
+            return summarize_text(text)
+        return MapReduceSummarizer().summarize(text)
     
     summarizer_tool = Tool(
         name="Summarizer",
         func=summarize,
-        description="Summarize long text. Input should be the text you want to summarize."
+        description="Summarize long text such as reports or web pages. Input should be the text you want to summarize."
     )
     tools.append(summarizer_tool)
     
@@ -0,0 +1,102 @@
+"""
+Train and evaluate the intent classifier
+Usage: python train_intent.py [--data data/intent_seed.tsv] [--folds 5] [--threshold 0.7]
+"""
+import argparse
+import random
+
+import numpy as np
+
+from config import INTENT_SEED_PATH, INTENT_MODEL_PATH, INTENT_CONFIDENCE_THRESHOLD
+from intent_classifier import IntentClassifier, LABELS, load_dataset
+from router import router
+
+
+def cross_validate(texts, labels, folds, seed=0):
+    """
+    Predict every example with a model that never saw it
+
+    Args:
+        texts: Questions
+        labels: Gold labels
+        folds: Number of folds
+        seed: Shuffle seed
+
+    Returns:
+        List of (label, confidence) predictions aligned with texts
+    """
+    order = list(range(len(texts)))
+    random.Random(seed).shuffle(order)
+    predictions = [None] * len(texts)
+
+    for fold in range(folds):
+        held_out = set(order[fold::folds])
+        train_idx = [i for i in order if i not in held_out]
+        model = IntentClassifier().fit(
+            [texts[i] for i in train_idx], [labels[i] for i in train_idx]
+        )
+        for i in held_out:
+            predictions[i] = model.predict(texts[i])
+
+    return predictions
+
+
+def report(texts, labels, predictions, threshold):
+    """Print accuracy, the confusion matrix and searches avoided versus the keyword rules"""
+    predicted = [label for label, _ in predictions]
+    accuracy = np.mean([p == g for p, g in zip(predicted, labels)])
+
+    print("=" * 70)
+    print("INTENT CLASSIFIER EVALUATION (held-out predictions)")
+    print("=" * 70)
+    print(f"\nExamples: {len(texts)}   Accuracy: {accuracy:.1%}\n")
+
+    print(f"{'gold / predicted':>18} " + " ".join(f"{l:>10}" for l in LABELS))
+    for gold in LABELS:
+        row = [sum(1 for p, g in zip(predicted, labels) if g == gold and p == pred) for pred in LABELS]
+        print(f"{gold:>18} " + " ".join(f"{c:>10}" for c in row))
+
+    # Search decisions: keyword rules alone vs. rules gated by the classifier
+    keyword_search = [router.route(t).search for t in texts]
+    gated_search = [
+        (label == "search") if confidence >= threshold else rule
+        for (label, confidence), rule in zip(predictions, keyword_search)
+    ]
+    needs_search = [g == "search" for g in labels]
+
+    avoided = [k and not c for k, c in zip(keyword_search, gated_search)]
+    added = [c and not k for k, c in zip(keyword_search, gated_search)]
+    correctly_avoided = sum(a and not n for a, n in zip(avoided, needs_search))
+    wrongly_avoided = sum(a and n for a, n in zip(avoided, needs_search))
+    missed_by_rules = sum(n and not k for n, k in zip(needs_search, keyword_search))
+    missed_by_gated = sum(n and not c for n, c in zip(needs_search, gated_search))
+
+    print(f"\nSearch decisions (confidence threshold {threshold}):")
+    print(f"   Keyword rules search : {sum(keyword_search)} questions")
+    print(f"   With classifier      : {sum(gated_search)} questions")
+    print(f"   Searches avoided     : {sum(avoided)} "
+          f"({correctly_avoided} unnecessary, {wrongly_avoided} actually needed)")
+    print(f"   Searches added       : {sum(added)}")
+    print(f"   Needed but not run   : {missed_by_rules} with rules, {missed_by_gated} with classifier")
+    print("=" * 70)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--data", default=INTENT_SEED_PATH, help="Labeled TSV dataset")
+    parser.add_argument("--folds", type=int, default=5, help="Cross-validation folds")
+    parser.add_argument("--threshold", type=float, default=INTENT_CONFIDENCE_THRESHOLD,
+                        help="Confidence needed to override the keyword rules")
+    parser.add_argument("--output", default=INTENT_MODEL_PATH, help="Where to save the trained model")
+    args = parser.parse_args()
+
+    texts, labels = load_dataset(args.data)
+    predictions = cross_validate(texts, labels, args.folds)
+    report(texts, labels, predictions, args.threshold)
+
+    IntentClassifier().fit(texts, labels).save(args.output)
+    print(f"\n✅ Trained on all {len(texts)} examples and saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Tune the semantic cache similarity threshold
+Usage: python tune_semantic_cache.py [--data data/paraphrase_pairs.tsv] [--min-precision 0.95] [--holdout 0.3]
+"""
+import argparse
+import csv
+import os
+
+import numpy as np
+
+from config import SEMANTIC_CACHE_THRESHOLD
+from semantic_cache import similarity
+
+PAIRS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "paraphrase_pairs.tsv")
+
+
+def load_pairs(path=PAIRS_PATH):
+    """
+    Read labeled question pairs
+
+    Args:
+        path: TSV file with a header row and label<TAB>question_a<TAB>question_b
+            rows (label 1 when one answer serves both questions)
+
+    Returns:
+        List of (question_a, question_b, is_duplicate) tuples
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return [
+            (row["question_a"], row["question_b"], row["label"] == "1")
+            for row in csv.DictReader(f, delimiter="\t", quoting=csv.QUOTE_NONE)
+        ]
+
+
+def split_pairs(pairs, holdout, seed=0):
+    """
+    Split labeled pairs into a tuning set and a held-out set
+
+    Each label is shuffled and split on its own, so both sets keep the
+    share of duplicates.
+
+    Args:
+        pairs: List of (question_a, question_b, is_duplicate) tuples
+        holdout: Share of the pairs held out
+        seed: Shuffle seed
+
+    Returns:
+        (tuning pairs, held-out pairs)
+    """
+    rng = np.random.default_rng(seed)
+    tuning, held_out = [], []
+    for label in (True, False):
+        group = [pair for pair in pairs if pair[2] == label]
+        order = rng.permutation(len(group))
+        cut = int(round(len(group) * holdout))
+        held_out += [group[i] for i in order[:cut]]
+        tuning += [group[i] for i in order[cut:]]
+    return tuning, held_out
+
+
+def sweep(scores, labels, thresholds):
+    """
+    Precision and recall of answer reuse at each threshold
+
+    Returns:
+        List of (threshold, precision, recall, f1)
+    """
+    rows = []
+    for threshold in thresholds:
+        reused = scores >= threshold
+        true_pos = np.sum(reused & labels)
+        precision = true_pos / reused.sum() if reused.any() else 1.0
+        recall = true_pos / labels.sum() if labels.any() else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        rows.append((threshold, precision, recall, f1))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--data", default=PAIRS_PATH, help="Labeled question pairs (TSV)")
+    parser.add_argument("--min-precision", type=float, default=0.95,
+                        help="Lowest acceptable share of reused answers that are right")
+    parser.add_argument("--holdout", type=float, default=0.3,
+                        help="Share of the pairs held out to report the chosen threshold on")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the tuning/held-out split")
+    args = parser.parse_args()
+
+    pairs, held_out = split_pairs(load_pairs(args.data), args.holdout, args.seed)
+    scores = np.array([similarity(a, b) for a, b, _ in pairs])
+    labels = np.array([duplicate for _, _, duplicate in pairs])
+    rows = sweep(scores, labels, np.round(np.arange(0.3, 1.0, 0.05), 2))
+
+    print("=" * 70)
+    print("SEMANTIC CACHE THRESHOLD")
+    print("=" * 70)
+    print(f"\nTuning pairs: {len(pairs)} ({labels.sum()} duplicates)   "
+          f"Held out: {len(held_out)}   Current threshold: {SEMANTIC_CACHE_THRESHOLD}\n")
+    print(f"{'threshold':>10} {'precision':>10} {'recall':>8} {'f1':>6}")
+    for threshold, precision, recall, f1 in rows:
+        marker = "  <- current" if np.isclose(threshold, SEMANTIC_CACHE_THRESHOLD) else ""
+        print(f"{threshold:>10.2f} {precision:>10.1%} {recall:>8.1%} {f1:>6.2f}{marker}")
+
+    # Closest non-duplicates are the ones a lower threshold would get wrong
+    print("\nMost similar non-duplicates:")
+    for i in np.argsort(-np.where(labels, -1.0, scores))[:5]:
+        a, b, _ = pairs[i]
+        print(f"   {scores[i]:.2f}  {a!r} / {b!r}")
+    print("Least similar duplicates:")
+    for i in np.argsort(np.where(labels, scores, 2.0))[:5]:
+        a, b, _ = pairs[i]
+        print(f"   {scores[i]:.2f}  {a!r} / {b!r}")
+
+    acceptable = [row for row in rows if row[1] >= args.min_precision and row[2] > 0]
+    candidates = [SEMANTIC_CACHE_THRESHOLD]
+    if acceptable:
+        best = max(acceptable, key=lambda row: (row[2], -row[0]))
+        candidates.append(best[0])
+
+    # The tuning pairs chose the threshold; only unseen pairs say how it does
+    if held_out:
+        held_scores = np.array([similarity(a, b) for a, b, _ in held_out])
+        held_labels = np.array([duplicate for _, _, duplicate in held_out])
+        print("\nHeld-out pairs:")
+        for threshold, precision, recall, f1 in sweep(held_scores, held_labels, sorted(set(candidates))):
+            print(f"{threshold:>10.2f} {precision:>10.1%} {recall:>8.1%} {f1:>6.2f}")
+
+    print("=" * 70)
+    if acceptable:
+        print(f"✅ Suggested SEMANTIC_CACHE_THRESHOLD = {best[0]:.2f} "
+              f"(tuning precision {best[1]:.1%}, recall {best[2]:.1%})")
+    else:
+        print(f"⚠️ No threshold reaches {args.min_precision:.0%} precision on the tuning pairs")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 Utility functions for display and user interaction
 """
 import sys
+import time
 from datetime import datetime
 
 def display_banner():
@@ -28,7 +29,10 @@ def display_tips():
 💡 Tips:
    - Ask any question and I'll research for you
    - Type 'exit' or 'quit' to end
-   - Type 'clear' to clear screen
+   - Type 'clear' to clear screen and start a new conversation
+   - Ask follow-up questions; recent turns are remembered
+   - Type 'stats' to show cache, model routing, hedging and draft statistics
+   - Type 'summarize <file>' to summarize a long document
 
 ======================================================================
 """
@@ -50,16 +54,128 @@ def get_user_input():
         print("\n")
         return "exit"
 
-def display_response(response):
+class StreamTimer:
+    """Wraps a stream of text chunks and records time-to-first-token and total latency"""
+    
+    def __init__(self, chunks, started_at=None):
+        """
+        Args:
+            chunks: Iterable of text chunks
+            started_at: time.perf_counter() value latency is measured from (default: now)
+        """
+        self.chunks = chunks
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.first_token = None
+        self.total = None
+    
+    def __iter__(self):
+        for chunk in self.chunks:
+            if self.first_token is None:
+                self.first_token = time.perf_counter() - self.started_at
+            yield chunk
+        self.total = time.perf_counter() - self.started_at
+    
+    def summary(self):
+        """
+        Format the recorded latencies
+        
+        Returns:
+            String like "first token 0.84s · total 3.21s"
+        """
+        first = f"{self.first_token:.2f}s" if self.first_token is not None else "n/a"
+        total = f"{self.total:.2f}s" if self.total is not None else "n/a"
+        return f"first token {first} · total {total}"
+
+def display_response(response, started_at=None):
     """
     Display the agent's response with formatting
     
     Args:
-        response: The response text to display
+        response: The response text, or an iterator of text chunks to print as they arrive
+        started_at: time.perf_counter() value the query started at, for latency reporting
+        
+    Returns:
+        str: The full response text
     """
     print(f"\n🤖 Assistant:\n")
-    print(response)
+    if isinstance(response, str):
+        print(response)
+    else:
+        timer = StreamTimer(response, started_at)
+        parts = []
+        for chunk in timer:
+            parts.append(chunk)
+            print(chunk, end="", flush=True)
+        print(f"\n\n⏱️ {timer.summary()}")
+        response = "".join(parts)
     print("\n" + "="*70)
+    return response
+
+def display_summary_stream(events):
+    """
+    Print map-reduce summarization progress as partial summaries arrive
+    
+    Args:
+        events: Iterator of events from MapReduceSummarizer.stream()
+        
+    Returns:
+        str: The final summary
+    """
+    start = time.perf_counter()
+    for event in events:
+        elapsed = time.perf_counter() - start
+        if event["stage"] == "done":
+            print(f"\n📝 Summary ({elapsed:.1f}s):\n\n{event['summary']}")
+            print("\n" + "="*70)
+            return event["summary"]
+        label = "Chunk" if event["stage"] == "map" else f"Merge (level {event['level']})"
+        note = " [extractive fallback]" if event["fallback"] else ""
+        print(f"\n✅ {label} {event['index'] + 1}/{event['total']} ({elapsed:.1f}s){note}:")
+        print(f"   {event['summary']}")
+
+def display_cache_stats(stats, name="Search cache"):
+    """
+    Display cache statistics
+
+    Args:
+        stats: Dictionary returned by DiskCache.stats()
+        name: Cache shown in the message
+    """
+    print(f"\n🗄️ {name}: {stats['hits']} hits, {stats['misses']} misses "
+          f"({stats['hit_rate']:.0%} hit rate), {stats['entries']} entries stored")
+
+def display_router_metrics(metrics):
+    """
+    Display model routing statistics
+    
+    Args:
+        metrics: Dictionary returned by ModelRouter.metrics()
+    """
+    served = ", ".join(f"{tier}: {count}" for tier, count in metrics["tiers"].items())
+    print(f"🧭 Requests per tier: {served}")
+    for name, stats in sorted(metrics["models"].items()):
+        print(f"   {name:<28} {stats['latency']:6.2f}s avg latency, "
+              f"{stats['error_rate']:4.0%} errors, {stats['requests']} requests")
+
+def display_hedge_metrics(metrics):
+    """
+    Display hedged request counters
+    
+    Args:
+        metrics: Dictionary returned by Hedger.metrics()
+    """
+    print(f"🏁 Hedging: {metrics['hedges_fired']} backups fired for {metrics['requests']} requests, "
+          f"{metrics['hedges_won']} won (hedge delay {metrics['delay']:.2f}s)")
+
+def display_speculation_stats(metrics):
+    """
+    Display speculative draft counters
+    
+    Args:
+        metrics: Dictionary returned by SpeculationStats.metrics()
+    """
+    print(f"✍️ Speculative drafts: {metrics['kept']} kept, {metrics['discarded']} discarded "
+          f"of {metrics['drafts']} ({metrics['wasted_seconds']:.1f}s spent on discarded drafts)")
 
 def log_interaction(user_input, response):
     """